@@ -0,0 +1,135 @@
+"""Latency and peak memory of getting a screenshot ready for quantization.
+
+Compares the path DisplayService used to take (write the PNG screenshot to
+disk, Image.open it, crop, paste a LANCZOS resize onto a new RGBA canvas)
+with weather_frame.image_pipeline (decode from the in-memory buffer, crop and
+scale in one resize, RGBA read without conversion). Both end with the pixel
+array the quantizer works on. Each path runs for three screenshot sizes:
+the 800x480 the browser worker captures, the 1640x1040 of a Windows Chrome
+screenshot at device scale 2, and a 640x384 frame that is scaled up.
+
+Peak memory is the growth of the peak resident set size (VmHWM, reset
+through /proc/self/clear_refs before each path, so Linux only) in a separate
+process per path and size, so the paths do not share allocations.
+
+Run with: python benchmarks/bench_image_pipeline.py
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from bench_quantize import sample_weather_data
+from weather_frame.image_pipeline import fit_frame, load_frame
+from weather_frame.renderer import FrameRenderer
+
+PANEL_SIZE = (800, 480)
+SIZES = [(800, 480), (1640, 1040), (640, 384)]
+
+
+def screenshot_png(width, height):
+    """A dashboard screenshot of the given size, PNG encoded as the browser returns it."""
+    buffer = BytesIO()
+    FrameRenderer(width, height).render(sample_weather_data()).convert("RGBA").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def legacy_path(png, path):
+    """Screenshot to panel-sized image as DisplayService did before the image pipeline."""
+    with open(path, "wb") as f:
+        f.write(png)
+    image = Image.open(path)
+
+    width, height = PANEL_SIZE
+    image_width, image_height = image.size
+    if (min(image_width, width), min(image_height, height)) != image.size:
+        image = image.crop((0, 0, min(image_width, width), min(image_height, height)))
+
+    image_width, image_height = image.size
+    if image_width < width or image_height < height:
+        canvas = Image.new("RGBA", PANEL_SIZE, (255, 255, 255, 255))
+        scale = min(width / image_width if image_width < width else 1, height / image_height if image_height < height else 1)
+        resized = image.resize((int(image_width * scale), int(image_height * scale)), Image.LANCZOS)
+        canvas.paste(resized, ((width - resized.width) // 2, (height - resized.height) // 2))
+        image = canvas
+    # What the quantizer then did to read the pixels
+    return np.asarray(image.convert("RGB"))
+
+
+def pipeline_path(png, path):
+    return np.asarray(fit_frame(load_frame(png), *PANEL_SIZE))[..., :3]
+
+
+PATHS = {"legacy": legacy_path, "pipeline": pipeline_path}
+
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), min(timings)
+
+
+def peak_rss_kb(reset=False):
+    """Peak resident set size of this process in kilobytes, optionally reset to the current size first."""
+    if reset:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+
+
+def run_child(path_name, png_path, repeat):
+    """Run one path in this process and print its timings and peak memory growth as JSON."""
+    with open(png_path, "rb") as f:
+        png = f.read()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "screenshot.png")
+        before = peak_rss_kb(reset=True)
+        median, fastest = measure(lambda: PATHS[path_name](png, path), repeat)
+        peak_growth = peak_rss_kb() - before
+    print(json.dumps({"median_ms": median, "min_ms": fastest, "peak_rss_growth_kb": peak_growth}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--child", nargs=2, metavar=("PATH", "PNG"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child, args.repeat)
+        return
+
+    print(f"Screenshot to {PANEL_SIZE[0]}x{PANEL_SIZE[1]} RGB, {args.repeat} runs per path")
+    print(f"{'screenshot':<12}{'path':<10}{'median ms':>10}{'min ms':>10}{'peak RSS +KB':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for width, height in SIZES:
+            # Rendered here so the children only hold the encoded screenshot
+            png_path = os.path.join(directory, f"{width}x{height}.png")
+            with open(png_path, "wb") as f:
+                f.write(screenshot_png(width, height))
+
+            for path_name in PATHS:
+                output = subprocess.run(
+                    [sys.executable, __file__, "--repeat", str(args.repeat), "--child", path_name, png_path],
+                    capture_output=True, text=True, check=True
+                ).stdout
+                result = json.loads(output.splitlines()[-1])
+                print(f"{f'{width}x{height}':<12}{path_name:<10}{result['median_ms']:>10.2f}{result['min_ms']:>10.2f}{result['peak_rss_growth_kb']:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Per-frame palette quantization time on an 800x480 dashboard frame.
+
+Compares the path the Inky driver takes when it gets an RGBA image (Pillow
+quantize against the palette, with Floyd-Steinberg dithering) with the
+lookup-table quantizer in weather_frame.quantize.
+
+Run with: python benchmarks/bench_quantize.py
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from PIL import Image
+
+from weather_frame.forecast import Forecast
+from weather_frame.quantize import DITHER_MODES, PaletteQuantizer, blend_palette
+from weather_frame.renderer import FrameRenderer
+
+
+def sample_weather_data():
+    """Processed weather data with enough variation to exercise the whole layout."""
+    start = datetime(2025, 8, 12)
+    hours = [start + timedelta(hours=i) for i in range(48)]
+    days = [start + timedelta(days=i) for i in range(7)]
+    forecast = Forecast.from_open_meteo({
+        'latitude': 52.16,
+        'longitude': 4.49,
+        'current': {'time': "2025-08-12T14:00", 'temperature_2m': 21.5, 'weathercode': 2},
+        'hourly': {
+            'time': [hour.strftime("%Y-%m-%dT%H:%M") for hour in hours],
+            'temperature_2m': [16.0 + (i % 24) / 3 for i in range(48)],
+            'weathercode': [2] * 48,
+            'rain': [round((i % 7) / 5, 1) for i in range(48)],
+        },
+        'daily': {
+            'time': [day.strftime("%Y-%m-%d") for day in days],
+            'temperature_2m_max': [22.0, 23.5, 24.0, 21.0, 20.5, 22.0, 23.0],
+            'temperature_2m_min': [16.0, 17.0, 18.0, 15.0, 14.5, 16.0, 17.0],
+            'weathercode': [0, 2, 45, 61, 71, 95, 55],
+        },
+    })
+    return {'forecast': forecast, 'current_hour_index': forecast.current_hour_index(), 'location': "Leiden"}
+
+
+def driver_quantize(image, palette):
+    """What inky's set_image does with a non-palette image."""
+    palette_image = Image.new("P", (1, 1))
+    palette_image.putpalette([channel for color in palette for channel in color] + [0, 0, 0] * 249)
+    return image.convert("RGB").quantize(palette=palette_image)
+
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    frame = FrameRenderer().render(sample_weather_data()).convert("RGBA")
+    palette = blend_palette(0.0)
+
+    results = {"driver (Pillow quantize)": measure(lambda: driver_quantize(frame, palette), args.repeat)}
+
+    start = time.perf_counter()
+    PaletteQuantizer(palette)
+    lut_build = (time.perf_counter() - start) * 1000
+
+    for dither in DITHER_MODES:
+        quantizer = PaletteQuantizer(palette, dither=dither)
+        results[f"lut, dither={dither}"] = measure(lambda: quantizer.quantize(frame), args.repeat)
+
+    print(f"800x480 frame, {args.repeat} runs, lookup table built once in {lut_build:.1f} ms")
+    print(f"{'path':<34}{'median ms':>10}{'min ms':>10}")
+    for name, (median, fastest) in results.items():
+        print(f"{name:<34}{median:>10.2f}{fastest:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Latency and throughput of the refresh path, fully offline.
+
+Forecasts come from a local Open-Meteo stand-in (benchmarks/open_meteo_stub.py)
+in six sizes: 1, 7 and 16 days, with hourly data only or with 15-minute data
+as well. Measured per size: fetch_weather, process_weather_data, the / route
+(first render, stored render and 304 revalidation) and an end-to-end refresh
+cycle; plus the DisplayService crop/resize of a browser screenshot.
+
+Results are written as JSON so runs on different commits can be compared:
+
+    python benchmarks/bench_refresh.py --output before.json
+    python benchmarks/bench_refresh.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from functools import partial
+
+# Keep the display service away from the panel driver
+os.environ.setdefault("DEBUG_MODE", "1")
+
+from PIL import Image
+
+from open_meteo_stub import OpenMeteoStub
+from weather_frame.config.api_config import PARAMS
+from weather_frame.display_service import DisplayService
+from weather_frame.image_pipeline import fit_frame
+from weather_frame.refresh_pipeline import RefreshPipeline
+from weather_frame.weather_service import WeatherService
+
+SIZES = [(days, minutely_15) for days in (1, 7, 16) for minutely_15 in (False, True)]
+LOCATIONS = {'bench': {'latitude': 52.16, 'longitude': 4.49, 'name': "Leiden"}}
+
+
+def size_name(days, minutely_15):
+    return f"{days}d_{'15min' if minutely_15 else 'hourly'}"
+
+
+def request_params(days, minutely_15):
+    # The full hourly series of every day, to see how cost grows with forecast length
+    params = {key: value for key, value in PARAMS.items() if key != 'forecast_hours'}
+    params['forecast_days'] = days
+    if minutely_15:
+        params['minutely_15'] = PARAMS['hourly']
+    return params
+
+
+def measure(function, repeat, warmup=1):
+    """Run function repeatedly and summarize the timings in milliseconds."""
+    for _ in range(warmup):
+        function()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    median = statistics.median(timings)
+    return {
+        'median_ms': round(median, 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        'min_ms': round(timings[0], 3),
+        'ops_per_s': round(1000 / median, 1) if median else None,
+        'runs': repeat,
+    }
+
+
+def bench_service(stub, results, repeat):
+    service = WeatherService(locations=LOCATIONS)
+    for days, minutely_15 in SIZES:
+        name = size_name(days, minutely_15)
+        params = request_params(days, minutely_15)
+        results[f"fetch_weather[{name}]"] = measure(lambda: service.fetch_weather(stub.url, params), repeat)
+
+        data = service.fetch_weather(stub.url, params)
+        results[f"process_weather_data[{name}]"] = measure(lambda: service.process_weather_data(data), repeat)
+
+
+def bench_route(stub, results, repeat, cache_dir):
+    from weather_frame.main import create_app
+
+    service = WeatherService(locations=LOCATIONS)
+    app = create_app(service, DisplayService(service, cache_dir=cache_dir), start=False)
+    client = app.test_client()
+    rendered_dashboards = app.extensions['weather_frame']['rendered_dashboards']
+    for days, minutely_15 in SIZES:
+        name = size_name(days, minutely_15)
+        service.caches['bench'] = service.process_weather_data(
+            service.fetch_weather(stub.url, request_params(days, minutely_15))
+        )
+
+        def first_render():
+            rendered_dashboards.clear()
+            assert client.get("/").status_code == 200
+
+        results[f"route_first_render[{name}]"] = measure(first_render, repeat)
+        results[f"route_stored_render[{name}]"] = measure(lambda: client.get("/"), repeat)
+        etag = client.get("/").headers['ETag']
+        results[f"route_not_modified[{name}]"] = measure(lambda: client.get("/", headers={'If-None-Match': etag}), repeat)
+
+
+def bench_crop_resize(results, repeat):
+    # A screenshot at --force-device-scale-factor=2 of the 820x520 window
+    screenshot = Image.new("RGBA", (1640, 1040), (255, 255, 255, 255))
+
+    def crop_resize():
+        fit_frame(screenshot, 800, 480)
+
+    results["crop_resize[1640x1040->800x480]"] = measure(crop_resize, repeat)
+
+
+def bench_refresh(stub, results, repeat, cache_dir):
+    for days, minutely_15 in SIZES:
+        service = WeatherService(locations=LOCATIONS)
+        service.fetch_weather = partial(service.fetch_weather, stub.url)
+        service._request_params = lambda: request_params(days, minutely_15)
+        display_service = DisplayService(service, render_mode="native", cache_dir=cache_dir)
+        pipeline = RefreshPipeline(service, display_service)
+        pipeline.start()
+
+        def refresh():
+            pipeline.trigger(force=True)
+            pipeline.wait()
+
+        try:
+            results[f"refresh_cycle[{size_name(days, minutely_15)}]"] = measure(refresh, max(3, repeat // 4))
+        finally:
+            pipeline.stop()
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)['results']
+
+    print(f"\n{'benchmark':<44}{'before ms':>11}{'after ms':>11}{'change':>9}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]['median_ms'], result['median_ms']
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{name:<44}{before:>11.3f}{after:>11.3f}{change:>+8.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--skip", nargs="*", default=[], choices=["service", "route", "crop_resize", "refresh"])
+    args = parser.parse_args()
+
+    results = {}
+    # Icon atlas and frames go to a scratch directory, not the app's cache
+    with OpenMeteoStub() as stub, tempfile.TemporaryDirectory() as cache_dir:
+        if "service" not in args.skip:
+            bench_service(stub, results, args.repeat)
+        if "route" not in args.skip:
+            bench_route(stub, results, args.repeat, cache_dir)
+        if "crop_resize" not in args.skip:
+            bench_crop_resize(results, args.repeat)
+        if "refresh" not in args.skip:
+            bench_refresh(stub, results, args.repeat, cache_dir)
+
+    print(f"{'benchmark':<44}{'median ms':>11}{'p95 ms':>10}{'ops/s':>10}")
+    for name, result in results.items():
+        print(f"{name:<44}{result['median_ms']:>11.3f}{result['p95_ms']:>10.3f}{result['ops_per_s'] or 0:>10.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                'commit': git_commit(),
+                'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+                'python': sys.version.split()[0],
+                'machine': platform.machine(),
+                'repeat': args.repeat,
+                'results': results,
+            }, f, indent=2)
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
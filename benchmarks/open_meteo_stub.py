@@ -0,0 +1,121 @@
+"""Local stand-in for the Open-Meteo forecast API, for offline benchmarks.
+
+Responses have the layout of recorded Open-Meteo answers for the variables in
+weather_frame.config.api_config.PARAMS and are generated deterministically, so
+every run serves the same bytes. The forecast length follows the forecast_days
+and forecast_hours query parameters and a minutely_15 block is added when it
+is requested. Responses are gzip compressed when the client accepts it and
+connections are kept alive, like the real API.
+Comma-separated coordinates are answered with a list, like the real API.
+"""
+import gzip
+import json
+import math
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from urllib.parse import parse_qs, urlparse
+
+START = datetime(2025, 8, 12)
+WEATHERCODES = [0, 1, 2, 3, 45, 51, 61, 63, 71, 80, 95]
+
+
+def _series(count, step, start=START):
+    times = [(start + i * step).strftime("%Y-%m-%dT%H:%M") for i in range(count)]
+    hours = [i * step.total_seconds() / 3600 for i in range(count)]
+    return {
+        'time': times,
+        'temperature_2m': [round(17.0 + 5 * math.sin((hour - 9) / 24 * 2 * math.pi) + hour / 96, 1) for hour in hours],
+        'weathercode': [WEATHERCODES[int(hour // 5) % len(WEATHERCODES)] for hour in hours],
+        'rain': [round(max(0.0, 1.5 * math.sin(hour / 7)), 1) for hour in hours],
+    }
+
+
+def generate_response(days=7, minutely_15=False, latitude=52.16, longitude=4.49, hours=None):
+    """Open-Meteo response for a forecast of `days` days, optionally with 15-minute data.
+
+    With `hours`, the hourly data covers that many hours from the current hour instead.
+    """
+    response = {
+        'latitude': latitude,
+        'longitude': longitude,
+        'generationtime_ms': 0.1,
+        'utc_offset_seconds': 7200,
+        'timezone': "Europe/Amsterdam",
+        'timezone_abbreviation': "CEST",
+        'elevation': 0.0,
+        'current_units': {'time': "iso8601", 'interval': "seconds", 'temperature_2m': "°C", 'weathercode': "wmo code"},
+        'current': {'time': "2025-08-12T14:15", 'interval': 900, 'temperature_2m': 21.5, 'weathercode': 2},
+        'hourly_units': {'time': "iso8601", 'temperature_2m': "°C", 'weathercode': "wmo code", 'rain': "mm"},
+        'hourly': _series(hours, timedelta(hours=1), START + timedelta(hours=14)) if hours else _series(days * 24, timedelta(hours=1)),
+        'daily_units': {'time': "iso8601", 'temperature_2m_max': "°C", 'temperature_2m_min': "°C", 'weathercode': "wmo code"},
+        'daily': {
+            'time': [(START + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)],
+            'temperature_2m_max': [round(22.0 + (i % 4) * 0.5, 1) for i in range(days)],
+            'temperature_2m_min': [round(14.0 + (i % 3) * 0.5, 1) for i in range(days)],
+            'weathercode': [WEATHERCODES[i % len(WEATHERCODES)] for i in range(days)],
+        },
+    }
+    if minutely_15:
+        response['minutely_15_units'] = response['hourly_units']
+        response['minutely_15'] = _series(days * 96, timedelta(minutes=15))
+    return response
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; don't let them wait on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        days = int(query.get('forecast_days', ["7"])[0])
+        hours = int(query['forecast_hours'][0]) if 'forecast_hours' in query else None
+        minutely_15 = 'minutely_15' in query
+        latitudes = query.get('latitude', ["52.16"])[0].split(',')
+        longitudes = query.get('longitude', ["4.49"])[0].split(',')
+
+        compressed = 'gzip' in self.headers.get('Accept-Encoding', '')
+
+        key = (days, hours, minutely_15, tuple(latitudes), tuple(longitudes), compressed)
+        body = self.server.responses.get(key)
+        if body is None:
+            responses = [generate_response(days, minutely_15, float(lat), float(lon), hours) for lat, lon in zip(latitudes, longitudes)]
+            body = json.dumps(responses if len(responses) > 1 else responses[0]).encode()
+            if compressed:
+                body = gzip.compress(body)
+            self.server.responses[key] = body
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if compressed:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class OpenMeteoStub:
+    """Serve generated Open-Meteo responses on localhost from a background thread.
+
+    Use as a context manager; `url` is the forecast endpoint to pass to fetch_weather.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.responses = {}
+        self.url = f"http://{host}:{self.server.server_address[1]}/v1/forecast"
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+        self._thread.join()
@@ -0,0 +1,275 @@
+import base64
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import threading
+
+from weather_frame import logger
+
+BROWSER_EXECUTABLES = ['chromium-browser', 'chromium', 'google-chrome']
+BROWSER_ARGS = [
+    '--headless',
+    '--disable-gpu',
+    '--no-sandbox',
+    '--disable-software-rasterizer',
+    '--disable-dev-shm-usage',
+    '--disable-features=UseDBus',
+    '--hide-scrollbars',
+    '--no-first-run',
+    '--no-default-browser-check',
+    # Talk DevTools protocol over fd 3 (commands) and fd 4 (responses)
+    '--remote-debugging-pipe',
+]
+
+# Resolves once the page has painted its next frame, so the chart is drawn
+WAIT_FOR_PAINT = "new Promise(resolve => requestAnimationFrame(() => requestAnimationFrame(resolve)))"
+
+
+def find_browser():
+    """Find a Chromium executable on the PATH."""
+    for name in BROWSER_EXECUTABLES:
+        path = shutil.which(name)
+        if path:
+            return path
+    raise FileNotFoundError(f"No Chromium executable found, tried: {', '.join(BROWSER_EXECUTABLES)}")
+
+
+class BrowserWorker:
+    """A long-lived headless Chromium that is reused for every screenshot.
+
+    The browser is started once and driven over the DevTools protocol using
+    Chromium's --remote-debugging-pipe, so no port or websocket library is
+    needed. Screenshots are returned as PNG bytes without touching the disk.
+    If the browser crashes or stops responding it is restarted on the next
+    screenshot.
+    """
+
+    def __init__(self, url, width, height, executable=None, timeout=30):
+        self.url = url
+        self.width = width
+        self.height = height
+        self.executable = executable
+        self.timeout = timeout
+
+        self._process = None
+        self._write_fd = None
+        self._read_fd = None
+        self._reader = None
+        self._session_id = None
+        self._page_loaded = False
+
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._load_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def is_running(self):
+        """Check whether the browser process is alive."""
+        return self._process is not None and self._process.poll() is None
+
+    def is_healthy(self):
+        """Check whether the browser is alive and answers protocol commands."""
+        if not self.is_running():
+            return False
+        try:
+            self._send('Browser.getVersion', timeout=5)
+            return True
+        except Exception as e:
+            logger.warning(f"Browser health check failed: {e}")
+            return False
+
+    def start(self):
+        """Start the browser and open a page with the configured viewport."""
+        import fcntl
+
+        executable = self.executable or find_browser()
+
+        command_read, command_write = os.pipe()
+        response_read, response_write = os.pipe()
+
+        def attach_pipes():
+            # Move the pipe ends out of the way first so dup2 cannot clobber them
+            child_read = fcntl.fcntl(command_read, fcntl.F_DUPFD_CLOEXEC, 10)
+            child_write = fcntl.fcntl(response_write, fcntl.F_DUPFD_CLOEXEC, 10)
+            os.dup2(child_read, 3)
+            os.dup2(child_write, 4)
+
+        self._process = subprocess.Popen(
+            [executable, *BROWSER_ARGS, 'about:blank'],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            close_fds=False,
+            preexec_fn=attach_pipes,
+        )
+        os.close(command_read)
+        os.close(response_write)
+        self._write_fd = command_write
+        self._read_fd = response_read
+        self._page_loaded = False
+
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+        target_id = self._send('Target.createTarget', {'url': 'about:blank'})['targetId']
+        self._session_id = self._send('Target.attachToTarget', {'targetId': target_id, 'flatten': True})['sessionId']
+        self._send('Page.enable', session_id=self._session_id)
+        self.set_viewport(self.width, self.height)
+
+        logger.info(f"Started headless browser (pid {self._process.pid})")
+
+    def stop(self):
+        """Stop the browser and release the pipes."""
+        if self._process is not None:
+            if self._process.poll() is None:
+                try:
+                    self._send('Browser.close', timeout=5)
+                    self._process.wait(timeout=5)
+                except Exception:
+                    self._process.kill()
+                    self._process.wait()
+            self._process = None
+
+        # The reader sees end-of-file once the browser has exited
+        if self._reader is not None:
+            self._reader.join(timeout=5)
+            self._reader = None
+
+        for fd in (self._write_fd, self._read_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._write_fd = None
+        self._read_fd = None
+        self._session_id = None
+        self._fail_pending("Browser stopped")
+
+    def restart(self):
+        """Restart the browser."""
+        self.stop()
+        self.start()
+
+    def set_viewport(self, width, height):
+        """Set the size of the page viewport in CSS pixels."""
+        self.width = width
+        self.height = height
+        if self._session_id and self.is_running():
+            self._send('Emulation.setDeviceMetricsOverride', {
+                'width': width,
+                'height': height,
+                'deviceScaleFactor': 1,
+                'mobile': False,
+            }, session_id=self._session_id)
+
+    def screenshot(self):
+        """Load the dashboard and take a screenshot.
+
+        The page is navigated to on first use and reloaded afterwards. The
+        browser is (re)started when needed, and restarted once if the
+        screenshot fails.
+
+        Returns:
+            PNG image bytes
+        """
+        with self._lock:
+            try:
+                return self._screenshot()
+            except Exception as e:
+                logger.warning(f"Screenshot failed, restarting browser: {e}")
+                self.restart()
+                return self._screenshot()
+
+    def _screenshot(self):
+        if not self.is_running():
+            self.restart()
+
+        self._load_event.clear()
+        if self._page_loaded:
+            self._send('Page.reload', {'ignoreCache': True}, session_id=self._session_id)
+        else:
+            self._send('Page.navigate', {'url': self.url}, session_id=self._session_id)
+        if not self._load_event.wait(self.timeout):
+            raise TimeoutError(f"Timed out loading {self.url}")
+        self._page_loaded = True
+
+        self._send('Runtime.evaluate', {'expression': WAIT_FOR_PAINT, 'awaitPromise': True}, session_id=self._session_id)
+        result = self._send('Page.captureScreenshot', {
+            'format': 'png',
+            'clip': {'x': 0, 'y': 0, 'width': self.width, 'height': self.height, 'scale': 1},
+        }, session_id=self._session_id)
+        return base64.b64decode(result['data'])
+
+    def _send(self, method, params=None, session_id=None, timeout=None):
+        """Send a protocol command and wait for its result."""
+        if self._write_fd is None:
+            raise RuntimeError("Browser is not running")
+
+        message_id = next(self._ids)
+        message = {'id': message_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+
+        waiter = {'event': threading.Event(), 'response': None}
+        with self._pending_lock:
+            self._pending[message_id] = waiter
+
+        try:
+            data = json.dumps(message).encode() + b'\0'
+            while data:
+                written = os.write(self._write_fd, data)
+                data = data[written:]
+
+            if not waiter['event'].wait(timeout or self.timeout):
+                raise TimeoutError(f"Timed out waiting for {method}")
+        finally:
+            with self._pending_lock:
+                self._pending.pop(message_id, None)
+
+        response = waiter['response']
+        if 'error' in response:
+            raise RuntimeError(f"{method} failed: {response['error'].get('message')}")
+        return response.get('result', {})
+
+    def _read_loop(self):
+        """Read null-separated protocol messages from the browser."""
+        read_fd = self._read_fd
+        buffer = b''
+        while True:
+            try:
+                chunk = os.read(read_fd, 65536)
+            except OSError:
+                break
+            if not chunk:
+                break
+
+            buffer += chunk
+            *messages, buffer = buffer.split(b'\0')
+            for raw in messages:
+                self._dispatch(json.loads(raw))
+
+        self._fail_pending("Browser pipe closed")
+
+    def _dispatch(self, message):
+        if 'id' in message:
+            with self._pending_lock:
+                waiter = self._pending.get(message['id'])
+            if waiter:
+                waiter['response'] = message
+                waiter['event'].set()
+        elif message.get('method') == 'Page.loadEventFired':
+            self._load_event.set()
+        elif message.get('method') in ('Inspector.targetCrashed', 'Target.targetCrashed'):
+            logger.error("Browser page crashed")
+            self._page_loaded = False
+
+    def _fail_pending(self, reason):
+        """Wake up all commands still waiting for a response."""
+        with self._pending_lock:
+            for waiter in self._pending.values():
+                waiter['response'] = {'error': {'message': reason}}
+                waiter['event'].set()
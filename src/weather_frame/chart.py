@@ -0,0 +1,119 @@
+import math
+from dataclasses import dataclass, field
+from xml.sax.saxutils import escape
+
+# Size of the chart below the "Voorspelling per uur" title, in CSS pixels of the 800x480 page
+CHART_WIDTH = 524
+CHART_HEIGHT = 200
+
+TEMPERATURE_COLOR = "#f37106"
+RAIN_COLOR = "#0067dd"
+TEMPERATURE_WIDTH = 6
+RAIN_WIDTH = 5
+TEMPERATURE_LABEL_SIZE = 22
+RAIN_LABEL_SIZE = 20
+HOUR_LABEL_SIZE = 16
+FONT_FAMILY = "Liberation Sans, Arial, sans-serif"
+# Rain axis labels are spread by the first step in mm that needs no more than MAX_RAIN_TICKS of them
+RAIN_TICK_STEPS = (1, 2, 5, 10, 20, 50, 100)
+MAX_RAIN_TICKS = 5
+
+
+@dataclass
+class ChartGeometry:
+    """Positions of everything in the hourly chart, in chart pixels from the top left."""
+    width: int
+    height: int
+    temperature: list = field(default_factory=list)
+    rain: list = field(default_factory=list)
+    # (y, label) of the rain axis on the right, drawn from x = rain_axis_x
+    rain_ticks: list = field(default_factory=list)
+    rain_axis_x: float = 0.0
+    # (x, baseline y, label) above every third temperature point
+    temperature_labels: list = field(default_factory=list)
+    # (x, top y, label) below every third point
+    hour_labels: list = field(default_factory=list)
+
+
+def hourly_chart_geometry(hourly, width=CHART_WIDTH, height=CHART_HEIGHT):
+    """Lay out the temperature and rain lines of an hourly window.
+
+    The layout follows the Chart.js chart the dashboard used to draw: 30px
+    padding on top, 45px for the hour labels below, 25px on the left and the
+    rain axis labels on the right.
+
+    Args:
+        hourly: TimeSeries window to draw
+        width: Chart width in pixels
+        height: Chart height in pixels
+
+    Returns:
+        ChartGeometry, without lines when there are fewer than two points
+    """
+    geometry = ChartGeometry(width, height)
+    times, temperatures, rainfall = hourly.time, hourly.temperature, hourly.rain
+    if len(temperatures) < 2:
+        return geometry
+
+    rain_label_width = 70
+    area_left = 25
+    area_right = width - 10 - rain_label_width
+    area_top = 30
+    area_bottom = height - 45
+
+    step = (area_right - area_left) / (len(temperatures) - 1)
+    xs = [area_left + i * step for i in range(len(temperatures))]
+
+    temp_min, temp_max = min(temperatures), max(temperatures)
+    if temp_max - temp_min < 2:
+        temp_min, temp_max = temp_min - 1, temp_max + 1
+    rain_max = max(2.0, max(rainfall))
+    rain_step = next((step for step in RAIN_TICK_STEPS if math.ceil(rain_max / step) + 1 <= MAX_RAIN_TICKS), RAIN_TICK_STEPS[-1])
+    # The axis ends at a labelled tick
+    rain_max = math.ceil(rain_max / rain_step) * rain_step
+
+    def temp_y(value):
+        return area_bottom - (value - temp_min) / (temp_max - temp_min) * (area_bottom - area_top)
+
+    def rain_y(value):
+        return area_bottom - value / rain_max * (area_bottom - area_top)
+
+    geometry.temperature = [(x, temp_y(value)) for x, value in zip(xs, temperatures)]
+    geometry.rain = [(x, rain_y(value)) for x, value in zip(xs, rainfall)]
+    geometry.rain_axis_x = area_right + 8
+    geometry.rain_ticks = [(rain_y(tick), f"{tick:.1f} mm") for tick in range(0, int(rain_max) + 1, rain_step)]
+    for i in range(0, len(temperatures), 3):
+        geometry.temperature_labels.append((xs[i], temp_y(temperatures[i]) - 12, f"{temperatures[i]:.1f}°"))
+        geometry.hour_labels.append((xs[i], area_bottom + 8, f"{times[i] // 3600 % 24}:00"))
+    return geometry
+
+
+def render_chart_svg(hourly, width=CHART_WIDTH, height=CHART_HEIGHT):
+    """Render the hourly chart as a standalone SVG document.
+
+    Args:
+        hourly: TimeSeries window to draw
+
+    Returns:
+        SVG markup as a string, scaling to the width of its container
+    """
+    geometry = hourly_chart_geometry(hourly, width, height)
+
+    def points(line):
+        return " ".join(f"{x:.1f},{y:.1f}" for x, y in line)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" width="100%" height="{height}" '
+        f'font-family="{FONT_FAMILY}" font-weight="bold" fill="#000000">'
+    ]
+    for y, label in geometry.rain_ticks:
+        parts.append(f'<text x="{geometry.rain_axis_x:.1f}" y="{y:.1f}" font-size="{RAIN_LABEL_SIZE}" dominant-baseline="middle">{escape(label)}</text>')
+    if geometry.rain:
+        parts.append(f'<polyline points="{points(geometry.rain)}" fill="none" stroke="{RAIN_COLOR}" stroke-width="{RAIN_WIDTH}" stroke-linejoin="round"/>')
+        parts.append(f'<polyline points="{points(geometry.temperature)}" fill="none" stroke="{TEMPERATURE_COLOR}" stroke-width="{TEMPERATURE_WIDTH}" stroke-linejoin="round"/>')
+    for x, y, label in geometry.temperature_labels:
+        parts.append(f'<text x="{x:.1f}" y="{y:.1f}" font-size="{TEMPERATURE_LABEL_SIZE}" text-anchor="middle">{escape(label)}</text>')
+    for x, y, label in geometry.hour_labels:
+        parts.append(f'<text x="{x:.1f}" y="{y:.1f}" font-size="{HOUR_LABEL_SIZE}" text-anchor="middle" dominant-baseline="hanging">{escape(label)}</text>')
+    parts.append('</svg>')
+    return "\n".join(parts)
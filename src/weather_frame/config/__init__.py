@@ -1,3 +1,5 @@
 from pathlib import Path
 
-CONFIG_PATH = Path(__file__).resolve().parent / 'logging_config.json'
\ No newline at end of file
+CONFIG_PATH = Path(__file__).resolve().parent / 'logging_config.json'
+# Persistent caches that should survive a restart
+CACHE_DIR = Path(__file__).resolve().parent.parent / 'cache'
@@ -5,5 +5,19 @@ PARAMS = {
     "current": "temperature_2m,weathercode",
     "hourly": "temperature_2m,weathercode,rain",
     "daily": "temperature_2m_max,temperature_2m_min,weathercode",
-    "timezone": "auto"
+    "timezone": "auto",
+    # Only what is used: 7 daily cards, and hourly data from the current hour on for
+    # the 21 hour chart and the 48 hours kept in the forecast history
+    "forecast_days": 7,
+    "forecast_hours": 48
 }
+
+# Locations to forecast, keyed by the id used in ?location= on the dashboard. All
+# of them are fetched with a single request; a "name" skips the reverse geocoding.
+LOCATIONS = {
+    "home": {"latitude": PARAMS["latitude"], "longitude": PARAMS["longitude"]},
+}
+
+# Language of the reverse geocoded location name, and the name shown when the lookup fails
+LOCATION_LANGUAGE = "nl"
+DEFAULT_LOCATION = "Leiden"
@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+
+from weather_frame.forecast import CurrentConditions, Forecast, TimeSeries
+from weather_frame.utils import format_date_nl, format_day_abbr_nl, get_weather_icon
+
+# Hours in the hourly chart and daily cards below it
+HOURS_SHOWN = 21
+DAYS_SHOWN = 7
+
+
+@dataclass
+class DayCard:
+    name: str
+    weathercode: int
+    icon: str
+    temperature_max: float
+    temperature_min: float
+
+
+@dataclass
+class DashboardView:
+    """The part of a forecast the dashboard shows, with its labels formatted.
+
+    Built once per fetch, so the page, the SVG chart and the native renderer
+    work on 21 hours and 7 days instead of slicing the full series on every
+    render. The full series stay available in the Forecast for other consumers,
+    such as the forecast history.
+    """
+    current: CurrentConditions
+    current_icon: str
+    formatted_date: str
+    hourly: TimeSeries
+    cards: list
+
+    @classmethod
+    def from_forecast(cls, forecast: Forecast, current_hour_index: int) -> "DashboardView":
+        # The cards start at the day of the current conditions
+        daily = forecast.daily.window(forecast.daily.index_at(forecast.current.time), DAYS_SHOWN)
+        return cls(
+            current=forecast.current,
+            current_icon=get_weather_icon(forecast.current.weathercode),
+            # Dutch labels, formatted once here instead of on every page view
+            formatted_date=format_date_nl(forecast.current.local_datetime),
+            hourly=forecast.hourly.window(current_hour_index, HOURS_SHOWN),
+            cards=[
+                DayCard(
+                    name=format_day_abbr_nl(day),
+                    weathercode=daily.weathercode[i],
+                    icon=get_weather_icon(daily.weathercode[i]),
+                    temperature_max=daily.temperature_max[i],
+                    temperature_min=daily.temperature_min[i],
+                )
+                for i, day in enumerate(daily.dates())
+            ],
+        )
+
+
+def dashboard_view(weather_data):
+    """The DashboardView of processed weather data, projecting it when it has none."""
+    view = weather_data.get('view')
+    if view is None:
+        view = DashboardView.from_forecast(weather_data['forecast'], weather_data.get('current_hour_index', 0))
+    return view
@@ -1,84 +1,110 @@
 import os
 import platform
 import subprocess
-from threading import Thread
+from datetime import timedelta
+from io import BytesIO
+from threading import Lock, Thread, current_thread, main_thread
 
+import numpy as np
 from PIL import Image
 
 from weather_frame import logger
+from weather_frame.browser_worker import BrowserWorker
+from weather_frame.config import CACHE_DIR
+from weather_frame.forecast_cache import atomic_write
+from weather_frame.frame_diff import FrameDiff
+from weather_frame.frame_queue import FRAME_QUEUE_HOURS, FrameQueue, hourly_weather_data
+from weather_frame.icon_atlas import IconAtlas
+from weather_frame.image_pipeline import fit_frame, load_frame
+from weather_frame.metrics import metrics
+from weather_frame.panels import PANELS, PanelFanOut, parse_panels
+from weather_frame.quantize import PaletteQuantizer, blend_palette
+from weather_frame.renderer import BASE_HEIGHT, BASE_WIDTH, FrameRenderer
 
 DEBUG_MODE = os.environ.get("DEBUG_MODE", "0") == "1" or platform.system() == "Windows"
-
-if not DEBUG_MODE:
-    from inky.auto import auto
+# "native" draws the frame with Pillow, "browser" screenshots the dashboard with headless Chromium
+RENDER_MODE = os.environ.get("RENDER_MODE", "native")
+DASHBOARD_URL = "http://localhost:8080"
+# "none", "ordered" or "floyd-steinberg"
+DITHER_MODE = os.environ.get("DITHER_MODE", "none")
+# Fraction of pixels that must change before the panel is refreshed
+REFRESH_THRESHOLD = float(os.environ.get("REFRESH_THRESHOLD", "0.001"))
+# Refresh at least this often regardless of changes, to clear ghosting
+MAX_REFRESH_INTERVAL = timedelta(hours=float(os.environ.get("MAX_REFRESH_INTERVAL_HOURS", "6")))
 
 class DisplayService:
-    def __init__(self):
-        self.screenshots_dir = os.path.join(os.path.dirname(__file__), 'screenshots')
-        os.makedirs(self.screenshots_dir, exist_ok=True)
-        self.screenshot_path = os.path.join(self.screenshots_dir, 'screenshot.png')
-        
-        # Initialize inky display if not in debug mode
-        if not DEBUG_MODE:
-            self.inky = auto(ask_user=True, verbose=True)
-        else:
-            self.inky = None
-    
-    @staticmethod
-    def _crop_image(image, target_width, target_height):
-        """Crop image from right and bottom to match target dimensions.
-        
-        Args:
-            image: PIL Image object
-            target_width: Desired width
-            target_height: Desired height
-            
-        Returns:
-            Cropped PIL Image
+    def __init__(self, weather_service=None, render_mode=RENDER_MODE, dither_mode=DITHER_MODE, location_id=None, panels=PANELS,
+                 frame_queue_hours=FRAME_QUEUE_HOURS, cache_dir=CACHE_DIR, keep_last_frame=False):
         """
-        img_width, img_height = image.size
-        
-        width_to_use = min(img_width, target_width)
-        height_to_use = min(img_height, target_height)
-        
-        if width_to_use != img_width or height_to_use != img_height:
-            return image.crop((0, 0, width_to_use, height_to_use))
-        return image
-
-    @staticmethod
-    def _resize_image(image, target_width, target_height):
-        """Resize image to fill target dimensions if it's too small in any dimension.
-        Maintains aspect ratio and centers the content.
-        
         Args:
-            image: PIL Image object
-            target_width: Desired width
-            target_height: Desired height
-            
-        Returns:
-            Resized PIL Image
+            cache_dir: Directory for the icon atlas, frame queue and last frame
+            keep_last_frame: Save every shown frame to show it again right after power-on;
+                only needed when starting in first-frame mode, as it writes on every refresh
         """
-        img_width, img_height = image.size
-        
-        if img_width < target_width or img_height < target_height:
-            resized_image = Image.new('RGBA', (target_width, target_height), (255, 255, 255, 255))
-            
-            scale_width = target_width / img_width if img_width < target_width else 1
-            scale_height = target_height / img_height if img_height < target_height else 1
-            
-            scale = min(scale_width, scale_height)
-            
-            new_width = int(img_width * scale)
-            new_height = int(img_height * scale)
-            
-            resized_content = image.resize((new_width, new_height), Image.LANCZOS)
-            
-            paste_x = (target_width - new_width) // 2
-            paste_y = (target_height - new_height) // 2
-            resized_image.paste(resized_content, (paste_x, paste_y))
-            
-            return resized_image
-        return image
+        self.weather_service = weather_service
+        # Location shown on this panel (default: the first configured location)
+        self.location_id = location_id
+        self.dashboard_url = f"{DASHBOARD_URL}/?location={location_id}" if location_id else DASHBOARD_URL
+        self.render_mode = render_mode
+        self.dither_mode = dither_mode
+        self.quantizers = {}
+        self.frame_diff = FrameDiff(REFRESH_THRESHOLD, MAX_REFRESH_INTERVAL)
+        self.screenshots_dir = os.path.join(os.path.dirname(__file__), 'screenshots')
+        os.makedirs(self.screenshots_dir, exist_ok=True)
+        self.screenshot_path = os.path.join(self.screenshots_dir, 'screenshot.png')
+        self.frame_path = os.path.join(self.screenshots_dir, 'frame.png')
+        self.cache_dir = cache_dir
+        # Last frame shown on the panel, to show again right after power-on
+        self.last_frame_path = os.path.join(cache_dir, 'last_frame.png')
+        self.keep_last_frame = keep_last_frame
+        self.browser_worker = None
+        # PANELS setting; empty to drive only the auto-detected display
+        self.panels = panels
+        self._panel_fan_out = None
+        # Frames of the coming hours, shown when fetching fails; None when disabled
+        self.frame_queue_hours = frame_queue_hours
+        self.frame_queue = FrameQueue(os.path.join(cache_dir, 'frame_queue', location_id or 'default')) if frame_queue_hours else None
+        self._queue_lock = Lock()
+        self._queue_data = None
+        self._queue_thread = None
+        self._icon_atlas = None
+        self._inky = None
+        self._inky_detected = False
+        self._inky_lock = Lock()
+
+    @property
+    def inky(self):
+        """The Inky display, detected once on first use; None in debug mode or when none was found."""
+        if not self._inky_detected and not DEBUG_MODE:
+            with self._inky_lock:
+                if not self._inky_detected:
+                    try:
+                        from inky.auto import auto
+                        # Only ask for the display type on the console from the main thread, never from a request
+                        self._inky = auto(ask_user=current_thread() is main_thread(), verbose=True)
+                    except Exception as e:
+                        logger.error(f"No Inky display detected: {e}")
+                    self._inky_detected = True
+        return self._inky
+
+    @property
+    def panel_fan_out(self):
+        """Fan-out to the configured panels, set up on first use; None without PANELS."""
+        if self._panel_fan_out is None and self.panels:
+            panels = parse_panels(
+                self.panels, inky=lambda: self.inky,
+                output_dir=self.screenshots_dir if DEBUG_MODE else None,
+                frame_diff=lambda: FrameDiff(REFRESH_THRESHOLD, MAX_REFRESH_INTERVAL)
+            )
+            self._panel_fan_out = PanelFanOut(panels, dither_mode=self.dither_mode)
+        return self._panel_fan_out
+
+    @property
+    def icon_atlas(self):
+        """The icon atlas, loaded from disk on first use."""
+        if self._icon_atlas is None:
+            self._icon_atlas = IconAtlas(self.cache_dir)
+        return self._icon_atlas
     
     def display_screenshot(self, filepath, saturation=0.0):
         """Display a screenshot on the Inky Impression display.
@@ -91,61 +117,253 @@ class DisplayService:
             logger.info(f"Debug mode: Would display {filepath} on e-ink display")
             return
         
-        image = Image.open(filepath)
-        
+        with open(filepath, 'rb') as f:
+            self.display_image(f.read(), saturation=saturation)
+
+    def display_image(self, image, saturation=0.0, force=False):
+        """Display an image on the Inky Impression display.
+
+        The panel is only refreshed when the frame differs enough from the one
+        already shown, or when a refresh is forced.
+
+        Args:
+            image: PIL Image, encoded image bytes or RGB(A) array
+            saturation: Color saturation level (default: 0.0)
+            force: Refresh even if the frame did not change (default: False)
+
+        Returns:
+            True if the panel was (or in debug mode would have been) refreshed
+        """
+        image = load_frame(image)
         # Get display dimensions
-        target_width, target_height = self.inky.resolution
-        
-        # Process the image
-        image = self._crop_image(image, target_width, target_height)
-        image = self._resize_image(image, target_width, target_height)
+        target_width, target_height = self.inky.resolution if self.inky else image.size
+
+        quantizer, indices = self.prepare_frame(image, target_width, target_height, saturation)
+        return self._show_frame(quantizer, indices, force)
+
+    def _show_frame(self, quantizer, indices, force=False):
+        """Show quantized palette indices on the panel if they differ enough from the shown frame."""
+        refresh, reason = self.frame_diff.should_refresh(indices)
+        if force:
+            refresh, reason = True, "refresh forced"
+        if not refresh:
+            logger.info(f"Skipping display refresh: {reason}")
+            return False
+        logger.info(f"Refreshing display: {reason}")
+
+        if DEBUG_MODE or not self.inky:
+            logger.info("Debug mode: Would display frame on e-ink display")
+        else:
+            # Hand the driver a palette image so it skips its own per-pixel colour mapping
+            with metrics.timed("inky_show"):
+                self.inky.set_image(quantizer.to_image(indices))
+                self.inky.show()
 
+        self.frame_diff.mark_refreshed(indices)
+        if self.keep_last_frame:
+            self._save_last_frame(quantizer, indices)
+        return True
+
+    def _save_last_frame(self, quantizer, indices):
         try:
-            self.inky.set_image(image, saturation=saturation)
-        except TypeError:
-            self.inky.set_image(image)
+            buffer = BytesIO()
+            quantizer.to_image(indices).save(buffer, format='PNG')
+            atomic_write(self.last_frame_path, buffer.getvalue())
+        except OSError as e:
+            logger.error(f"Error saving last frame: {e}")
+
+    def show_last_frame(self):
+        """Show the last frame that was displayed, without any weather data or rendering.
+
+        The frame is already quantized, so it goes to the panel as is. It also
+        becomes the reference for the next refresh decision, so a first render
+        that matches it does not refresh the panel again.
+
+        Returns:
+            True if a saved frame was (or in debug mode would have been) shown
+        """
+        if not os.path.exists(self.last_frame_path):
+            return False
+
+        with Image.open(self.last_frame_path) as image:
+            image.load()
+        if self.inky and image.size != tuple(self.inky.resolution):
+            logger.info("Saved frame does not match the display resolution, skipping it")
+            return False
+
+        if DEBUG_MODE or not self.inky:
+            logger.info("Debug mode: Would display last frame on e-ink display")
+        else:
+            with metrics.timed("inky_show"):
+                self.inky.set_image(image)
+                self.inky.show()
 
-        self.inky.show()
+        self.frame_diff.mark_refreshed(np.asarray(image))
+        return True
+
+    def show_queued_frame(self, now=None, force=False):
+        """Show the frame rendered ahead for the current hour, without any weather data or rendering.
+
+        Args:
+            now: Naive local datetime (default: datetime.now())
+            force: Refresh even if the frame did not change (default: False)
+
+        Returns:
+            True if a queued frame was (or in debug mode would have been) shown
+        """
+        if self.frame_queue is None:
+            return False
+        queued = self.frame_queue.pop(now)
+        if queued is None:
+            logger.info("No queued frame for this hour")
+            return False
+
+        saturation, indices = queued
+        if self.inky and indices.shape != tuple(reversed(self.inky.resolution)):
+            logger.info("Queued frame does not match the display resolution, skipping it")
+            return False
+        logger.info("Showing the queued frame for this hour")
+        return self._show_frame(self._get_quantizer(saturation), indices, force)
+
+    def queue_frames(self, weather_data, saturation=0.0):
+        """Render the frames of the coming hours from weather data and store them in the frame queue.
+
+        Nothing is rendered when the queue already holds the frames of this data version.
+
+        Returns:
+            Number of frames queued
+        """
+        if self.frame_queue is None or self.frame_queue.data_version == weather_data['version']:
+            return 0
+
+        width, height = self.inky.resolution if self.inky else (BASE_WIDTH, BASE_HEIGHT)
+        quantizer = self._get_quantizer(saturation)
+        palette = blend_palette(saturation)
+        frames = []
+        # Timed as one batch, so these background renders stay out of the per-stage latencies of the refresh cycle
+        with metrics.timed("queue_frames"):
+            for timestamp, hour_data in hourly_weather_data(weather_data, self.frame_queue_hours):
+                image = FrameRenderer(width, height, self.icon_atlas, palette).render(hour_data)
+                frames.append((timestamp, quantizer.quantize(image)))
+            self.icon_atlas.save()
+            self.frame_queue.replace(weather_data['version'], width, height, saturation, frames)
+        logger.info(f"Queued {len(frames)} frames for the coming hours")
+        return len(frames)
+
+    def queue_frames_in_background(self, weather_data):
+        """Queue the frames of weather data on a background thread.
+
+        While frames are being rendered only the latest data waits its turn, so a
+        burst of updates renders at most one extra batch.
+        """
+        if self.frame_queue is None:
+            return
+        with self._queue_lock:
+            self._queue_data = weather_data
+            if self._queue_thread is None:
+                self._queue_thread = Thread(target=self._run_frame_queue, name="frame-queue", daemon=True)
+                self._queue_thread.start()
+
+    def _run_frame_queue(self):
+        while True:
+            with self._queue_lock:
+                weather_data, self._queue_data = self._queue_data, None
+                if weather_data is None:
+                    self._queue_thread = None
+                    return
+            try:
+                self.queue_frames(weather_data)
+            except Exception as e:
+                logger.error(f"Error queueing frames: {e}")
+
+    def prepare_frame(self, image, width, height, saturation=0.0):
+        """Crop, resize and quantize an image into a display-ready frame.
+
+        Args:
+            image: PIL Image, encoded image bytes or RGB(A) array
+            width: Panel width in pixels
+            height: Panel height in pixels
+            saturation: Color saturation level (default: 0.0)
+
+        Returns:
+            Tuple of the PaletteQuantizer used and the 2D array of palette indices
+        """
+        with metrics.timed("crop_resize"):
+            image = fit_frame(load_frame(image), width, height)
+
+        quantizer = self._get_quantizer(saturation)
+        with metrics.timed("quantize"):
+            return quantizer, quantizer.quantize(image)
+
+    def render_frame(self, weather_data, width, height, saturation=0.0, persist_icons=True):
+        """Render weather data natively at a panel resolution and quantize it.
+
+        Args:
+            persist_icons: Save icons rasterized for this frame in the on-disk icon
+                atlas; off for sizes and palettes requested over HTTP (default: True)
+
+        Returns:
+            Tuple of the PaletteQuantizer used and the 2D array of palette indices
+        """
+        with metrics.timed("render_frame"):
+            image = FrameRenderer(width, height, self.icon_atlas, blend_palette(saturation), persist_icons).render(weather_data)
+        if persist_icons:
+            self.icon_atlas.save()
+        return self.prepare_frame(image, width, height, saturation)
+
+    def _get_quantizer(self, saturation):
+        """Get the palette quantizer for a saturation level, building its lookup table once."""
+        if saturation not in self.quantizers:
+            self.quantizers[saturation] = PaletteQuantizer(blend_palette(saturation), dither=self.dither_mode)
+        return self.quantizers[saturation]
     
-    def take_screenshot_and_update_display(self):
-        """Take a screenshot of the weather dashboard using headless Chromium."""
+    def _get_browser_worker(self):
+        """Get the persistent headless browser, starting it on first use."""
+        if self.browser_worker is None:
+            self.browser_worker = BrowserWorker(self.dashboard_url, BASE_WIDTH, BASE_HEIGHT)
+        if not self.browser_worker.is_healthy():
+            self.browser_worker.restart()
+        return self.browser_worker
+
+    def _take_windows_screenshot(self):
+        """Take a screenshot with a one-off Chrome process and return it as PNG bytes."""
+        cmd = [
+            'C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe',
+            '--headless=new',
+            '--disable-gpu',
+            f'--window-size={BASE_WIDTH + 20},{BASE_HEIGHT + 40}',
+            '--force-device-scale-factor=2',
+            '--no-sandbox',
+            '--disable-software-rasterizer',
+            '--hide-scrollbars',
+            '--virtual-time-budget=1000',
+            '--screenshot=' + self.screenshot_path,
+            self.dashboard_url
+        ]
+        subprocess.run(cmd, check=True)
+
+        with open(self.screenshot_path, 'rb') as f:
+            return f.read()
+
+    def take_screenshot_and_update_display(self, force=False):
+        """Take a screenshot of the weather dashboard using headless Chromium.
+
+        On Linux the screenshot comes from a persistent browser and stays in memory;
+        it is only written to disk in debug mode.
+        """
         try:
-            url = "http://localhost:8080"
-            
             if platform.system() == "Windows":
-                cmd = [
-                    'C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe',
-                    '--headless=new',
-                    '--disable-gpu',
-                    '--window-size=820,520',
-                    '--force-device-scale-factor=2',
-                    '--no-sandbox',
-                    '--disable-software-rasterizer',
-                    '--hide-scrollbars',
-                    '--virtual-time-budget=1000',
-                    '--screenshot=' + self.screenshot_path,
-                    url
-                ]
+                with metrics.timed("screenshot"):
+                    png = self._take_windows_screenshot()
             else:
-                cmd = [
-                    'chromium-browser',
-                    '--headless',
-                    '--disable-gpu',
-                    '--window-size=800,520',
-                    '--no-sandbox',
-                    '--disable-software-rasterizer',
-                    "--disable-dev-shm-usage",
-                    "--disable-features=UseDBus",
-                    '--hide-scrollbars',
-                    '--virtual-time-budget=1000',
-                    '--screenshot=' + self.screenshot_path,
-                    url
-                ]
-                
-            subprocess.run(cmd, check=True)
-            
+                with metrics.timed("screenshot"):
+                    png = self._get_browser_worker().screenshot()
+                if DEBUG_MODE:
+                    with open(self.screenshot_path, 'wb') as f:
+                        f.write(png)
+
             # Display the screenshot on e-ink display
-            self.display_screenshot(self.screenshot_path)
+            self.display_image(png, force=force)
             
             if DEBUG_MODE:
                 logger.info(f"Debug mode: Screenshot saved to {self.screenshot_path}")
@@ -155,6 +373,50 @@ class DisplayService:
             logger.error(f"Error taking screenshot: {e}")
             return False
     
-    def update_display_async(self):
-        """Update display in a separate thread"""
-        Thread(target=self.take_screenshot_and_update_display).start()
\ No newline at end of file
+    def render_native_and_update_display(self, force=False):
+        """Render the dashboard with the native Pillow renderer and show it on the display.
+
+        With PANELS configured, the frame is rendered for and shown on every panel.
+
+        Returns:
+            False if a panel failed to show its frame
+        """
+        weather_data = self.weather_service.get_cached_data(self.location_id) if self.weather_service else None
+        if not weather_data:
+            raise ValueError("No weather data available to render")
+
+        if self.panel_fan_out:
+            return self.panel_fan_out.update(weather_data, force)
+
+        width, height = self.inky.resolution if self.inky else (BASE_WIDTH, BASE_HEIGHT)
+        with metrics.timed("render_frame"):
+            image = FrameRenderer(width, height, self.icon_atlas, blend_palette(0.0)).render(weather_data)
+        self.icon_atlas.save()
+        self.display_image(image, force=force)
+        self.queue_frames_in_background(weather_data)
+
+        if DEBUG_MODE:
+            image.save(self.frame_path)
+            logger.info(f"Debug mode: Frame saved to {self.frame_path}")
+        return True
+
+    def update_display(self, force=False):
+        """Render the dashboard using the configured render mode and update the display.
+
+        The native renderer falls back to the headless browser screenshot if it fails.
+        """
+        if self.render_mode == "native":
+            try:
+                return self.render_native_and_update_display(force)
+            except Exception as e:
+                logger.error(f"Error rendering frame natively, falling back to browser: {e}")
+
+        return self.take_screenshot_and_update_display(force)
+
+    def close(self):
+        """Stop the headless browser and panel render workers if they were started."""
+        if self.browser_worker is not None:
+            self.browser_worker.stop()
+            self.browser_worker = None
+        if self._panel_fan_out is not None:
+            self._panel_fan_out.close()
\ No newline at end of file
@@ -0,0 +1,198 @@
+import calendar
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+# Times are stored as seconds since the epoch of the local wall-clock time, as
+# Open-Meteo returns them in the timezone of the location (timezone=auto).
+
+
+def parse_time(value: str) -> int:
+    """Convert an Open-Meteo time string such as '2025-08-12T14:00' to local epoch seconds."""
+    return calendar.timegm(datetime.fromisoformat(value).timetuple())
+
+
+def to_datetime(timestamp: int) -> datetime:
+    """Convert local epoch seconds back to a naive local datetime."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+def to_timestamp(value: datetime) -> int:
+    """Convert a naive local datetime to local epoch seconds."""
+    return calendar.timegm(value.timetuple())
+
+
+def format_time(timestamp: int) -> str:
+    """Convert local epoch seconds to an Open-Meteo style time string."""
+    return to_datetime(timestamp).strftime('%Y-%m-%dT%H:%M')
+
+
+def parse_times(values: list) -> array:
+    """Parse a list of time strings into an array of local epoch seconds.
+
+    Open-Meteo series have a fixed step, so when the first and last entries
+    agree with the step between the first two, the array is generated from the
+    range instead of parsing every string.
+    """
+    if len(values) < 3:
+        return array('q', (parse_time(value) for value in values))
+
+    first, second, last = parse_time(values[0]), parse_time(values[1]), parse_time(values[-1])
+    step = second - first
+    if step > 0 and last - first == step * (len(values) - 1):
+        return array('q', range(first, last + 1, step))
+    return array('q', (parse_time(value) for value in values))
+
+
+def find_index(times: array, timestamp: int) -> int:
+    """Index of the last entry at or before timestamp, clamped to the series.
+
+    Uses a direct offset for evenly spaced series and a binary search otherwise.
+    """
+    if not times:
+        return 0
+
+    n = len(times)
+    if n > 1:
+        step = times[1] - times[0]
+        if step > 0 and times[-1] - times[0] == step * (n - 1):
+            return min(max((timestamp - times[0]) // step, 0), n - 1)
+    return min(max(bisect_right(times, timestamp) - 1, 0), n - 1)
+
+
+def _values(block: dict, key: str, typecode: str, length: int) -> array:
+    """Read a variable from an Open-Meteo block, treating missing values as zero."""
+    values = block.get(key)
+    if values is None:
+        return array(typecode, bytes(array(typecode).itemsize * length))
+    return array(typecode, (value or 0 for value in values))
+
+
+@dataclass
+class TimeSeries:
+    """Hourly (or 15-minutely) forecast values in parallel arrays."""
+    time: array
+    temperature: array
+    rain: array
+    weathercode: array
+
+    @classmethod
+    def from_open_meteo(cls, block: dict) -> "TimeSeries":
+        time = parse_times(block['time'])
+        return cls(
+            time=time,
+            temperature=_values(block, 'temperature_2m', 'd', len(time)),
+            rain=_values(block, 'rain', 'd', len(time)),
+            weathercode=_values(block, 'weathercode', 'h', len(time)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def index_at(self, timestamp: int) -> int:
+        """Index of the entry covering timestamp."""
+        return find_index(self.time, timestamp)
+
+    def window(self, start: int, count: int) -> "TimeSeries":
+        """Slice count entries starting at index start."""
+        end = start + count
+        return TimeSeries(
+            time=self.time[start:end],
+            temperature=self.temperature[start:end],
+            rain=self.rain[start:end],
+            weathercode=self.weathercode[start:end],
+        )
+
+    def to_dict(self) -> dict:
+        """Convert to the Open-Meteo block layout, e.g. for JSON in the dashboard."""
+        return {
+            'time': [format_time(timestamp) for timestamp in self.time],
+            'temperature_2m': self.temperature.tolist(),
+            'rain': self.rain.tolist(),
+            'weathercode': self.weathercode.tolist(),
+        }
+
+
+@dataclass
+class DailySeries:
+    """Daily forecast values in parallel arrays, one entry per local day."""
+    time: array
+    temperature_max: array
+    temperature_min: array
+    weathercode: array
+
+    @classmethod
+    def from_open_meteo(cls, block: dict) -> "DailySeries":
+        time = parse_times(block['time'])
+        return cls(
+            time=time,
+            temperature_max=_values(block, 'temperature_2m_max', 'd', len(time)),
+            temperature_min=_values(block, 'temperature_2m_min', 'd', len(time)),
+            weathercode=_values(block, 'weathercode', 'h', len(time)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def index_at(self, timestamp: int) -> int:
+        """Index of the day containing timestamp."""
+        return find_index(self.time, timestamp)
+
+    def window(self, start: int, count: int) -> "DailySeries":
+        """Slice count days starting at index start."""
+        end = start + count
+        return DailySeries(
+            time=self.time[start:end],
+            temperature_max=self.temperature_max[start:end],
+            temperature_min=self.temperature_min[start:end],
+            weathercode=self.weathercode[start:end],
+        )
+
+    def dates(self) -> list:
+        """The days as naive datetimes at local midnight."""
+        return [to_datetime(timestamp) for timestamp in self.time]
+
+
+@dataclass
+class CurrentConditions:
+    time: int
+    temperature: float
+    weathercode: int
+
+    @property
+    def local_datetime(self) -> datetime:
+        return to_datetime(self.time)
+
+
+@dataclass
+class Forecast:
+    """Typed, array-backed view of an Open-Meteo forecast response."""
+    latitude: float
+    longitude: float
+    utc_offset_seconds: int
+    current: CurrentConditions
+    hourly: TimeSeries
+    daily: DailySeries
+    minutely_15: TimeSeries = None
+
+    @classmethod
+    def from_open_meteo(cls, data: dict) -> "Forecast":
+        current = data['current']
+        return cls(
+            latitude=data['latitude'],
+            longitude=data['longitude'],
+            utc_offset_seconds=data.get('utc_offset_seconds', 0),
+            current=CurrentConditions(
+                time=parse_time(current['time']),
+                temperature=current['temperature_2m'],
+                weathercode=current['weathercode'],
+            ),
+            hourly=TimeSeries.from_open_meteo(data['hourly']),
+            daily=DailySeries.from_open_meteo(data['daily']),
+            minutely_15=TimeSeries.from_open_meteo(data['minutely_15']) if 'minutely_15' in data else None,
+        )
+
+    def current_hour_index(self) -> int:
+        """Index of the hourly entry for the hour of the current conditions."""
+        return self.hourly.index_at(self.current.time)
@@ -0,0 +1,84 @@
+import gzip
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from weather_frame import logger
+
+CACHE_FORMAT_VERSION = 1
+
+
+def atomic_write(path, data):
+    """Write bytes to a file so that readers see either the old or the new content.
+
+    Args:
+        path: Destination path
+        data: Bytes to write
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class ForecastCache:
+    """Persist the last good Open-Meteo response so a restart can start from it.
+
+    The raw response is stored as gzip-compressed JSON together with the
+    resolved location, the time it was fetched and the time it goes stale.
+    The processed data is rebuilt from it on load, which only takes a few
+    milliseconds.
+    """
+
+    def __init__(self, path, ttl=timedelta(hours=1)):
+        self.path = str(path)
+        self.ttl = ttl
+
+    def save(self, raw, location, fetched_at):
+        """Store a forecast.
+
+        Args:
+            raw: Open-Meteo response as returned by WeatherService.fetch_weather
+            location: Resolved location name
+            fetched_at: When the response was fetched
+        """
+        entry = {
+            'version': CACHE_FORMAT_VERSION,
+            'fetched_at': fetched_at.isoformat(),
+            'expires_at': (fetched_at + self.ttl).isoformat(),
+            'location': location,
+            'raw': raw
+        }
+        atomic_write(self.path, gzip.compress(json.dumps(entry, separators=(',', ':')).encode()))
+
+    def load(self):
+        """Load the stored forecast.
+
+        Returns:
+            Dict with 'raw', 'location', 'fetched_at' and 'expires_at', or None if nothing usable is stored
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                entry = json.loads(gzip.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable forecast cache {self.path}: {e}")
+            return None
+
+        if entry.get('version') != CACHE_FORMAT_VERSION:
+            return None
+
+        entry['fetched_at'] = datetime.fromisoformat(entry['fetched_at'])
+        entry['expires_at'] = datetime.fromisoformat(entry['expires_at'])
+        return entry
@@ -0,0 +1,61 @@
+import hashlib
+from datetime import datetime, timedelta
+
+import numpy as np
+
+
+class FrameDiff:
+    """Decide whether a new frame differs enough from the one on the panel to refresh it.
+
+    Frames are compared as palette indices, so the difference is the fraction
+    of panel pixels that would change colour. A refresh is forced once
+    max_interval has passed since the last one, to clear ghosting.
+    """
+
+    def __init__(self, threshold=0.001, max_interval=timedelta(hours=6)):
+        self.threshold = threshold
+        self.max_interval = max_interval
+        self.last_frame = None
+        self.last_digest = None
+        self.last_refresh = None
+
+    @staticmethod
+    def digest(indices):
+        """Compact signature of a frame, used to spot identical frames cheaply."""
+        return hashlib.blake2b(indices.tobytes(), digest_size=16).hexdigest()
+
+    def changed_fraction(self, indices):
+        """Fraction of pixels that differ from the last displayed frame."""
+        if self.last_frame is None or self.last_frame.shape != indices.shape:
+            return 1.0
+        return np.count_nonzero(self.last_frame != indices) / indices.size
+
+    def should_refresh(self, indices, now=None):
+        """Check whether a frame should be shown.
+
+        Args:
+            indices: 2D array of palette indices of the new frame
+            now: Current time (default: datetime.now())
+
+        Returns:
+            Tuple of (refresh, reason)
+        """
+        now = now or datetime.now()
+
+        if self.last_frame is None:
+            return True, "no frame displayed yet"
+        if now - self.last_refresh >= self.max_interval:
+            return True, f"last refresh more than {self.max_interval} ago"
+        if self.digest(indices) == self.last_digest:
+            return False, "frame unchanged"
+
+        changed = self.changed_fraction(indices)
+        if changed > self.threshold:
+            return True, f"{changed:.2%} of pixels changed"
+        return False, f"only {changed:.2%} of pixels changed (threshold {self.threshold:.2%})"
+
+    def mark_refreshed(self, indices, now=None):
+        """Remember a frame as the one now on the panel."""
+        self.last_frame = indices.copy()
+        self.last_digest = self.digest(indices)
+        self.last_refresh = now or datetime.now()
@@ -0,0 +1,149 @@
+import json
+import os
+import zlib
+from dataclasses import replace
+from datetime import datetime
+from threading import Lock
+
+from weather_frame import logger
+from weather_frame.dashboard_view import DashboardView
+from weather_frame.forecast import CurrentConditions, to_timestamp
+from weather_frame.forecast_cache import atomic_write
+from weather_frame.quantize import pack_4bpp, unpack_4bpp
+
+# Hours of frames to render ahead when new data arrives, shown when a fetch fails; 0 disables the queue
+FRAME_QUEUE_HOURS = int(os.environ.get("FRAME_QUEUE_HOURS", "0"))
+QUEUE_FORMAT_VERSION = 1
+
+
+def hourly_weather_data(weather_data, hours):
+    """Weather data as it will look in each of the coming hours, from the hourly forecast.
+
+    Each hour takes its current conditions from the forecast for that hour, and
+    its chart window and day cards start there.
+
+    Args:
+        weather_data: Processed weather data as returned by WeatherService.get_cached_data()
+        hours: Number of hours after the current one
+
+    Yields:
+        Tuples of the hour as local epoch seconds and the weather data for it
+    """
+    forecast = weather_data['forecast']
+    hourly = forecast.hourly
+    start = weather_data['current_hour_index'] + 1
+    for i in range(start, min(start + hours, len(hourly))):
+        current = CurrentConditions(time=hourly.time[i], temperature=hourly.temperature[i], weathercode=hourly.weathercode[i])
+        future = replace(forecast, current=current)
+        yield hourly.time[i], {
+            **weather_data,
+            'forecast': future,
+            'current_hour_index': i,
+            'view': DashboardView.from_forecast(future, i),
+        }
+
+
+class FrameQueue:
+    """Display-ready frames for the coming hours, kept on disk.
+
+    Each frame is stored as its palette indices packed two per byte and zlib
+    compressed, which is around 6 KB for an 800x480 dashboard. A JSON index
+    holds the data version, frame size and the hour of each frame. A new queue
+    replaces the old one as a whole, so the index never points at frames of
+    another forecast.
+    """
+
+    def __init__(self, directory):
+        self.directory = str(directory)
+        self.index_path = os.path.join(self.directory, 'index.json')
+        self._lock = Lock()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable frame queue index: {e}")
+            return None
+        return index if index.get('version') == QUEUE_FORMAT_VERSION else None
+
+    @property
+    def data_version(self):
+        """Data version the queued frames were rendered from, or None."""
+        index = self._load_index()
+        return index['data_version'] if index else None
+
+    def replace(self, data_version, width, height, saturation, frames):
+        """Store a new queue, dropping the previous one.
+
+        Args:
+            data_version: Version of the weather data the frames were rendered from
+            width: Frame width in pixels
+            height: Frame height in pixels
+            saturation: Saturation of the palette the frames were quantized to
+            frames: Iterable of (hour as local epoch seconds, palette indices)
+        """
+        with self._lock:
+            names = {}
+            for timestamp, indices in frames:
+                name = f"frame-{timestamp}.bin"
+                atomic_write(os.path.join(self.directory, name), zlib.compress(pack_4bpp(indices)))
+                names[str(timestamp)] = name
+
+            atomic_write(self.index_path, json.dumps({
+                'version': QUEUE_FORMAT_VERSION,
+                'data_version': data_version,
+                'width': width,
+                'height': height,
+                'saturation': saturation,
+                'frames': names,
+            }).encode())
+            self._remove_unlisted(set(names.values()))
+
+    def pop(self, now=None):
+        """Get the frame for the current hour and drop the frames of earlier hours.
+
+        Args:
+            now: Naive local datetime (default: datetime.now())
+
+        Returns:
+            Tuple of (saturation, palette indices), or None when no frame covers this hour
+        """
+        hour = to_timestamp((now or datetime.now()).replace(minute=0, second=0, microsecond=0))
+        with self._lock:
+            index = self._load_index()
+            if not index:
+                return None
+
+            frames = {int(timestamp): name for timestamp, name in index['frames'].items()}
+            name = frames.get(hour)
+            indices = None
+            if name:
+                try:
+                    with open(os.path.join(self.directory, name), 'rb') as f:
+                        indices = unpack_4bpp(zlib.decompress(f.read()), index['width'], index['height'])
+                except (OSError, zlib.error, ValueError) as e:
+                    logger.warning(f"Ignoring unreadable queued frame {name}: {e}")
+
+            expired = [timestamp for timestamp in frames if timestamp < hour]
+            if expired:
+                for timestamp in expired:
+                    del index['frames'][str(timestamp)]
+                atomic_write(self.index_path, json.dumps(index).encode())
+                self._remove_unlisted(set(index['frames'].values()))
+
+        return (index['saturation'], indices) if indices is not None else None
+
+    def __len__(self):
+        index = self._load_index()
+        return len(index['frames']) if index else 0
+
+    def _remove_unlisted(self, names):
+        for name in os.listdir(self.directory):
+            if name.startswith("frame-") and name not in names:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError as e:
+                    logger.warning(f"Error removing queued frame {name}: {e}")
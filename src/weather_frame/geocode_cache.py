@@ -0,0 +1,70 @@
+import json
+import threading
+from datetime import datetime, timedelta
+
+from weather_frame import logger
+from weather_frame.forecast_cache import atomic_write
+
+
+class GeocodeCache:
+    """Reverse geocoding results keyed by rounded coordinates and language.
+
+    Failed lookups are cached as well, with a shorter TTL, so an unreachable
+    geocoder is not retried on every forecast update. When a path is given the
+    cache is kept in a JSON file and survives restarts.
+    """
+
+    def __init__(self, path=None, ttl=timedelta(days=30), negative_ttl=timedelta(hours=6), precision=2):
+        self.path = str(path) if path else None
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.precision = precision
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def key(self, lat, long, language):
+        """Cache key for a coordinate, rounded so nearby coordinates share an entry."""
+        return f"{round(float(lat), self.precision)},{round(float(long), self.precision)},{language}"
+
+    def get(self, lat, long, language, now=None):
+        """Look up a cached location name.
+
+        Returns:
+            Tuple of (found, name); name is None for a cached failed lookup
+        """
+        with self._lock:
+            entry = self.entries.get(self.key(lat, long, language))
+        if not entry:
+            return False, None
+
+        ttl = self.ttl if entry['name'] is not None else self.negative_ttl
+        if (now or datetime.now()) - datetime.fromisoformat(entry['looked_up_at']) > ttl:
+            return False, None
+        return True, entry['name']
+
+    def set(self, lat, long, language, name, now=None):
+        """Store a lookup result; use None as name for a failed lookup."""
+        with self._lock:
+            self.entries[self.key(lat, long, language)] = {
+                'name': name,
+                'looked_up_at': (now or datetime.now()).isoformat()
+            }
+            entries = dict(self.entries)
+
+        if self.path:
+            try:
+                atomic_write(self.path, json.dumps(entries, indent=2).encode())
+            except Exception as e:
+                logger.error(f"Error saving geocode cache: {e}")
+
+    def _load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable geocode cache {self.path}: {e}")
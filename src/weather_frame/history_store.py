@@ -0,0 +1,192 @@
+import os
+import struct
+from bisect import bisect_left
+from datetime import timedelta
+from threading import Lock
+
+import numpy as np
+
+from weather_frame import logger
+from weather_frame.forecast_cache import atomic_write
+
+HISTORY_FORMAT_VERSION = 2
+HISTORY_MAGIC = b"WFHIST"
+# Magic, format version, record size
+HEADER = struct.Struct("<6sHI")
+HEADER_SIZE = 16
+
+OBSERVATION = 0
+FORECAST = 1
+
+# One record per observation or forecast hour, 28 bytes. valid_time is local
+# epoch seconds like in weather_frame.forecast, for observations the time of the
+# current conditions. fetched_at is UTC epoch seconds, so fetches stay in order
+# when the clock falls back at the end of daylight saving time.
+RECORD_DTYPE = np.dtype([
+    ('fetched_at', '<i8'),
+    ('valid_time', '<i8'),
+    ('temperature', '<f4'),
+    ('rain', '<f4'),
+    ('weathercode', '<i2'),
+    ('kind', 'u1'),
+    ('_pad', 'u1'),
+])
+
+HISTORY_RETENTION = timedelta(days=90)
+# Hours of the hourly forecast kept per fetch; enough for "yesterday vs today" and next-day accuracy
+FORECAST_HORIZON_HOURS = 48
+# Expired records are only compacted away once they span this much, so appends rarely rewrite the file
+COMPACT_SLACK = timedelta(days=7)
+
+
+def _utc_epoch(value):
+    """UTC epoch seconds of a naive local datetime; epoch seconds are passed through."""
+    return int(value) if isinstance(value, (int, np.integer)) else int(value.timestamp())
+
+
+def _header():
+    return HEADER.pack(HISTORY_MAGIC, HISTORY_FORMAT_VERSION, RECORD_DTYPE.itemsize).ljust(HEADER_SIZE, b"\0")
+
+
+class HistoryStore:
+    """Append-only history of fetched forecasts and current conditions for one location.
+
+    Records are fixed width and appended in fetch order to a single file, so a
+    range query is a binary search on the memory-mapped fetched_at column and
+    returns a view of the matching records. Only the pages touched by a query
+    are read, which keeps memory use flat however long the history grows.
+    Records older than the retention period are dropped by compaction, which
+    rewrites the file atomically once enough of it has expired.
+    """
+
+    def __init__(self, path, retention=HISTORY_RETENTION, horizon_hours=FORECAST_HORIZON_HOURS):
+        """
+        Args:
+            path: File to store the history in
+            retention: How long records are kept
+            horizon_hours: Hours of hourly forecast stored per fetch
+        """
+        self.path = str(path)
+        self.retention = retention
+        self.horizon_hours = horizon_hours
+        self._lock = Lock()
+        self._map = None
+        self._map_key = None
+
+    def append(self, forecast, fetched_at):
+        """Store the current conditions and the coming hours of a forecast.
+
+        Args:
+            forecast: Forecast as returned by Forecast.from_open_meteo
+            fetched_at: When it was fetched, as a naive local datetime
+        """
+        fetched = _utc_epoch(fetched_at)
+        start = forecast.current_hour_index()
+        hourly = forecast.hourly.window(start, self.horizon_hours)
+
+        records = np.zeros(len(hourly) + 1, dtype=RECORD_DTYPE)
+        records['fetched_at'] = fetched
+        records[0] = (fetched, forecast.current.time, forecast.current.temperature, 0.0, forecast.current.weathercode, OBSERVATION, 0)
+        records['valid_time'][1:] = hourly.time
+        records['temperature'][1:] = hourly.temperature
+        records['rain'][1:] = hourly.rain
+        records['weathercode'][1:] = hourly.weathercode
+        records['kind'][1:] = FORECAST
+
+        with self._lock:
+            self._append(records.tobytes())
+            existing = self._records()
+            if len(existing) and existing[0]['fetched_at'] < fetched - int((self.retention + COMPACT_SLACK).total_seconds()):
+                self._compact(fetched_at)
+
+    def _append(self, data):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if os.path.exists(self.path) and os.path.getsize(self.path) and not self._valid_header():
+            # Appending to a file of another format would never make it readable again
+            aside = f"{self.path}.unreadable"
+            os.replace(self.path, aside)
+            logger.warning(f"Moved history {self.path} to {aside}, starting a new one")
+        with open(self.path, 'ab') as f:
+            size = f.tell()
+            if size == 0:
+                f.write(_header())
+            elif (size - HEADER_SIZE) % RECORD_DTYPE.itemsize:
+                # Drop a record that was only partly written when the process stopped
+                f.truncate(size - (size - HEADER_SIZE) % RECORD_DTYPE.itemsize)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _records(self):
+        """All records as a read-only memory map, reopened when the file changed."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+
+        key = (stat.st_ino, stat.st_size)
+        if key != self._map_key:
+            count = (stat.st_size - HEADER_SIZE) // RECORD_DTYPE.itemsize
+            if count <= 0 or not self._valid_header():
+                return np.zeros(0, dtype=RECORD_DTYPE)
+            self._map = np.memmap(self.path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+            self._map_key = key
+        return self._map
+
+    def _valid_header(self):
+        with open(self.path, 'rb') as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            logger.warning(f"Ignoring history {self.path} with a truncated header")
+            return False
+        magic, version, record_size = HEADER.unpack(header)
+        if (magic, version, record_size) != (HISTORY_MAGIC, HISTORY_FORMAT_VERSION, RECORD_DTYPE.itemsize):
+            logger.warning(f"Ignoring history {self.path} with an unknown format")
+            return False
+        return True
+
+    def query(self, start=None, end=None, kind=None):
+        """Records fetched from start (inclusive) to end (exclusive).
+
+        Args:
+            start: UTC epoch seconds or naive local datetime, None for the oldest record
+            end: UTC epoch seconds or naive local datetime, None for the newest record
+            kind: OBSERVATION or FORECAST to select one kind of record
+
+        Returns:
+            Structured numpy array with RECORD_DTYPE; a view of the file unless kind is given
+        """
+        records = self._records()
+        # bisect reads single elements of the mapped column; np.searchsorted would copy all of it
+        fetched = records['fetched_at']
+        first = 0 if start is None else bisect_left(fetched, _utc_epoch(start))
+        last = len(records) if end is None else bisect_left(fetched, _utc_epoch(end))
+        selected = records[first:last]
+        if kind is not None:
+            selected = selected[selected['kind'] == kind]
+        return selected
+
+    def observations(self, start=None, end=None):
+        """Current conditions fetched between start and end, oldest first."""
+        return self.query(start, end, OBSERVATION)
+
+    def forecasts(self, start=None, end=None):
+        """Hourly forecast records fetched between start and end, in fetch order."""
+        return self.query(start, end, FORECAST)
+
+    def compact(self, now):
+        """Drop the records older than the retention period.
+
+        Args:
+            now: Naive local datetime the retention period is counted back from
+        """
+        with self._lock:
+            self._compact(now)
+
+    def _compact(self, now):
+        records = self._records()
+        keep = records[bisect_left(records['fetched_at'], _utc_epoch(now) - int(self.retention.total_seconds())):]
+        if len(keep) == len(records):
+            return
+        atomic_write(self.path, _header() + keep.tobytes())
+        logger.info(f"Compacted history {self.path}: dropped {len(records) - len(keep)} of {len(records)} records")
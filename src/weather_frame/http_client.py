@@ -0,0 +1,124 @@
+from threading import Lock
+
+from weather_frame import logger
+from weather_frame.metrics import metrics
+
+# Seconds to wait for a connection and then for each read; a stalled upstream fails the fetch instead of hanging it
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 15
+# Retries of failed connections, reads and 429/5xx answers, waiting backoff_factor * 2^n seconds plus jitter
+RETRIES = 3
+BACKOFF_FACTOR = 0.5
+BACKOFF_JITTER = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Longest wait for a Retry-After header; a longer one fails the fetch sooner and leaves the rest to the scheduler's backoff
+MAX_RETRY_AFTER = 10
+USER_AGENT = "weather-frame"
+
+
+class WeatherApiClient:
+    """HTTP client for the weather API, shared by every fetch.
+
+    Requests go through one keep-alive session with compressed responses,
+    connect and read timeouts, and retries with jittered exponential backoff.
+    When the upstream sends an ETag or Last-Modified, the next request for the
+    same URL and parameters is made conditional and a 304 answer reuses the
+    previous response body.
+    """
+
+    def __init__(self, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), retries=RETRIES, backoff_factor=BACKOFF_FACTOR):
+        """
+        Args:
+            timeout: Tuple of connect and read timeout in seconds
+            retries: Number of retries of a failed request
+            backoff_factor: Base of the exponential backoff between retries, in seconds
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._session = None
+        self._lock = Lock()
+        # Last response per request: (url, params) -> (validator headers, decoded body)
+        self._responses = {}
+
+    @property
+    def session(self):
+        """The requests session, created on first use to keep requests off the start-up path."""
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            class CappedRetry(Retry):
+                # retry_after_max only exists in recent urllib3 releases
+                def get_retry_after(self, response):
+                    retry_after = super().get_retry_after(response)
+                    return None if retry_after is None else min(retry_after, MAX_RETRY_AFTER)
+
+            retry_options = dict(
+                total=self.retries, backoff_factor=self.backoff_factor, status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset(["GET"]), respect_retry_after_header=True, raise_on_status=False
+            )
+            try:
+                retry = CappedRetry(backoff_jitter=BACKOFF_JITTER, **retry_options)
+            except TypeError:
+                # urllib3 1.x has no jitter
+                retry = CappedRetry(**retry_options)
+
+            session = requests.Session()
+            adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=2)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({'Accept-Encoding': "gzip, deflate", 'User-Agent': USER_AGENT})
+            self._session = session
+        return self._session
+
+    @session.setter
+    def session(self, value):
+        self._session = value
+
+    def get_json(self, url, params=None):
+        """GET a JSON document.
+
+        Args:
+            url: URL to request
+            params: Dict of query parameters
+
+        Returns:
+            The decoded JSON body, the previous one when the upstream answers 304
+
+        Raises:
+            requests.RequestException when the request fails after the retries
+        """
+        key = (url, tuple(sorted((params or {}).items())))
+        with self._lock:
+            previous = self._responses.get(key)
+
+        headers = {}
+        if previous:
+            validators = previous[0]
+            if 'ETag' in validators:
+                headers['If-None-Match'] = validators['ETag']
+            if 'Last-Modified' in validators:
+                headers['If-Modified-Since'] = validators['Last-Modified']
+
+        response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+        metrics.inc("api_responses_total", status=str(response.status_code))
+        if response.status_code == 304 and previous:
+            logger.info("Weather API data not modified, reusing the previous response")
+            return previous[1]
+        response.raise_for_status()
+
+        data = response.json()
+        validators = {name: response.headers[name] for name in ('ETag', 'Last-Modified') if name in response.headers}
+        with self._lock:
+            if validators:
+                self._responses[key] = (validators, data)
+            else:
+                self._responses.pop(key, None)
+        return data
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from io import BytesIO
+from threading import Lock
+
+import numpy as np
+from PIL import Image
+
+from weather_frame import logger
+from weather_frame.forecast_cache import atomic_write
+from weather_frame.quantize import PaletteQuantizer
+from weather_frame.renderer import render_icon
+
+try:
+    import cairosvg
+except (ImportError, OSError):
+    # cairosvg is optional and also fails to import when the cairo library is missing
+    cairosvg = None
+
+ICONS_DIR = os.path.join(os.path.dirname(__file__), 'static', 'icons')
+DEFAULT_ICON = "default.svg"
+ATLAS_FORMAT_VERSION = 1
+# Width of the persisted sprite sheet; tiles are packed in rows
+SHEET_WIDTH = 1024
+# Tiles kept in memory only, for renders at sizes and palettes requested over HTTP
+MAX_TRANSIENT_TILES = 64
+
+
+def palette_key(palette):
+    """Short stable key for a palette, or "rgb" for unquantized icons."""
+    if palette is None:
+        return "rgb"
+    return hashlib.blake2b(bytes(channel for color in palette for channel in color), digest_size=4).hexdigest()
+
+
+class IconAtlas:
+    """Weather icons rasterized once per size and palette, shared by all renderers.
+
+    Each SVG from static/icons is rasterized with cairosvg when it is installed,
+    otherwise drawn with the renderer's shape approximations, then flattened onto
+    white and quantized to the panel palette with a hard alpha edge. The tiles are
+    kept in memory and persisted as one sprite sheet with a JSON index, keyed by
+    icon, size and palette and checked against a hash of the SVG source, so an
+    edited icon is rasterized again.
+    """
+
+    def __init__(self, cache_dir=None, icons_dir=ICONS_DIR):
+        """
+        Args:
+            cache_dir: Directory to persist the atlas in; None keeps it in memory only
+            icons_dir: Directory with the SVG icons
+        """
+        self.icons_dir = icons_dir
+        self.sheet_path = os.path.join(cache_dir, 'icon_atlas.png') if cache_dir else None
+        self.index_path = os.path.join(cache_dir, 'icon_atlas.json') if cache_dir else None
+        self.rasterizer = "cairosvg" if cairosvg else "shapes"
+        self.tiles = {}
+        # Tiles that are not persisted, least recently used first
+        self._transient = OrderedDict()
+        self._source_hashes = {}
+        self._quantizers = {}
+        self._lock = Lock()
+        self._dirty = False
+        self._load()
+
+    def _icon_name(self, icon_name):
+        if os.path.exists(os.path.join(self.icons_dir, icon_name)):
+            return icon_name
+        return DEFAULT_ICON
+
+    def _source_hash(self, icon_name):
+        if icon_name not in self._source_hashes:
+            try:
+                with open(os.path.join(self.icons_dir, icon_name), 'rb') as f:
+                    source = f.read()
+            except OSError:
+                source = b""
+            self._source_hashes[icon_name] = hashlib.blake2b(source + self.rasterizer.encode(), digest_size=8).hexdigest()
+        return self._source_hashes[icon_name]
+
+    def get(self, icon_name, size, palette=None, persist=True):
+        """Get an icon as a size x size RGBA image.
+
+        Args:
+            icon_name: Icon filename as returned by get_weather_icon; unknown icons
+                get the default icon
+            size: Width and height in pixels
+            palette: List of RGB tuples to quantize to, or None for full colour
+            persist: Add a newly rasterized icon to the persisted atlas; otherwise
+                it is kept among a bounded number of in-memory tiles (default: True)
+
+        Returns:
+            RGBA PIL Image, shared between callers so it must not be modified
+        """
+        icon_name = self._icon_name(icon_name)
+        key = f"{icon_name}:{size}:{palette_key(palette)}"
+        source_hash = self._source_hash(icon_name)
+
+        with self._lock:
+            tile = self.tiles.get(key)
+            if tile is None and not persist:
+                tile = self._transient.get(key)
+                if tile is not None:
+                    self._transient.move_to_end(key)
+        if tile is not None and tile[0] == source_hash:
+            return tile[1]
+
+        image = self._rasterize(icon_name, size)
+        if palette is not None:
+            image = self._quantize(image, palette)
+
+        with self._lock:
+            if persist:
+                self.tiles[key] = (source_hash, image)
+                self._dirty = True
+            else:
+                self._transient[key] = (source_hash, image)
+                while len(self._transient) > MAX_TRANSIENT_TILES:
+                    self._transient.popitem(last=False)
+        return image
+
+    def etag(self, icon_name, size, palette=None):
+        """Validator for an icon variant, changing when its source or rasterizer changes."""
+        icon_name = self._icon_name(icon_name)
+        return f"{self._source_hash(icon_name)}-{size}-{palette_key(palette)}"
+
+    def get_png(self, icon_name, size, palette=None, persist=True):
+        """Get an icon encoded as PNG, for the HTML dashboard."""
+        buffer = BytesIO()
+        self.get(icon_name, size, palette, persist).save(buffer, format='PNG')
+        return buffer.getvalue()
+
+    def _rasterize(self, icon_name, size):
+        if cairosvg is not None:
+            try:
+                png = cairosvg.svg2png(url=os.path.join(self.icons_dir, icon_name), output_width=size, output_height=size)
+                return Image.open(BytesIO(png)).convert('RGBA')
+            except Exception as e:
+                logger.warning(f"Error rasterizing {icon_name}, falling back to shapes: {e}")
+        return render_icon(icon_name, size)
+
+    def _quantize(self, image, palette):
+        key = palette_key(palette)
+        if key not in self._quantizers:
+            self._quantizers[key] = PaletteQuantizer(palette)
+        quantizer = self._quantizers[key]
+
+        # Flatten onto the white page, quantize and keep only a hard alpha edge
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        indices = quantizer.quantize(background)
+        rgb = np.asarray(quantizer.palette, dtype=np.uint8)[indices]
+        alpha = np.where(np.asarray(image.getchannel('A')) >= 128, 255, 0).astype(np.uint8)
+        return Image.fromarray(np.dstack([rgb, alpha]), 'RGBA')
+
+    def _load(self):
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+            if index.get('version') != ATLAS_FORMAT_VERSION:
+                return
+            with Image.open(self.sheet_path) as sheet:
+                sheet = sheet.convert('RGBA')
+                for key, (x, y, size, source_hash) in index['tiles'].items():
+                    self.tiles[key] = (source_hash, sheet.crop((x, y, x + size, y + size)))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable icon atlas: {e}")
+            self.tiles = {}
+
+    def save(self):
+        """Persist the atlas if icons were added since it was loaded."""
+        if not self.sheet_path or not self._dirty:
+            return
+
+        with self._lock:
+            tiles = sorted(self.tiles.items(), key=lambda item: -item[1][1].size[0])
+            self._dirty = False
+
+        # Pack the tiles in rows, largest first
+        placements, x, y, row_height = {}, 0, 0, 0
+        for key, (source_hash, image) in tiles:
+            size = image.size[0]
+            if x and x + size > SHEET_WIDTH:
+                x, y, row_height = 0, y + row_height, 0
+            placements[key] = (x, y, size, source_hash)
+            x += size
+            row_height = max(row_height, size)
+
+        width = max([SHEET_WIDTH] + [image.size[0] for _, (_, image) in tiles])
+        sheet = Image.new('RGBA', (width, max(1, y + row_height)), (0, 0, 0, 0))
+        for key, (_, image) in tiles:
+            sheet.paste(image, placements[key][:2])
+
+        buffer = BytesIO()
+        sheet.save(buffer, format='PNG')
+        atomic_write(self.sheet_path, buffer.getvalue())
+        atomic_write(self.index_path, json.dumps({'version': ATLAS_FORMAT_VERSION, 'tiles': placements}).encode())
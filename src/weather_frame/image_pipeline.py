@@ -0,0 +1,63 @@
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+WHITE = (255, 255, 255)
+
+
+def load_frame(frame):
+    """Turn a frame from any source into a PIL Image without touching the disk.
+
+    Args:
+        frame: Encoded image bytes (e.g. a PNG screenshot), a (height, width, 3 or 4)
+            uint8 array or a PIL Image
+
+    Returns:
+        PIL Image; decoding is deferred until the pixels are first used
+    """
+    if isinstance(frame, Image.Image):
+        return frame
+    if isinstance(frame, np.ndarray):
+        return Image.fromarray(frame)
+    # BytesIO shares the buffer of a bytes object instead of copying it
+    return Image.open(BytesIO(frame))
+
+
+def fit_frame(image, width, height):
+    """Crop and scale an image to a panel size, copying as little as possible.
+
+    The image is cropped from the right and bottom to at most the panel size.
+    When it is then smaller than the panel in either dimension it is scaled up,
+    keeping its aspect ratio, and centered on white. Cropping and scaling happen
+    in a single resize over the crop box, and an image that already has the
+    panel size is returned as is. RGB and RGBA images keep their mode, as the
+    quantizer reads either without converting; other modes become RGB.
+
+    Args:
+        image: PIL Image
+        width: Panel width in pixels
+        height: Panel height in pixels
+
+    Returns:
+        RGB or RGBA PIL Image of width x height, which may be the image passed in
+    """
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGB')
+
+    image_width, image_height = image.size
+    box = (0, 0, min(image_width, width), min(image_height, height))
+    crop_width, crop_height = box[2], box[3]
+
+    if (crop_width, crop_height) == (width, height):
+        return image.crop(box) if box[2:] != image.size else image
+
+    scale = min(width / crop_width, height / crop_height)
+    new_width, new_height = int(crop_width * scale), int(crop_height * scale)
+    resized = image.resize((new_width, new_height), Image.LANCZOS, box=box)
+    if (new_width, new_height) == (width, height):
+        return resized
+
+    frame = Image.new(image.mode, (width, height), WHITE + (255,) * (image.mode == 'RGBA'))
+    frame.paste(resized, ((width - new_width) // 2, (height - new_height) // 2))
+    return frame
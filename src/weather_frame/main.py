@@ -1,85 +1,335 @@
-import locale
-import time
 import atexit
+import hashlib
+import os
+from collections import OrderedDict
 from datetime import datetime
-from flask import Flask, render_template, request
-from apscheduler.schedulers.background import BackgroundScheduler
+from io import BytesIO
+from threading import Lock, Thread
 
 from weather_frame import logger
-from weather_frame.display_service import DisplayService
-from weather_frame.weather_service import WeatherService
-from weather_frame.utils import get_weather_icon
-
-app = Flask(__name__)
-
-# Initialize services
-weather_service = WeatherService()
-display_service = DisplayService()
-
-def update_weather_and_display():
-    """Update weather data and display"""
-    if weather_service.update_weather_data():
-        # Wait a bit for the web page to update with new data
-        time.sleep(2)
-        display_service.update_display_async()
-
-@app.route("/")
-def dashboard():
-    # Set Dutch locale
-    try:
-        locale.setlocale(locale.LC_TIME, 'nl_NL')
-    except locale.Error:
-        try:
-            locale.setlocale(locale.LC_TIME, 'nl_NL.UTF-8')
-        except locale.Error:
-            logger.warning("Dutch locale not available, falling back to default")
-    
-    # Use cached data if available, otherwise fetch it
-    weather_data = weather_service.get_cached_data()
-    if not weather_data:
-        weather_service.update_weather_data()
+from weather_frame.config import CACHE_DIR
+from weather_frame.metrics import metrics, process_uptime_seconds
+
+# "normal" starts the web app and renders the cached forecast; "first-frame" puts
+# the last displayed frame back on the panel before anything else is loaded
+STARTUP_MODE = os.environ.get("STARTUP_MODE", "normal")
+MAX_FRAME_SIZE = 2048
+# Requested saturations are rounded to steps of 1 / SATURATION_STEPS, so the query
+# string cannot create a palette (and lookup table and icon tiles) per float
+SATURATION_STEPS = 4
+# Encoded frames kept for /frame.*, least recently requested dropped first
+MAX_RENDERED_FRAMES = 8
+MAX_ICON_SIZE = 512
+# The browser screenshot is taken at twice the CSS pixel size
+ICON_SCALE = 2
+# Icon sizes the dashboard template asks for; only these are added to the persisted icon atlas
+DASHBOARD_ICON_SIZES = (64 * ICON_SCALE, 132 * ICON_SCALE)
+# Seconds a request waits for a refresh cycle when there is no data to serve yet
+REFRESH_WAIT = 30
+
+def create_app(weather_service=None, display_service=None, start=True):
+    """Create the Flask app with its services.
+
+    Nothing is fetched, detected or scheduled at import time; the services only
+    load their on-disk caches here, and hardware and network libraries are set
+    up on first use.
+
+    Args:
+        weather_service: WeatherService to use (default: one with the on-disk caches)
+        display_service: DisplayService to use (default: one for the first location)
+        start: Start the refresh worker and scheduler (default: True)
+    """
+    from flask import Flask, Response, jsonify, render_template, request
+
+    from weather_frame.chart import render_chart_svg
+    from weather_frame.dashboard_view import dashboard_view
+    from weather_frame.display_service import DisplayService
+    from weather_frame.quantize import blend_palette, pack_4bpp
+    from weather_frame.refresh_pipeline import RefreshPipeline
+    from weather_frame.refresh_scheduler import QUIET_HOURS, RefreshScheduler, parse_quiet_hours
+    from weather_frame.renderer import BASE_HEIGHT, BASE_WIDTH
+    from weather_frame.weather_service import WeatherService
+
+    app = Flask(__name__)
+
+    # Initialize services
+    if weather_service is None:
+        weather_service = WeatherService(
+            cache_path=CACHE_DIR / 'forecast.json.gz',
+            geocode_cache_path=CACHE_DIR / 'geocode.json',
+            history_dir=CACHE_DIR / 'history'
+        )
+        weather_service.load_cached_forecast()
+    if display_service is None:
+        display_service = DisplayService(weather_service, keep_last_frame=STARTUP_MODE == "first-frame")
+    elif display_service.weather_service is None:
+        display_service.weather_service = weather_service
+    refresh_pipeline = RefreshPipeline(weather_service, display_service, quiet_hours=parse_quiet_hours(QUIET_HOURS))
+    refresh_scheduler = RefreshScheduler(refresh_pipeline)
+
+    # Rendered dashboard per location id: (version, html)
+    rendered_dashboards = {}
+    # Encoded frames per (location id, format, width, height, saturation): (version, bytes), least recently used first
+    rendered_frames = OrderedDict()
+    rendered_frames_lock = Lock()
+    # Hourly chart SVG per location id: (data version, svg)
+    rendered_charts = {}
+
+    app.extensions['weather_frame'] = {
+        'weather_service': weather_service,
+        'display_service': display_service,
+        'refresh_pipeline': refresh_pipeline,
+        'refresh_scheduler': refresh_scheduler,
+        'rendered_dashboards': rendered_dashboards,
+        'rendered_frames': rendered_frames,
+        'rendered_charts': rendered_charts,
+    }
+
+    def get_weather_data(location_id):
+        """Get cached weather data for a location, fetching it if there is none yet"""
+        weather_data = weather_service.get_cached_data(location_id)
+        if not weather_data:
+            refresh_pipeline.trigger()
+            refresh_pipeline.wait(REFRESH_WAIT)
+            weather_data = weather_service.get_cached_data(location_id)
+        return weather_data
+
+    def dashboard_version(weather_data):
+        """Version of the rendered page: the forecast content plus the (possibly later resolved) location name"""
+        return f"{weather_data['version']}-{hashlib.blake2b(weather_data['location'].encode(), digest_size=4).hexdigest()}"
+
+    def render_chart(location_id, weather_data):
+        """Render the hourly chart as SVG, once per data version"""
+        rendered = rendered_charts.get(location_id)
+        if rendered and rendered[0] == weather_data['version']:
+            return rendered[1]
+
+        with metrics.timed("render_chart"):
+            svg = render_chart_svg(dashboard_view(weather_data).hourly)
+        rendered_charts[location_id] = (weather_data['version'], svg)
+        return svg
+
+    def render_dashboard(location_id, weather_data):
+        """Render the dashboard page, reusing the stored render while the data version is unchanged"""
+        version = dashboard_version(weather_data)
+        rendered = rendered_dashboards.get(location_id)
+        if rendered and rendered[0] == version:
+            return rendered[1]
+
+        with metrics.timed("render_template"):
+            html = render_template(
+                "index.html",
+                location=weather_data['location'],
+                view=dashboard_view(weather_data),
+                hourly_chart=render_chart(location_id, weather_data),
+                last_updated=weather_data['last_updated']
+            )
+        rendered_dashboards[location_id] = (version, html)
+        return html
+
+    @app.route("/")
+    def dashboard():
+        location_id = request.args.get('location', weather_service.default_location_id)
+        if location_id not in weather_service.locations:
+            return f"Unknown location: {location_id}", 404
+
+        # Use cached data if available, otherwise fetch it
+        weather_data = get_weather_data(location_id)
+        if weather_data and weather_service.is_stale(location_id):
+            # Serve the last good data and refresh in the background
+            refresh_pipeline.trigger()
+
+        if not weather_data:
+            return "Weather data unavailable", 503
+
+        response = Response(render_dashboard(location_id, weather_data), mimetype='text/html')
+        response.set_etag(dashboard_version(weather_data))
+        response.last_modified = weather_data['last_updated'].astimezone()
+        return response.make_conditional(request)
+
+    @app.route("/chart.svg")
+    def chart_svg():
+        """Hourly chart of the dashboard as a standalone SVG"""
+        location_id = request.args.get('location', weather_service.default_location_id)
+        if location_id not in weather_service.locations:
+            return f"Unknown location: {location_id}", 404
+
+        weather_data = get_weather_data(location_id)
+        if not weather_data:
+            return "Weather data unavailable", 503
+
+        response = Response(render_chart(location_id, weather_data), mimetype='image/svg+xml')
+        response.set_etag(weather_data['version'])
+        response.last_modified = weather_data['last_updated'].astimezone()
+        return response.make_conditional(request)
+
+    def encode_frame(weather_data, frame_format, width, height, saturation):
+        """Render a frame for a panel resolution and encode it as PNG or packed 4bpp indices"""
+        # Request sizes and palettes are not worth persisting in the icon atlas
+        quantizer, indices = display_service.render_frame(weather_data, width, height, saturation, persist_icons=False)
+        if frame_format == 'bin':
+            return pack_4bpp(indices)
+
+        buffer = BytesIO()
+        quantizer.to_image(indices).save(buffer, format='PNG', optimize=True)
+        return buffer.getvalue()
+
+    def serve_frame(frame_format, mimetype):
+        """Serve the current frame for the requested panel, encoding it once per data version"""
+        location_id = request.args.get('location', weather_service.default_location_id)
+        if location_id not in weather_service.locations:
+            return f"Unknown location: {location_id}", 404
+
+        default_width, default_height = display_service.inky.resolution if display_service.inky else (BASE_WIDTH, BASE_HEIGHT)
+        width = request.args.get('width', default_width, type=int)
+        height = request.args.get('height', default_height, type=int)
+        saturation = request.args.get('saturation', 0.0, type=float)
+        if not (0 < width <= MAX_FRAME_SIZE and 0 < height <= MAX_FRAME_SIZE) or not 0.0 <= saturation <= 1.0:
+            return "Invalid frame size or saturation", 400
+        saturation = round(saturation * SATURATION_STEPS) / SATURATION_STEPS
+        if frame_format == 'bin' and width * height % 2:
+            return "Packed frames need an even number of pixels", 400
+
+        weather_data = get_weather_data(location_id)
+        if not weather_data:
+            return "Weather data unavailable", 503
+
+        version = dashboard_version(weather_data)
+        key = (location_id, frame_format, width, height, saturation)
+        with rendered_frames_lock:
+            rendered = rendered_frames.get(key)
+            if rendered and rendered[0] == version:
+                rendered_frames.move_to_end(key)
+        if not rendered or rendered[0] != version:
+            rendered = (version, encode_frame(weather_data, frame_format, width, height, saturation))
+            with rendered_frames_lock:
+                # Frames of earlier data of this location will not be served again
+                for stale in [other for other, (other_version, _) in rendered_frames.items() if other[0] == location_id and other_version != version]:
+                    del rendered_frames[stale]
+                rendered_frames[key] = rendered
+                while len(rendered_frames) > MAX_RENDERED_FRAMES:
+                    rendered_frames.popitem(last=False)
+
+        response = Response(rendered[1], mimetype=mimetype)
+        response.set_etag(f"{version}-{width}x{height}-{saturation}")
+        response.last_modified = weather_data['last_updated'].astimezone()
+        response.headers['X-Frame-Width'] = str(width)
+        response.headers['X-Frame-Height'] = str(height)
+        return response.make_conditional(request)
+
+    @app.route("/frame.png")
+    def frame_png():
+        """Display-ready frame as a palette PNG"""
+        return serve_frame('png', 'image/png')
+
+    @app.route("/frame.bin")
+    def frame_bin():
+        """Display-ready frame as palette indices, two pixels per byte, high nibble first"""
+        return serve_frame('bin', 'application/octet-stream')
+
+    @app.route("/icons/<int:size>/<name>")
+    def icon(size, name):
+        """Weather icon from the icon atlas, rasterized and quantized to the panel palette once"""
+        if not 0 < size <= MAX_ICON_SIZE:
+            return "Invalid icon size", 400
+
+        palette = blend_palette(0.0)
+        persist = size in DASHBOARD_ICON_SIZES
+        png = display_service.icon_atlas.get_png(name, size, palette, persist=persist)
+        if persist:
+            display_service.icon_atlas.save()
+        response = Response(png, mimetype='image/png')
+        response.set_etag(display_service.icon_atlas.etag(name, size, palette))
+        response.cache_control.max_age = 86400
+        return response.make_conditional(request)
+
+    @app.route("/refresh")
+    def refresh():
+        """Manual refresh endpoint, answered when the refresh cycle has finished"""
+        refresh_pipeline.trigger()
+        finished = refresh_pipeline.wait(REFRESH_WAIT)
+        logger.info("Weather data refreshed" if finished else "Weather refresh still running")
+        return jsonify(refresh_pipeline.status()), 200 if finished else 202
+
+    def data_age_seconds():
+        """Age of the default location's forecast, for the /metrics endpoint"""
         weather_data = weather_service.get_cached_data()
+        if not weather_data:
+            return None
+        return round((datetime.now() - weather_data['last_updated']).total_seconds(), 1)
+
+    metrics.set_gauge("data_age_seconds", data_age_seconds)
+
+    @app.route("/metrics")
+    def prometheus_metrics():
+        """Counters, stage latencies, memory use and data age in Prometheus text format"""
+        return Response(metrics.export(), mimetype='text/plain; version=0.0.4')
+
+    @app.route("/status")
+    def status():
+        """State of the refresh pipeline"""
+        return jsonify(refresh_pipeline.status())
+
+    @app.after_request
+    def add_refresh_header(response):
+        """Add auto-refresh header to index page, reloading shortly after the next scheduled fetch"""
+        if request.path == "/":
+            seconds_until_next_fetch = (refresh_scheduler.next_refresh() - datetime.now()).total_seconds()
+            response.headers['Refresh'] = str(max(60, round(seconds_until_next_fetch) + 30))
+        return response
+
+    # Register template globals
+    app.jinja_env.globals.update(
+        icon_scale=ICON_SCALE
+    )
+
+    if start:
+        refresh_pipeline.start()
+        refresh_scheduler.start()
+        atexit.register(refresh_scheduler.shutdown)
+        atexit.register(refresh_pipeline.stop)
+        atexit.register(display_service.close)
+
+    return app
+
+def start_up(app):
+    """Show the last good forecast right away, then refresh it from the API"""
+    services = app.extensions['weather_frame']
+    if services['weather_service'].get_cached_data():
+        services['refresh_pipeline'].trigger(fetch=False)
+        services['refresh_pipeline'].wait()
+        record_first_frame("cached forecast")
+    services['refresh_pipeline'].trigger()
+
+def show_first_frame():
+    """Put the queued frame for this hour, or else the last displayed frame, back on the panel before the app loads.
+
+    Returns:
+        The DisplayService used, so the app can reuse it
+    """
+    from weather_frame.display_service import DisplayService
+
+    display_service = DisplayService(keep_last_frame=True)
+    try:
+        # The frame rendered ahead for this hour is more current than the last one shown
+        if display_service.show_queued_frame():
+            record_first_frame("queued frame")
+        elif display_service.show_last_frame():
+            record_first_frame("last frame")
+    except Exception as e:
+        logger.error(f"Error showing last frame: {e}")
+    return display_service
 
-    # Format locale-dependent data
-    if weather_data and 'current' in weather_data:
-        current_time = weather_data['current']['time_obj']
-        weather_data['current']['formatted_date'] = current_time.strftime('%A %d %B').capitalize()
-        
-        if 'daily' in weather_data and 'time_objects' in weather_data['daily']:
-            dutch_days = []
-            for day_obj in weather_data['daily']['time_objects']:
-                day_name = day_obj.strftime('%A')[:2].upper()  # First 2 letters, uppercase
-                dutch_days.append(day_name)
-            weather_data['daily']['time'] = dutch_days
-    
-    return render_template("index.html", **weather_data)
-
-@app.route("/refresh")
-def refresh():
-    """Manual refresh endpoint"""
-    update_weather_and_display()
-    logger.info("Weather data refreshed")
-
-@app.after_request
-def add_refresh_header(response):
-    """Add auto-refresh header to index page"""
-    if request.path == "/":
-        now = datetime.now()
-        seconds_until_next_hour = 3600 - (now.minute * 60 + now.second)
-        response.headers['Refresh'] = str(seconds_until_next_hour)
-    return response
-
-# Register template function
-app.jinja_env.globals.update(
-    get_weather_icon=get_weather_icon
-)
-
-# Initialize the scheduler
-scheduler = BackgroundScheduler()
-scheduler.add_job(func=update_weather_and_display, trigger="interval", hours=1)
-scheduler.start()
-atexit.register(lambda: scheduler.shutdown())
+def record_first_frame(source):
+    """Log and record the time from process start to the first frame, once."""
+    if "time_to_first_frame_seconds" in metrics.gauges:
+        return
+    seconds = process_uptime_seconds()
+    metrics.set_gauge("time_to_first_frame_seconds", lambda: round(seconds, 3))
+    logger.info(f"First frame ({source}) shown {seconds * 1000:.0f} ms after process start")
 
 if __name__ == "__main__":
-    update_weather_and_display()  # Initial data fetch
-    app.run(host='0.0.0.0', port=8080, debug=False)
\ No newline at end of file
+    display_service = show_first_frame() if STARTUP_MODE == "first-frame" else None
+    app = create_app(display_service=display_service)
+    Thread(target=start_up, args=(app,)).start()  # Initial data fetch
+    app.run(host='0.0.0.0', port=8080, debug=False)
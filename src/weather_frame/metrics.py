@@ -0,0 +1,152 @@
+import os
+import sys
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock, local
+
+_IMPORTED_AT = time.perf_counter()
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Cumulative latency histogram in the Prometheus bucket layout."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Counters, gauges and per-stage latency histograms for the refresh path.
+
+    Stage timings recorded on a thread inside `cycle()` are also collected for
+    that cycle, so the refresh pipeline can log where a cycle spent its time.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._local = local()
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+
+    def inc(self, name, value=1, **labels):
+        """Increase a counter."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, function):
+        """Register a gauge whose value is read from function() at export time."""
+        with self._lock:
+            self.gauges[name] = function
+
+    def observe(self, stage, seconds):
+        """Record the duration of a stage."""
+        with self._lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = Histogram()
+            self.histograms[stage].observe(seconds)
+
+        timings = getattr(self._local, 'timings', None)
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def timed(self, stage):
+        """Time the enclosed block as a stage, also when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    @contextmanager
+    def cycle(self):
+        """Collect the stage timings of this thread into the yielded dict."""
+        timings = {}
+        self._local.timings = timings
+        try:
+            yield timings
+        finally:
+            self._local.timings = None
+
+    def export(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((stage, (list(h.counts), h.sum, h.count, h.buckets)) for stage, h in self.histograms.items())
+            gauges = sorted(self.gauges.items())
+
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                lines.append(f"# TYPE weather_frame_{name} counter")
+                seen.add(name)
+            label_text = ",".join(f'{key}="{label}"' for key, label in labels)
+            lines.append(f"weather_frame_{name}{{{label_text}}} {value}" if label_text else f"weather_frame_{name} {value}")
+
+        if histograms:
+            lines.append("# TYPE weather_frame_stage_seconds histogram")
+        for stage, (counts, total, count, buckets) in histograms:
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'weather_frame_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'weather_frame_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'weather_frame_stage_seconds_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'weather_frame_stage_seconds_count{{stage="{stage}"}} {count}')
+
+        for name, function in gauges:
+            value = function()
+            if value is None:
+                continue
+            lines.append(f"# TYPE weather_frame_{name} gauge")
+            lines.append(f"weather_frame_{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def process_uptime_seconds():
+    """Seconds since this process started, including interpreter start-up where /proc allows."""
+    try:
+        with open("/proc/self/stat") as stat:
+            # Field 22, counted after the parenthesised command name which may contain spaces
+            start_ticks = int(stat.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as uptime:
+            return float(uptime.read().split()[0]) - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.perf_counter() - _IMPORTED_AT
+
+
+def process_rss_bytes():
+    """Resident set size of this process, or the peak RSS where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+metrics = Metrics()
+metrics.set_gauge("process_resident_memory_bytes", process_rss_bytes)
@@ -0,0 +1,236 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Lock
+
+import numpy as np
+
+from weather_frame import logger
+from weather_frame.frame_diff import FrameDiff
+from weather_frame.icon_atlas import palette_key
+from weather_frame.metrics import metrics
+from weather_frame.quantize import PaletteQuantizer, blend_palette
+
+# Comma-separated panels to drive, e.g. "inky,mock:1600x1200@90". Each entry is
+# a driver ("inky" for the auto-detected display, "mock" for MockPanel), a
+# WIDTHxHEIGHT resolution (required for mock panels) and an optional rotation
+# in degrees counter-clockwise. Empty drives just the auto-detected display.
+PANELS = os.environ.get("PANELS", "")
+ROTATIONS = (0, 90, 180, 270)
+
+# Per worker process: the icon atlas and quantizers, built on first use
+_worker_state = {}
+
+
+class MockPanel:
+    """Stand-in for an Inky display, with the same set_image/show interface.
+
+    Shown frames are kept in memory and, with an output directory, written there
+    as PNG, so multi-panel set-ups can be run and tested without hardware.
+    """
+
+    def __init__(self, resolution, output_dir=None):
+        self.resolution = tuple(resolution)
+        self.output_dir = output_dir
+        self.image = None
+        self.shown = None
+        self.show_count = 0
+
+    def set_image(self, image):
+        if image.size != self.resolution:
+            raise ValueError(f"Image size {image.size} does not match panel resolution {self.resolution}")
+        self.image = image
+
+    def show(self):
+        self.shown = self.image
+        self.show_count += 1
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self.shown.save(os.path.join(self.output_dir, f"panel_{self.resolution[0]}x{self.resolution[1]}.png"))
+
+
+class Panel:
+    """A display driver with its orientation and its own refresh decisions."""
+
+    def __init__(self, name, driver, rotation=0, frame_diff=None):
+        if rotation not in ROTATIONS:
+            raise ValueError(f"Invalid rotation {rotation}, expected one of {ROTATIONS}")
+        self.name = name
+        self.driver = driver
+        self.rotation = rotation
+        self.frame_diff = frame_diff or FrameDiff()
+
+    @property
+    def render_size(self):
+        """Size to render at, before rotating to the panel's resolution."""
+        width, height = self.driver.resolution
+        return (height, width) if self.rotation in (90, 270) else (width, height)
+
+    def orient(self, indices):
+        """Rotate rendered palette indices to the panel's orientation."""
+        if not self.rotation:
+            return indices
+        return np.ascontiguousarray(np.rot90(indices, k=self.rotation // 90))
+
+
+def parse_panels(value, inky=None, output_dir=None, frame_diff=FrameDiff):
+    """Parse a PANELS setting such as "inky,mock:640x400,mock:1600x1200@90".
+
+    Args:
+        value: Setting to parse
+        inky: Callable returning the auto-detected display, for "inky" entries
+        output_dir: Directory mock panels save their frames in, or None
+        frame_diff: Callable returning the FrameDiff of a panel
+
+    Returns:
+        List of Panel
+    """
+    panels = []
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        spec, _, rotation = entry.partition("@")
+        driver_name, _, size = spec.partition(":")
+        try:
+            rotation = int(rotation or 0)
+            resolution = tuple(int(side) for side in size.split("x")) if size else None
+        except ValueError:
+            raise ValueError(f"Invalid panel {entry!r}, expected e.g. 'mock:800x480@90'")
+
+        if driver_name == "inky":
+            driver = inky() if inky else None
+            if driver is None:
+                logger.info(f"No display detected for panel {entry!r}, skipping it")
+                continue
+        elif driver_name == "mock":
+            if not resolution or len(resolution) != 2:
+                raise ValueError(f"Mock panel {entry!r} needs a resolution, e.g. 'mock:800x480'")
+            driver = MockPanel(resolution, output_dir)
+        else:
+            raise ValueError(f"Unknown panel driver {driver_name!r} in {entry!r}")
+        panels.append(Panel(entry, driver, rotation, frame_diff()))
+    return panels
+
+
+def render_panel_frame(weather_data, width, height, saturation, dither_mode):
+    """Render and quantize a frame for one resolution; runs in a worker process.
+
+    Returns:
+        (height, width) uint8 array of palette indices
+    """
+    from weather_frame.config import CACHE_DIR
+    from weather_frame.icon_atlas import IconAtlas
+    from weather_frame.renderer import FrameRenderer
+
+    if 'icon_atlas' not in _worker_state:
+        # Read-only here: the app's own atlas persists newly rasterized icons
+        _worker_state['icon_atlas'] = IconAtlas(CACHE_DIR)
+    quantizers = _worker_state.setdefault('quantizers', {})
+    if (saturation, dither_mode) not in quantizers:
+        quantizers[(saturation, dither_mode)] = PaletteQuantizer(blend_palette(saturation), dither=dither_mode)
+
+    image = FrameRenderer(width, height, _worker_state['icon_atlas'], blend_palette(saturation)).render(weather_data)
+    return quantizers[(saturation, dither_mode)].quantize(image)
+
+
+class PanelFanOut:
+    """Render one data update for several panels and show it on all of them at once.
+
+    Every distinct render size is rendered and quantized once, in a process
+    pool when there is more than one, and the frames are cached by data
+    version, size and palette so panels sharing a resolution share a frame.
+    Each panel then gets its frame from its own thread, as e-ink refreshes
+    spend most of their time waiting on the display.
+    """
+
+    def __init__(self, panels, saturation=0.0, dither_mode="none", max_workers=None):
+        """
+        Args:
+            panels: List of Panel
+            saturation: Colour saturation of the palette
+            dither_mode: Dither mode of the quantizer
+            max_workers: Size of the process pool (default: one per render size, up to the CPU count)
+        """
+        self.panels = panels
+        self.saturation = saturation
+        self.dither_mode = dither_mode
+        self.max_workers = max_workers
+        self.quantizer = PaletteQuantizer(blend_palette(saturation))
+        # Palette indices per (data version, width, height, palette)
+        self.frames = {}
+        self._pool = None
+        self._lock = Lock()
+
+    def _get_pool(self, sizes):
+        if self._pool is None:
+            workers = self.max_workers or min(len(sizes), os.cpu_count() or 1)
+            # Spawned workers do not inherit the app's threads and locks
+            self._pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def render(self, weather_data):
+        """Get the frame of every panel's render size for a data update.
+
+        Returns:
+            Dict of (width, height) to palette indices
+        """
+        version = weather_data['version']
+        palette = palette_key(self.quantizer.palette)
+        sizes = sorted({panel.render_size for panel in self.panels})
+        with self._lock:
+            # Only frames of the current data version are worth keeping
+            self.frames = {key: frame for key, frame in self.frames.items() if key[0] == version}
+            missing = [size for size in sizes if (version, *size, palette) not in self.frames]
+
+        if len(missing) == 1:
+            rendered = [render_panel_frame(weather_data, *missing[0], self.saturation, self.dither_mode)]
+        elif missing:
+            pool = self._get_pool(missing)
+            futures = [pool.submit(render_panel_frame, weather_data, *size, self.saturation, self.dither_mode) for size in missing]
+            rendered = [future.result() for future in futures]
+        else:
+            rendered = []
+
+        with self._lock:
+            for size, indices in zip(missing, rendered):
+                self.frames[(version, *size, palette)] = indices
+            return {size: self.frames[(version, *size, palette)] for size in sizes}
+
+    def update(self, weather_data, force=False):
+        """Render a data update and show it on every panel where it changed.
+
+        Returns:
+            True if no panel failed
+        """
+        if not self.panels:
+            return True
+        with metrics.timed("render_panels"):
+            frames = self.render(weather_data)
+
+        with metrics.timed("show_panels"):
+            with ThreadPoolExecutor(len(self.panels)) as executor:
+                results = list(executor.map(lambda panel: self._show(panel, frames[panel.render_size], force), self.panels))
+        return all(results)
+
+    def _show(self, panel, indices, force):
+        indices = panel.orient(indices)
+        refresh, reason = panel.frame_diff.should_refresh(indices)
+        if force:
+            refresh, reason = True, "refresh forced"
+        if not refresh:
+            logger.info(f"Skipping refresh of panel {panel.name}: {reason}")
+            return True
+
+        logger.info(f"Refreshing panel {panel.name}: {reason}")
+        try:
+            panel.driver.set_image(self.quantizer.to_image(indices))
+            panel.driver.show()
+        except Exception as e:
+            logger.error(f"Error showing frame on panel {panel.name}: {e}")
+            return False
+        panel.frame_diff.mark_refreshed(indices)
+        return True
+
+    def close(self):
+        """Stop the worker processes."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
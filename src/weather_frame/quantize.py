@@ -0,0 +1,143 @@
+import numpy as np
+from PIL import Image
+
+# Palettes of the 7-colour Inky Impression, in the driver's index order:
+# black, white, green, blue, red, yellow, orange
+DESATURATED_PALETTE = [
+    (0, 0, 0), (255, 255, 255), (0, 255, 0), (0, 0, 255),
+    (255, 0, 0), (255, 255, 0), (255, 140, 0)
+]
+SATURATED_PALETTE = [
+    (57, 48, 57), (255, 255, 255), (58, 91, 70), (61, 59, 94),
+    (156, 72, 75), (208, 190, 71), (177, 106, 73)
+]
+
+DITHER_MODES = ("none", "ordered", "floyd-steinberg")
+
+BAYER_8X8 = np.array([
+    [0, 32, 8, 40, 2, 34, 10, 42],
+    [48, 16, 56, 24, 50, 18, 58, 26],
+    [12, 44, 4, 36, 14, 46, 6, 38],
+    [60, 28, 52, 20, 62, 30, 54, 22],
+    [3, 35, 11, 43, 1, 33, 9, 41],
+    [51, 19, 59, 27, 49, 17, 57, 25],
+    [15, 47, 7, 39, 13, 45, 5, 37],
+    [63, 31, 55, 23, 61, 29, 53, 21],
+], dtype=np.int16)
+
+
+def blend_palette(saturation):
+    """Blend the saturated and desaturated palettes like the Inky driver does.
+
+    Args:
+        saturation: 0.0 for the desaturated palette up to 1.0 for the saturated one
+
+    Returns:
+        List of (r, g, b) tuples
+    """
+    return [
+        tuple(round(s * saturation + d * (1 - saturation)) for s, d in zip(saturated, desaturated))
+        for saturated, desaturated in zip(SATURATED_PALETTE, DESATURATED_PALETTE)
+    ]
+
+
+def pack_4bpp(indices):
+    """Pack palette indices two pixels per byte, high nibble first, as the panel expects.
+
+    Args:
+        indices: 2D uint8 array of palette indices with an even number of pixels
+
+    Returns:
+        bytes of length indices.size // 2
+    """
+    flat = indices.reshape(-1)
+    return (((flat[0::2] << 4) & 0xF0) | (flat[1::2] & 0x0F)).astype(np.uint8).tobytes()
+
+
+def unpack_4bpp(data, width, height):
+    """Unpack palette indices packed by pack_4bpp into a (height, width) uint8 array."""
+    packed = np.frombuffer(data, dtype=np.uint8)
+    indices = np.empty(packed.size * 2, dtype=np.uint8)
+    indices[0::2] = packed >> 4
+    indices[1::2] = packed & 0x0F
+    return indices.reshape(height, width)
+
+
+class PaletteQuantizer:
+    """Map RGB frames to e-ink palette indices through a precomputed lookup table.
+
+    The table holds the nearest palette colour for every RGB value reduced to
+    `bits` bits per channel, so quantizing a frame is one vectorized lookup
+    instead of a per-pixel nearest-colour search. Ordered dithering adds a Bayer
+    threshold before the lookup. Floyd-Steinberg error diffusion is sequential
+    by nature and uses Pillow's C implementation with the same palette.
+    """
+
+    def __init__(self, palette=DESATURATED_PALETTE, dither="none", bits=5, dither_strength=48):
+        if dither not in DITHER_MODES:
+            raise ValueError(f"Unknown dither mode {dither!r}, expected one of {', '.join(DITHER_MODES)}")
+
+        self.palette = [tuple(color) for color in palette]
+        self.dither = dither
+        self.bits = bits
+        self.shift = 8 - bits
+        self.index_dtype = np.uint16 if 3 * bits <= 16 else np.uint32
+        self.lut = self._build_lut()
+        self.threshold = np.round(((BAYER_8X8 + 0.5) / 64 - 0.5) * dither_strength).astype(np.int16)
+        self._threshold_tiles = {}
+
+        self.palette_image = Image.new("P", (1, 1))
+        self.palette_image.putpalette([channel for color in self.palette for channel in color])
+
+    def _build_lut(self):
+        """Compute the nearest palette index for the centre of every RGB bin."""
+        levels = 1 << self.bits
+        step = 1 << self.shift
+        centers = np.arange(levels, dtype=np.float32) * step + (step - 1) / 2
+        r, g, b = np.meshgrid(centers, centers, centers, indexing="ij")
+        colors = np.stack([r, g, b], axis=-1).reshape(-1, 1, 3)
+        palette = np.array(self.palette, dtype=np.float32).reshape(1, -1, 3)
+        distances = ((colors - palette) ** 2).sum(axis=-1)
+        return distances.argmin(axis=-1).astype(np.uint8)
+
+    def quantize(self, image):
+        """Quantize an image to palette indices.
+
+        Args:
+            image: PIL Image or (height, width, 3 or 4) uint8 array; alpha is ignored
+
+        Returns:
+            (height, width) uint8 array of palette indices
+        """
+        if self.dither == "floyd-steinberg":
+            if not isinstance(image, Image.Image):
+                image = Image.fromarray(image)
+            quantized = image.convert("RGB").quantize(palette=self.palette_image, dither=Image.Dither.FLOYDSTEINBERG)
+            return np.asarray(quantized, dtype=np.uint8)
+
+        if isinstance(image, Image.Image):
+            # RGBA pixels are read as they are and the alpha channel sliced off, saving a conversion copy
+            image = np.asarray(image if image.mode in ("RGB", "RGBA") else image.convert("RGB"))
+        rgb = image[..., :3]
+
+        if self.dither == "ordered":
+            rgb = rgb.astype(np.int16)
+            rgb += self._threshold_tile(*rgb.shape[:2])[..., None]
+            np.clip(rgb, 0, 255, out=rgb)
+
+        shifted = (rgb >> self.shift).astype(self.index_dtype)
+        index = (shifted[..., 0] << (2 * self.bits)) | (shifted[..., 1] << self.bits) | shifted[..., 2]
+        return self.lut[index]
+
+    def _threshold_tile(self, height, width):
+        """Get the Bayer threshold repeated over a frame size."""
+        if (height, width) not in self._threshold_tiles:
+            tile = np.tile(self.threshold, (height // 8 + 1, width // 8 + 1))[:height, :width]
+            self._threshold_tiles[(height, width)] = np.ascontiguousarray(tile)
+        return self._threshold_tiles[(height, width)]
+
+    def to_image(self, indices):
+        """Wrap palette indices in a "P" mode image that the Inky driver uses as-is."""
+        image = Image.fromarray(indices, mode="P")
+        image.putpalette(self.palette_image.getpalette()[:len(self.palette) * 3])
+        return image
@@ -0,0 +1,201 @@
+import time
+from datetime import datetime
+from threading import Condition, Thread
+
+from weather_frame import logger
+from weather_frame.metrics import metrics
+
+
+def in_quiet_hours(now, quiet_hours):
+    """Whether now falls in the (start hour, end hour) window, which may span midnight."""
+    if not quiet_hours:
+        return False
+    start, end = quiet_hours
+    if start <= end:
+        return start <= now.hour < end
+    return now.hour >= start or now.hour < end
+
+
+class RefreshPipeline:
+    """Fetch, process, render and display on a single worker thread.
+
+    Triggers never start work themselves, they only record what is wanted. A
+    trigger that arrives before the running cycle has fetched joins that cycle;
+    other triggers are merged into a single pending cycle that runs next. So
+    concurrent triggers never cause duplicate API calls or overlapping panel
+    refreshes, and the display is updated as soon as new data is processed.
+
+    The panel is left alone when a fetch returns the same forecast as before,
+    and during quiet hours, unless the cycle is forced. When fetching fails or
+    there is no data, the frame rendered ahead for the current hour is shown.
+    """
+
+    def __init__(self, weather_service, display_service, quiet_hours=None):
+        """
+        Args:
+            weather_service: WeatherService to fetch with
+            display_service: DisplayService to show the frame with
+            quiet_hours: (start hour, end hour) during which the panel is not
+                refreshed, e.g. (23, 7); None to always refresh
+        """
+        self.weather_service = weather_service
+        self.display_service = display_service
+        self.quiet_hours = quiet_hours
+        self._listeners = []
+        self._condition = Condition()
+        self._pending = None
+        self._stage = "idle"
+        self._current = None
+        self._thread = None
+        self._stopping = False
+        self.cycles = 0
+        self.coalesced = 0
+        self.last_started = None
+        self.last_finished = None
+        self.last_result = None
+        self.last_error = None
+
+    def start(self):
+        """Start the worker thread."""
+        with self._condition:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = Thread(target=self._run, name="refresh-pipeline", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=10):
+        """Stop the worker after the running cycle, dropping pending triggers."""
+        with self._condition:
+            self._stopping = True
+            self._pending = None
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def trigger(self, fetch=True, force=False):
+        """Request a refresh cycle.
+
+        Args:
+            fetch: Fetch new weather data before rendering (default: True)
+            force: Refresh the panel even if the frame did not change (default: False)
+
+        Returns:
+            True if a new cycle was queued, False if the trigger was merged into
+            a running or pending one
+        """
+        with self._condition:
+            # The running cycle has not fetched yet, so it will pick up the latest data anyway
+            if self._current is not None and self._stage == "fetching" and fetch:
+                self._current['force'] = self._current['force'] or force
+                self.coalesced += 1
+                return False
+
+            if self._pending is not None:
+                self._pending['fetch'] = self._pending['fetch'] or fetch
+                self._pending['force'] = self._pending['force'] or force
+                self.coalesced += 1
+                return False
+
+            self._pending = {'fetch': fetch, 'force': force}
+            self._condition.notify_all()
+            return True
+
+    def add_listener(self, listener):
+        """Call listener(result) on the worker thread after every cycle."""
+        self._listeners.append(listener)
+
+    def wait(self, timeout=None):
+        """Wait until no cycle is running or pending.
+
+        Returns:
+            True if the pipeline is idle, False on timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._pending is None and self._current is None, timeout)
+
+    def status(self):
+        """Current state of the pipeline, for the /status endpoint."""
+        with self._condition:
+            return {
+                'stage': self._stage,
+                'pending': dict(self._pending) if self._pending else None,
+                'running': self._thread is not None and self._thread.is_alive(),
+                'cycles': self.cycles,
+                'coalesced': self.coalesced,
+                'last_started': self.last_started.isoformat() if self.last_started else None,
+                'last_finished': self.last_finished.isoformat() if self.last_finished else None,
+                'last_result': self.last_result,
+                'last_error': self.last_error
+            }
+
+    def _set_stage(self, stage):
+        with self._condition:
+            self._stage = stage
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None or self._stopping)
+                if self._stopping:
+                    return
+                self._current, self._pending = self._pending, None
+                self._stage = "fetching" if self._current['fetch'] else "displaying"
+                self.last_started = datetime.now()
+
+            with metrics.cycle() as timings:
+                start = time.perf_counter()
+                try:
+                    result, error = self._run_cycle(self._current), None
+                except Exception as e:
+                    logger.error(f"Error in refresh cycle: {e}")
+                    result, error = "failed", str(e)
+                total = time.perf_counter() - start
+
+            metrics.inc("refreshes_total", result=result)
+            stages = " ".join(f"{stage}_ms={seconds * 1000:.1f}" for stage, seconds in timings.items())
+            logger.info(f"Refresh cycle: result={result} total_ms={total * 1000:.1f} {stages}".rstrip())
+
+            with self._condition:
+                self._current = None
+                self._stage = "idle"
+                self.cycles += 1
+                self.last_finished = datetime.now()
+                self.last_result, self.last_error = result, error
+                self._condition.notify_all()
+
+            for listener in self._listeners:
+                try:
+                    listener(result)
+                except Exception as e:
+                    logger.error(f"Error in refresh listener: {e}")
+
+    def _run_cycle(self, cycle):
+        location_id = self.display_service.location_id
+        if cycle['fetch']:
+            version = self.weather_service.get_cached_data(location_id).get('version')
+            if not self.weather_service.update_weather_data():
+                self._show_queued_frame(cycle)
+                return "fetch_failed"
+            self._set_stage("displaying")
+            unchanged = version is not None and self.weather_service.get_cached_data(location_id).get('version') == version
+        else:
+            unchanged = False
+
+        with self._condition:
+            force = cycle['force']
+        if not self.weather_service.get_cached_data(location_id):
+            return "queued_frame" if self._show_queued_frame(cycle) else "no_data"
+        if not force and unchanged:
+            return "unchanged"
+        if not force and in_quiet_hours(datetime.now(), self.quiet_hours):
+            return "quiet_hours"
+        return "displayed" if self.display_service.update_display(force) else "display_failed"
+
+    def _show_queued_frame(self, cycle):
+        with self._condition:
+            force = cycle['force']
+        if not force and in_quiet_hours(datetime.now(), self.quiet_hours):
+            return False
+        self._set_stage("displaying")
+        return self.display_service.show_queued_frame(force=force)
@@ -0,0 +1,84 @@
+import os
+import random
+from datetime import datetime, timedelta
+
+from weather_frame import logger
+
+# Open-Meteo publishes new hourly data shortly after the hour, so fetch a few minutes past it
+FETCH_MINUTE = int(os.environ.get("FETCH_MINUTE", "5"))
+# "23-7" keeps the panel untouched from 23:00 to 07:00; empty to refresh around the clock
+QUIET_HOURS = os.environ.get("QUIET_HOURS", "")
+BACKOFF_BASE = timedelta(minutes=1)
+BACKOFF_MAX = timedelta(minutes=30)
+
+
+def parse_quiet_hours(value):
+    """Parse a "start-end" hour window such as "23-7" into a tuple, or None when empty."""
+    if not value:
+        return None
+    try:
+        start, end = (int(hour) for hour in value.split("-"))
+    except ValueError:
+        raise ValueError(f"Invalid quiet hours {value!r}, expected e.g. '23-7'")
+    if not (0 <= start < 24 and 0 <= end < 24):
+        raise ValueError(f"Invalid quiet hours {value!r}, hours must be 0-23")
+    return start, end
+
+
+def backoff_delay(failures, base=BACKOFF_BASE, maximum=BACKOFF_MAX, rand=random.random):
+    """Exponential backoff with jitter: between half and all of base * 2^(failures - 1), capped."""
+    # The exponent is capped first, as timedelta overflows long before the failures run out
+    delay = min(maximum, base * 2 ** min(max(0, failures - 1), 16))
+    return delay * (0.5 + rand() / 2)
+
+
+class RefreshScheduler:
+    """Trigger the refresh pipeline when new data is expected and retry failures with backoff.
+
+    Fetches run every hour at FETCH_MINUTE past the hour, independent of when the
+    process started. A failed fetch schedules a retry after an exponentially
+    growing, jittered delay; the next success cancels it.
+    """
+
+    def __init__(self, pipeline, minute=FETCH_MINUTE, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX):
+        self.pipeline = pipeline
+        self.minute = minute
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failures = 0
+        from apscheduler.schedulers.background import BackgroundScheduler
+        self.scheduler = BackgroundScheduler()
+        self.scheduler.add_job(self.pipeline.trigger, trigger="cron", minute=minute, id="refresh")
+        pipeline.add_listener(self._cycle_finished)
+
+    def start(self):
+        self.scheduler.start()
+
+    def shutdown(self):
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+
+    def next_refresh(self, now=None):
+        """When the next scheduled fetch (or retry) will run."""
+        now = now or datetime.now()
+        candidates = [job.next_run_time for job in self.scheduler.get_jobs() if getattr(job, "next_run_time", None)]
+        if candidates:
+            return min(candidates).replace(tzinfo=None)
+        # Not started yet: the next FETCH_MINUTE past an hour
+        next_run = now.replace(minute=self.minute, second=0, microsecond=0)
+        return next_run if next_run > now else next_run + timedelta(hours=1)
+
+    def _cycle_finished(self, result):
+        if result == "fetch_failed":
+            self.failures += 1
+            delay = backoff_delay(self.failures, self.backoff_base, self.backoff_max)
+            logger.warning(f"Fetch failed {self.failures} time(s) in a row, retrying in {delay.total_seconds():.0f}s")
+            self.scheduler.add_job(
+                self.pipeline.trigger, trigger="date", run_date=datetime.now() + delay,
+                id="retry", replace_existing=True
+            )
+        elif self.failures:
+            logger.info(f"Fetch succeeded after {self.failures} failure(s)")
+            self.failures = 0
+            if self.scheduler.get_job("retry"):
+                self.scheduler.remove_job("retry")
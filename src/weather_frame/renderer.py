@@ -0,0 +1,257 @@
+import os
+
+from PIL import Image, ImageDraw, ImageFont
+
+from weather_frame.chart import (
+    CHART_HEIGHT, HOUR_LABEL_SIZE, RAIN_LABEL_SIZE, RAIN_WIDTH, TEMPERATURE_LABEL_SIZE, TEMPERATURE_WIDTH,
+    hourly_chart_geometry
+)
+from weather_frame.dashboard_view import dashboard_view
+from weather_frame.utils import get_weather_icon
+
+# Layout of templates/index.html and static/style.css, in CSS pixels of the 800x480 page
+BASE_WIDTH = 800
+BASE_HEIGHT = 480
+
+FONT_PATHS = {
+    "regular": [
+        "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+        "C:\\Windows\\Fonts\\arial.ttf",
+    ],
+    "bold": [
+        "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+        "C:\\Windows\\Fonts\\arialbd.ttf",
+    ],
+}
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+DARK_GREY = (51, 51, 51)
+GREY = (119, 119, 119)
+ORANGE = (243, 113, 6)
+BLUE = (0, 103, 221)
+ICON_ORANGE = (255, 165, 0)
+ICON_BLUE = (87, 160, 238)
+ICON_LIGHT_BLUE = (145, 192, 248)
+ICON_FOG = (198, 222, 255)
+
+
+class FrameRenderer:
+    """Draw the weather dashboard straight from the cached weather data with Pillow.
+
+    This mirrors the layout of the HTML dashboard so the e-ink frame can be
+    produced without starting a browser. The layout is defined for 800x480 and
+    scaled uniformly (and centered) to other resolutions.
+
+    With an IconAtlas the icons come ready-made (and quantized to `palette`)
+    from the atlas instead of being drawn for every frame. Without
+    `persist_icons`, icons the atlas does not have yet are not added to its
+    persisted sheet.
+    """
+
+    def __init__(self, width=BASE_WIDTH, height=BASE_HEIGHT, icon_atlas=None, palette=None, persist_icons=True):
+        self.width = width
+        self.height = height
+        self.icon_atlas = icon_atlas
+        self.palette = palette
+        self.persist_icons = persist_icons
+        self.scale = min(width / BASE_WIDTH, height / BASE_HEIGHT)
+        self.offset_x = (width - BASE_WIDTH * self.scale) / 2
+        self.offset_y = (height - BASE_HEIGHT * self.scale) / 2
+        self._fonts = {}
+
+    def _x(self, value):
+        return round(self.offset_x + value * self.scale)
+
+    def _y(self, value):
+        return round(self.offset_y + value * self.scale)
+
+    def _len(self, value):
+        return max(1, round(value * self.scale))
+
+    def _font(self, size, bold=False):
+        """Get a (cached) font of the given CSS pixel size."""
+        key = (size, bold)
+        if key not in self._fonts:
+            pixel_size = self._len(size)
+            font = None
+            for path in FONT_PATHS["bold" if bold else "regular"]:
+                if os.path.exists(path):
+                    font = ImageFont.truetype(path, pixel_size)
+                    break
+            if font is None:
+                font = ImageFont.load_default(size=pixel_size)
+            self._fonts[key] = font
+        return self._fonts[key]
+
+    def _icon(self, weathercode, size):
+        icon_name = get_weather_icon(weathercode)
+        if self.icon_atlas is not None:
+            return self.icon_atlas.get(icon_name, size, self.palette, persist=self.persist_icons)
+        return render_icon(icon_name, size)
+
+    def _text_centered(self, draw, center_x, top, text, font, fill):
+        """Draw text horizontally centered on center_x with its top at top."""
+        left, _, right, _ = draw.textbbox((0, 0), text, font=font)
+        draw.text((center_x - (right - left) / 2 - left, top), text, font=font, fill=fill)
+
+    def render(self, weather_data):
+        """Render the dashboard for the given weather data.
+
+        Args:
+            weather_data: Processed weather data as returned by WeatherService.get_cached_data()
+
+        Returns:
+            RGB PIL Image of the configured size
+        """
+        image = Image.new('RGB', (self.width, self.height), WHITE)
+        draw = ImageDraw.Draw(image)
+        view = dashboard_view(weather_data)
+
+        self._draw_header(draw, weather_data.get('location'), view.formatted_date)
+        self._draw_current(image, draw, view.current)
+        self._draw_hourly_chart(draw, view.hourly)
+        self._draw_daily_forecast(image, draw, view.cards)
+
+        return image
+
+    def _draw_header(self, draw, location, formatted_date):
+        center_x = self._x(BASE_WIDTH / 2)
+        self._text_centered(draw, center_x, self._y(8), location or "", self._font(32, bold=True), BLACK)
+        self._text_centered(draw, center_x, self._y(47), formatted_date, self._font(16), DARK_GREY)
+
+    def _draw_current(self, image, draw, current):
+        # .current-weather: 200px wide column with 15px padding, content centered vertically
+        center_x = self._x(8 + 100)
+        icon_size = self._len(132)
+        icon = self._icon(current.weathercode, icon_size)
+        icon_top = self._y(68 + 28)
+        image.paste(icon, (center_x - icon_size // 2, icon_top), icon)
+
+        self._text_centered(
+            draw, center_x, icon_top + icon_size + self._len(4),
+            f"{current.temperature}°C", self._font(36, bold=True), BLACK
+        )
+
+    def _draw_hourly_chart(self, draw, hourly):
+        # .hourly-chart: from x=228 to x=792 with 20px padding, title then a 200px high canvas
+        left, right = 228 + 20, 792 - 20
+        self._text_centered(draw, self._x((left + right) / 2), self._y(68 + 20), "Voorspelling per uur", self._font(18, bold=True), BLACK)
+
+        # The 200px high chart below the title, laid out as in the dashboard's SVG chart
+        canvas_top = 68 + 20 + 18 + 10
+        geometry = hourly_chart_geometry(hourly, right - left, CHART_HEIGHT)
+        if not geometry.temperature:
+            return
+
+        def point(x, y):
+            return self._x(left + x), self._y(canvas_top + y)
+
+        rain_font = self._font(RAIN_LABEL_SIZE, bold=True)
+        for y, label in geometry.rain_ticks:
+            draw.text(point(geometry.rain_axis_x, y), label, font=rain_font, fill=BLACK, anchor="lm")
+
+        draw.line([point(x, y) for x, y in geometry.rain], fill=BLUE, width=self._len(RAIN_WIDTH), joint="curve")
+        draw.line([point(x, y) for x, y in geometry.temperature], fill=ORANGE, width=self._len(TEMPERATURE_WIDTH), joint="curve")
+
+        label_font = self._font(TEMPERATURE_LABEL_SIZE, bold=True)
+        for x, y, label in geometry.temperature_labels:
+            draw.text(point(x, y), label, font=label_font, fill=BLACK, anchor="ms")
+        hour_font = self._font(HOUR_LABEL_SIZE, bold=True)
+        for x, y, label in geometry.hour_labels:
+            draw.text(point(x, y), label, font=hour_font, fill=BLACK, anchor="mt")
+
+    def _draw_daily_forecast(self, image, draw, cards):
+        # .daily-forecast: 7 cards over 96% of the content width, 4px gap, 125px high
+        top, height, gap = 308, 125, 4
+        total_width = (BASE_WIDTH - 16) * 0.96
+        left = 8 + ((BASE_WIDTH - 16) - total_width) / 2
+        card_width = (total_width - gap * (len(cards) - 1)) / max(1, len(cards))
+        icon_size = self._len(64)
+
+        for i, card in enumerate(cards):
+            card_left = left + i * (card_width + gap)
+            center_x = self._x(card_left + card_width / 2)
+            draw.rounded_rectangle(
+                (self._x(card_left), self._y(top), self._x(card_left + card_width), self._y(top + height)),
+                radius=self._len(8), outline=BLACK, width=self._len(1)
+            )
+
+            self._text_centered(draw, center_x, self._y(top + 8), card.name, self._font(16, bold=True), DARK_GREY)
+
+            icon = self._icon(card.weathercode, icon_size)
+            image.paste(icon, (center_x - icon_size // 2, self._y(top + 28)), icon)
+
+            self._text_centered(draw, center_x, self._y(top + 92), f"{card.temperature_max}°C", self._font(16, bold=True), BLACK)
+            self._text_centered(draw, center_x, self._y(top + 108), f"{card.temperature_min}°C", self._font(14), GREY)
+
+
+def render_icon(icon_name, size):
+    """Draw a simplified version of a weather icon from static/icons.
+
+    Pillow cannot rasterize the SVG icons, so each icon is approximated with
+    basic shapes in the same colours.
+
+    Args:
+        icon_name: Icon filename as returned by get_weather_icon
+        size: Width and height of the icon in pixels
+
+    Returns:
+        RGBA PIL Image of size x size
+    """
+    # Draw at 4x and downsample for smooth edges
+    big = size * 4
+    icon = Image.new('RGBA', (big, big), (255, 255, 255, 0))
+    draw = ImageDraw.Draw(icon)
+    name = os.path.splitext(icon_name)[0]
+    unit = big / 16
+
+    def sun(cx, cy, r):
+        draw.ellipse((cx - r, cy - r, cx + r, cy + r), fill=ICON_ORANGE)
+
+    def cloud(fill=ICON_BLUE):
+        draw.ellipse((2 * unit, 6 * unit, 8 * unit, 12 * unit), fill=fill)
+        draw.ellipse((5 * unit, 3 * unit, 12 * unit, 10 * unit), fill=fill)
+        draw.ellipse((9 * unit, 6 * unit, 15 * unit, 12 * unit), fill=fill)
+        draw.rectangle((5 * unit, 9 * unit, 12 * unit, 12 * unit), fill=fill)
+
+    def drops(count, color, length=2.5):
+        for i in range(count):
+            x = (5 + i * 3) * unit
+            draw.line((x, 13 * unit, x - unit * 0.6, (13 + length) * unit), fill=color, width=max(1, round(unit * 0.8)))
+
+    if name == "clear":
+        sun(big / 2, big / 2, 4.5 * unit)
+    elif name == "partly_cloudy":
+        sun(6 * unit, 6 * unit, 3.5 * unit)
+        cloud()
+    elif name == "fog":
+        for i in range(4):
+            y = (5 + i * 2.5) * unit
+            draw.line((2 * unit, y, 14 * unit, y), fill=ICON_FOG, width=round(unit * 1.2))
+    elif name == "light_rain":
+        cloud()
+        drops(2, ICON_LIGHT_BLUE)
+    elif name == "rain":
+        cloud()
+        drops(3, ICON_LIGHT_BLUE)
+    elif name == "freezing_rain":
+        cloud()
+        drops(3, ICON_BLUE, length=1.5)
+    elif name == "snow":
+        cloud()
+        for i in range(3):
+            x = (5 + i * 3) * unit
+            draw.ellipse((x - unit * 0.8, 13.2 * unit, x + unit * 0.8, 14.8 * unit), fill=ICON_BLUE)
+    elif name == "thunderstorm":
+        cloud()
+        draw.polygon(
+            [(8 * unit, 10 * unit), (6 * unit, 13.5 * unit), (8 * unit, 13.5 * unit), (7 * unit, 16 * unit), (10.5 * unit, 12 * unit), (8.5 * unit, 12 * unit), (9.5 * unit, 10 * unit)],
+            fill=ICON_ORANGE
+        )
+    else:
+        cloud(fill=GREY)
+
+    return icon.resize((size, size), Image.LANCZOS)
@@ -1,5 +1,19 @@
 from weather_frame.config.icon_config import WEATHER_ICONS
 
+DAY_NAMES_NL = ["maandag", "dinsdag", "woensdag", "donderdag", "vrijdag", "zaterdag", "zondag"]
+MONTH_NAMES_NL = [
+    "januari", "februari", "maart", "april", "mei", "juni",
+    "juli", "augustus", "september", "oktober", "november", "december"
+]
+
 def get_weather_icon(weather_code):
     """Get weather icon filename for a given weather code"""
-    return WEATHER_ICONS.get(str(weather_code), "default.png")
\ No newline at end of file
+    return WEATHER_ICONS.get(str(weather_code), "default.svg")
+
+def format_date_nl(date):
+    """Format a date as e.g. 'Dinsdag 12 augustus' without touching the process locale"""
+    return f"{DAY_NAMES_NL[date.weekday()]} {date.day:02d} {MONTH_NAMES_NL[date.month - 1]}".capitalize()
+
+def format_day_abbr_nl(date):
+    """Format a date as the uppercase two-letter Dutch day name, e.g. 'DI'"""
+    return DAY_NAMES_NL[date.weekday()][:2].upper()
@@ -1,86 +1,243 @@
-import requests
-from datetime import datetime
-from geopy.geocoders import Nominatim
+import hashlib
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from threading import Lock, Thread
 
 from weather_frame import logger
-from weather_frame.config.api_config import API_URL, PARAMS
+from weather_frame.config.api_config import API_URL, DEFAULT_LOCATION, LOCATION_LANGUAGE, LOCATIONS, PARAMS
+from weather_frame.dashboard_view import DashboardView
+from weather_frame.forecast import Forecast
+from weather_frame.forecast_cache import ForecastCache
+from weather_frame.geocode_cache import GeocodeCache
+from weather_frame.history_store import HistoryStore
+from weather_frame.http_client import WeatherApiClient
+from weather_frame.metrics import metrics
+
+CACHE_TTL = timedelta(hours=1)
+# Response fields that make up the forecast; metadata such as generationtime_ms changes on every request
+FORECAST_FIELDS = ('latitude', 'longitude', 'utc_offset_seconds', 'current', 'minutely_15', 'hourly', 'daily')
+
+
+def data_version(data):
+    """Hash of the forecast content of an Open-Meteo response, equal for responses with the same forecast."""
+    content = {field: data[field] for field in FORECAST_FIELDS if field in data}
+    return hashlib.blake2b(json.dumps(content, sort_keys=True).encode(), digest_size=8).hexdigest()
+
 
 class WeatherService:
-    def __init__(self):
-        self.cache = {}
-    
+    def __init__(self, cache_path=None, cache_ttl=CACHE_TTL, geocode_cache_path=None, locations=LOCATIONS, history_dir=None):
+        """
+        Args:
+            cache_path: File to persist the forecast of the first location in; other
+                locations get a file next to it. Without a path forecasts are only kept in memory.
+            cache_ttl: Age after which cached data is stale
+            geocode_cache_path: File to persist reverse geocoding results in
+            locations: Dict of location id to a dict with 'latitude', 'longitude' and
+                optionally 'name'. The first location is the default one.
+            history_dir: Directory to keep the forecast history of each location in;
+                without it fetched forecasts are not kept
+        """
+        self.locations = locations
+        self.default_location_id = next(iter(locations))
+        self.caches = {}
+        self.cache_ttl = cache_ttl
+        self.forecast_caches = {}
+        if cache_path:
+            cache_path = Path(cache_path)
+            for location_id in locations:
+                path = cache_path if location_id == self.default_location_id else cache_path.with_name(f"{location_id}-{cache_path.name}")
+                self.forecast_caches[location_id] = ForecastCache(path, cache_ttl)
+        self.history_stores = {}
+        if history_dir:
+            for location_id in locations:
+                self.history_stores[location_id] = HistoryStore(Path(history_dir) / f"{location_id}.bin")
+        self.geocode_cache = GeocodeCache(geocode_cache_path)
+        self.client = WeatherApiClient()
+        self._lookup_lock = Lock()
+        self._lookup_threads = {}
+
+    @property
+    def cache(self):
+        """Cached weather data of the default location"""
+        return self.caches.get(self.default_location_id, {})
+
+    @cache.setter
+    def cache(self, value):
+        self.caches[self.default_location_id] = value
+
+    def _request_params(self):
+        """API parameters for all locations, as comma-separated coordinates when there are several"""
+        if len(self.locations) == 1:
+            location = self.locations[self.default_location_id]
+            if (location['latitude'], location['longitude']) == (PARAMS['latitude'], PARAMS['longitude']):
+                return PARAMS
+
+        return {
+            **PARAMS,
+            'latitude': ','.join(str(location['latitude']) for location in self.locations.values()),
+            'longitude': ','.join(str(location['longitude']) for location in self.locations.values())
+        }
+
     def fetch_weather(self, api_url=API_URL, params=PARAMS):
         """Fetch weather data from API"""
-        r = requests.get(api_url, params=params)
-        r.raise_for_status()
-        return r.json()
+        with metrics.timed("fetch_weather"):
+            return self.client.get_json(api_url, params)
     
     def get_location(self, lat, long):
-        """Get location name from coordinates"""
+        """Get location name from coordinates, using the geocode cache when possible"""
+        found, name = self.geocode_cache.get(lat, long, LOCATION_LANGUAGE)
+        if found:
+            return name or DEFAULT_LOCATION
+
         try:
-            geolocator = Nominatim(user_agent="weather-frame", timeout=10)
-            location = geolocator.reverse(f"{lat}, {long}", language='nl')
-            
-            if location:
-                address = location.raw['address']
-                if 'city' in address:
-                    return address['city']
-                elif 'town' in address:
-                    return address['town']
-                elif 'village' in address:
-                    return address['village']
-                else:
-                    return location.address.split(',')[0]
+            with metrics.timed("get_location"):
+                name = self._reverse_geocode(lat, long)
         except Exception as e:
             logger.error(f"Error getting location: {e}")
-            return "Leiden"
-    
-    def process_weather_data(self, data):
-        """Process and format weather data"""
-        current = data['current']
-        current_time = datetime.fromisoformat(current['time'])
-        current['time_obj'] = current_time
-        
-        hourly = data['hourly']
-        current_hour_index = 0
-
-        for i, time_str in enumerate(hourly['time']):
-            hourly_time = datetime.fromisoformat(time_str)
-            if hourly_time.hour == current_time.hour and hourly_time.date() == current_time.date():
-                current_hour_index = i
-                break
+            name = None
+
+        self.geocode_cache.set(lat, long, LOCATION_LANGUAGE, name)
+        return name or DEFAULT_LOCATION
+
+    def _reverse_geocode(self, lat, long):
+        """Look up the location name with Nominatim"""
+        from geopy.geocoders import Nominatim
+
+        geolocator = Nominatim(user_agent="weather-frame", timeout=10)
+        location = geolocator.reverse(f"{lat}, {long}", language=LOCATION_LANGUAGE)
         
-        daily = data['daily']
-        daily_times = []
-        for i, day in enumerate(daily['time']):
-            daily_time = datetime.fromisoformat(day)
-            daily_times.append(daily_time)
+        if location:
+            address = location.raw['address']
+            if 'city' in address:
+                return address['city']
+            elif 'town' in address:
+                return address['town']
+            elif 'village' in address:
+                return address['village']
+            else:
+                return location.address.split(',')[0]
+        return None
+
+    def resolve_location(self, lat, long, location_id=None):
+        """Get the location name without waiting for the geocoder.
+
+        On a cache miss the lookup runs in the background and the last known
+        name of the location (default: the first location) is used until it finishes.
+        """
+        if location_id is None:
+            location_id = self.default_location_id
+        if self.locations[location_id].get('name'):
+            return self.locations[location_id]['name']
+
+        found, name = self.geocode_cache.get(lat, long, LOCATION_LANGUAGE)
+        if found:
+            return name or DEFAULT_LOCATION
 
-        daily['time_objects'] = daily_times
+        with self._lookup_lock:
+            lookup_thread = self._lookup_threads.get(location_id)
+            if lookup_thread is None or not lookup_thread.is_alive():
+                lookup_thread = Thread(target=self._update_location, args=(lat, long, location_id), daemon=True)
+                self._lookup_threads[location_id] = lookup_thread
+                lookup_thread.start()
+        return self.caches.get(location_id, {}).get('location') or DEFAULT_LOCATION
 
-        location = self.get_location(data['latitude'], data['longitude'])
+    def _update_location(self, lat, long, location_id):
+        location = self.get_location(lat, long)
+        if self.caches.get(location_id):
+            self.caches[location_id]['location'] = location
+    
+    def process_weather_data(self, data, location=None, fetched_at=None, location_id=None):
+        """Process weather data into a Forecast model
+
+        Args:
+            data: Open-Meteo response, which is left unmodified
+            location: Location name, resolved from the coordinates if not given
+            fetched_at: When the data was fetched (default: now)
+            location_id: Configured location the data is for (default: the first location)
+        """
+        with metrics.timed("process_weather_data"):
+            forecast = Forecast.from_open_meteo(data)
+
+        if location is None:
+            location = self.resolve_location(data['latitude'], data['longitude'], location_id)
         
+        current_hour_index = forecast.current_hour_index()
         return {
-            'current': current,
-            'hourly': hourly,
+            'forecast': forecast,
             'current_hour_index': current_hour_index,
-            'daily': daily,
+            # What the dashboard shows, projected once per fetch
+            'view': DashboardView.from_forecast(forecast, current_hour_index),
             'location': location,
-            'last_updated': datetime.now()
+            'last_updated': fetched_at or datetime.now(),
+            # Identifies the forecast content, so renders of it can be cached and revalidated
+            'version': data_version(data)
         }
     
     def update_weather_data(self):
-        """Update weather data cache"""
+        """Update weather data cache of all locations with a single API request"""
         logger.info(f"Updating weather data at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
         try:
-            data = self.fetch_weather()
-            self.cache = self.process_weather_data(data)
-            return True
+            data = self.fetch_weather(params=self._request_params())
+            # Open-Meteo answers a multi-coordinate request with a list in request order
+            responses = data if isinstance(data, list) else [data]
+            processed = {
+                location_id: self.process_weather_data(response, location_id=location_id)
+                for location_id, response in zip(self.locations, responses)
+            }
         except Exception as e:
             logger.error(f"Error updating weather data: {e}")
             return False
+
+        self.caches.update(processed)
+
+        for location_id, response in zip(self.locations, responses):
+            cache = self.caches[location_id]
+            if location_id in self.forecast_caches:
+                try:
+                    self.forecast_caches[location_id].save(response, cache.get('location'), cache.get('last_updated', datetime.now()))
+                except Exception as e:
+                    logger.error(f"Error saving forecast cache for {location_id}: {e}")
+            if location_id in self.history_stores:
+                try:
+                    self.history_stores[location_id].append(cache['forecast'], cache['last_updated'])
+                except Exception as e:
+                    logger.error(f"Error appending to forecast history for {location_id}: {e}")
+        return True
+
+    def load_cached_forecast(self):
+        """Load the last good forecasts from disk into the cache.
+
+        Returns:
+            True if a forecast was loaded for at least one location
+        """
+        loaded = False
+        for location_id, forecast_cache in self.forecast_caches.items():
+            entry = forecast_cache.load()
+            if not entry:
+                continue
+
+            try:
+                self.caches[location_id] = self.process_weather_data(entry['raw'], location=entry['location'], fetched_at=entry['fetched_at'], location_id=location_id)
+            except Exception as e:
+                logger.error(f"Error processing cached forecast for {location_id}: {e}")
+                continue
+
+            state = "stale" if datetime.now() > entry['expires_at'] else "fresh"
+            logger.info(f"Loaded {state} forecast fetched at {entry['fetched_at']:%Y-%m-%d %H:%M:%S} from {forecast_cache.path}")
+            loaded = True
+        return loaded
+
+    def is_stale(self, location_id=None):
+        """Check whether the cached data is missing or older than the cache TTL"""
+        cache = self.get_cached_data(location_id)
+        if not cache or 'last_updated' not in cache:
+            return True
+        return datetime.now() - cache['last_updated'] > self.cache_ttl
     
-    def get_cached_data(self):
-        """Get cached weather data"""
-        return self.cache
\ No newline at end of file
+    def get_cached_data(self, location_id=None):
+        """Get cached weather data of a location (default: the first location)"""
+        if location_id is None:
+            return self.cache
+        return self.caches.get(location_id, {})
@@ -0,0 +1,41 @@
+import pytest
+from datetime import datetime, timedelta
+
+from weather_frame.weather_service import WeatherService
+
+@pytest.fixture
+def open_meteo_response():
+    """Return a 48 hour Open-Meteo response with the current conditions at 14:00 on the first day.
+
+    It is raining now (weathercode 61), the rest of the first day is partly cloudy and the
+    second day has rain again. Some rain falls every fifth hour.
+    """
+    start = datetime(2025, 8, 12)
+    hours = [start + timedelta(hours=i) for i in range(48)]
+    days = [start + timedelta(days=i) for i in range(7)]
+    return {
+        'latitude': 52.16,
+        'longitude': 4.49,
+        'generationtime_ms': 0.0419,
+        'utc_offset_seconds': 7200,
+        'current': {'time': "2025-08-12T14:00", 'temperature_2m': 21.5, 'weathercode': 61},
+        'hourly': {
+            'time': [hour.strftime("%Y-%m-%dT%H:%M") for hour in hours],
+            'temperature_2m': [16.0 + (i % 24) / 4 for i in range(48)],
+            'weathercode': [1] * 24 + [61] * 24,
+            'rain': [0.5 if i % 5 == 0 else 0.0 for i in range(48)]
+        },
+        'daily': {
+            'time': [day.strftime("%Y-%m-%d") for day in days],
+            'temperature_2m_max': [22.0, 23.5, 24.0, 21.0, 20.5, 22.0, 23.0],
+            'temperature_2m_min': [16.0, 17.0, 18.0, 15.0, 14.5, 16.0, 17.0],
+            'weathercode': [1, 1, 2, 3, 80, 1, 0]
+        }
+    }
+
+@pytest.fixture
+def weather_data(open_meteo_response):
+    """Return processed weather data as produced by WeatherService.process_weather_data."""
+    # A named location is not reverse geocoded, so processing needs no network access
+    service = WeatherService(locations={'home': {'latitude': 52.16, 'longitude': 4.49, 'name': "Leiden"}})
+    return service.process_weather_data(open_meteo_response, fetched_at=datetime(2025, 8, 12, 14, 5))
@@ -0,0 +1,83 @@
+import base64
+import sys
+import textwrap
+
+import pytest
+
+from weather_frame.browser_worker import BrowserWorker
+
+# A stand-in for Chromium that speaks the DevTools protocol over fd 3 and fd 4
+FAKE_BROWSER = textwrap.dedent('''
+    import base64, json, os
+
+    def send(message):
+        os.write(4, json.dumps(message).encode() + b'\\0')
+
+    buffer = b''
+    while True:
+        chunk = os.read(3, 65536)
+        if not chunk:
+            break
+        buffer += chunk
+        *messages, buffer = buffer.split(b'\\0')
+        for raw in messages:
+            message = json.loads(raw)
+            method = message['method']
+            result = {}
+            if method == 'Target.createTarget':
+                result = {'targetId': 'target-1'}
+            elif method == 'Target.attachToTarget':
+                result = {'sessionId': 'session-1'}
+            elif method == 'Page.captureScreenshot':
+                clip = message['params']['clip']
+                result = {'data': base64.b64encode(f"png {clip['width']}x{clip['height']}".encode()).decode()}
+            elif method == 'Browser.getVersion':
+                result = {'product': 'FakeChrome/1.0'}
+            elif method == 'Browser.crash':
+                os._exit(1)
+            send({'id': message['id'], 'result': result})
+            if method in ('Page.navigate', 'Page.reload'):
+                send({'method': 'Page.loadEventFired', 'params': {}, 'sessionId': 'session-1'})
+            elif method == 'Browser.close':
+                raise SystemExit(0)
+''')
+
+@pytest.fixture
+def browser_worker(tmp_path):
+    """Return a BrowserWorker driving the fake browser."""
+    script = tmp_path / "fake_browser.py"
+    script.write_text(FAKE_BROWSER)
+    executable = tmp_path / "fake-chromium"
+    executable.write_text(f"#!/bin/sh\nexec {sys.executable} {script}\n")
+    executable.chmod(0o755)
+
+    worker = BrowserWorker("http://localhost:8080", 800, 480, executable=str(executable), timeout=5)
+    yield worker
+    worker.stop()
+
+@pytest.mark.skipif(sys.platform == "win32", reason="DevTools pipe is only used on POSIX")
+def test_screenshot_reuses_browser(browser_worker):
+    """Test that consecutive screenshots are taken by the same browser process."""
+    first = browser_worker.screenshot()
+    pid = browser_worker._process.pid
+    second = browser_worker.screenshot()
+
+    assert first == second == b"png 800x480"
+    assert browser_worker._process.pid == pid
+    assert browser_worker.is_healthy()
+
+@pytest.mark.skipif(sys.platform == "win32", reason="DevTools pipe is only used on POSIX")
+def test_screenshot_restarts_crashed_browser(browser_worker):
+    """Test that the browser is restarted when it has died."""
+    browser_worker.screenshot()
+    pid = browser_worker._process.pid
+    with pytest.raises(Exception):
+        browser_worker._send('Browser.crash', timeout=2)
+    browser_worker._process.wait(timeout=5)
+    assert not browser_worker.is_healthy()
+
+    browser_worker.set_viewport(640, 400)
+    result = browser_worker.screenshot()
+
+    assert result == b"png 640x400"
+    assert browser_worker._process.pid != pid
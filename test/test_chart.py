@@ -0,0 +1,64 @@
+import pytest
+
+from weather_frame.chart import CHART_HEIGHT, CHART_WIDTH, hourly_chart_geometry, render_chart_svg
+from weather_frame.forecast import TimeSeries
+
+@pytest.fixture
+def hourly():
+    """Return a 21 hour window starting at 14:00 with some rain in the evening."""
+    return TimeSeries.from_open_meteo({
+        'time': [f"2025-08-{12 + (14 + i) // 24}T{(14 + i) % 24:02d}:00" for i in range(21)],
+        'temperature_2m': [21.0 - i / 4 for i in range(21)],
+        'weathercode': [1] * 21,
+        'rain': [0.0] * 5 + [3.0] + [0.0] * 15
+    })
+
+def test_geometry_fits_chart(hourly):
+    """Test that the lines and labels stay inside the chart."""
+    # Call the method
+    geometry = hourly_chart_geometry(hourly)
+
+    # Assertions
+    assert len(geometry.temperature) == len(geometry.rain) == 21
+    for x, y in geometry.temperature + geometry.rain:
+        assert 0 <= x <= CHART_WIDTH and 0 <= y <= CHART_HEIGHT
+    # The rain axis grows to the heaviest shower
+    assert [label for _, label in geometry.rain_ticks] == ["0.0 mm", "1.0 mm", "2.0 mm", "3.0 mm"]
+    assert [label for _, _, label in geometry.hour_labels][:3] == ["14:00", "17:00", "20:00"]
+
+@pytest.mark.parametrize("rain, labels", [
+    (14.6, ["0.0 mm", "5.0 mm", "10.0 mm", "15.0 mm"]),
+    (4.2, ["0.0 mm", "2.0 mm", "4.0 mm", "6.0 mm"]),
+    (0.3, ["0.0 mm", "1.0 mm", "2.0 mm"]),
+])
+def test_rain_ticks_readable(hourly, rain, labels):
+    """Test that heavy rain gets a coarser rain axis instead of a label per mm."""
+    # Setup
+    hourly.rain[5] = rain
+
+    # Call the method
+    geometry = hourly_chart_geometry(hourly)
+
+    # Assertions
+    assert [label for _, label in geometry.rain_ticks] == labels
+    assert geometry.rain_ticks[-1][0] == pytest.approx(30)
+
+def test_geometry_short_series(hourly):
+    """Test that a series with a single point gets no lines."""
+    # Call the method
+    geometry = hourly_chart_geometry(hourly.window(0, 1))
+
+    # Assertions
+    assert geometry.temperature == []
+    assert geometry.hour_labels == []
+
+def test_render_chart_svg(hourly):
+    """Test that the SVG is self-contained."""
+    # Call the method
+    svg = render_chart_svg(hourly)
+
+    # Assertions
+    assert svg.startswith("<svg")
+    assert svg.count("<polyline") == 2
+    assert "21.0°" in svg
+    assert "http://" not in svg.replace('xmlns="http://www.w3.org/2000/svg"', "")
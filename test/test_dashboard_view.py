@@ -0,0 +1,31 @@
+import pytest
+
+from weather_frame.dashboard_view import DAYS_SHOWN, HOURS_SHOWN, DashboardView, dashboard_view
+from weather_frame.forecast import parse_time
+
+@pytest.fixture
+def forecast(weather_data):
+    """Return the forecast of the shared weather data, with the current conditions at 14:00 on the first day."""
+    return weather_data['forecast']
+
+def test_from_forecast(forecast):
+    """Test that only the displayed window and cards are kept."""
+    # Call the method
+    view = DashboardView.from_forecast(forecast, forecast.current_hour_index())
+
+    # Assertions
+    assert len(view.hourly) == HOURS_SHOWN
+    assert view.hourly.time[0] == parse_time("2025-08-12T14:00")
+    assert len(view.cards) == DAYS_SHOWN
+    assert view.cards[0].name == "DI"
+    assert view.cards[6].temperature_max == 23.0
+    assert view.formatted_date == "Dinsdag 12 augustus"
+    assert view.current_icon != view.cards[0].icon
+
+def test_dashboard_view_without_projection(forecast):
+    """Test projecting weather data that was built without a view."""
+    # Call the method
+    view = dashboard_view({'forecast': forecast, 'current_hour_index': 44})
+
+    # Assertions
+    assert len(view.hourly) == 4
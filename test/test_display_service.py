@@ -0,0 +1,43 @@
+import sys
+import threading
+import types
+from unittest.mock import MagicMock
+
+from weather_frame import display_service as display_module
+from weather_frame.display_service import DisplayService
+
+def test_last_frame_kept_only_when_asked(monkeypatch, tmp_path, weather_data):
+    """Test that shown frames are only saved for the next power-on in first-frame mode."""
+    # Setup
+    monkeypatch.setattr(display_module, 'DEBUG_MODE', True)
+    service = DisplayService(cache_dir=tmp_path / 'normal')
+    first_frame_service = DisplayService(cache_dir=tmp_path / 'first-frame', keep_last_frame=True)
+
+    # Call the method
+    for display_service in (service, first_frame_service):
+        _, indices = display_service.render_frame(weather_data, 80, 48)
+        assert display_service._show_frame(display_service._get_quantizer(0.0), indices) is True
+
+    # Assertions
+    assert not (tmp_path / 'normal' / 'last_frame.png').exists()
+    assert (tmp_path / 'first-frame' / 'last_frame.png').exists()
+
+def test_failed_display_detection_is_remembered(monkeypatch, tmp_path):
+    """Test that a missing display is detected once, without prompting from another thread."""
+    # Setup a detection that finds no display
+    monkeypatch.setattr(display_module, 'DEBUG_MODE', False)
+    auto = MagicMock(side_effect=RuntimeError("No EEPROM detected"))
+    monkeypatch.setitem(sys.modules, 'inky', types.ModuleType('inky'))
+    monkeypatch.setitem(sys.modules, 'inky.auto', types.SimpleNamespace(auto=auto))
+    service = DisplayService(cache_dir=tmp_path)
+
+    # Call the method from a request-like thread, then again
+    results = []
+    thread = threading.Thread(target=lambda: results.append(service.inky))
+    thread.start()
+    thread.join(5)
+    results.append(service.inky)
+
+    # Assertions
+    assert results == [None, None]
+    auto.assert_called_once_with(ask_user=False, verbose=True)
@@ -0,0 +1,74 @@
+import pytest
+from datetime import datetime
+
+from weather_frame.forecast import (
+    Forecast, find_index, format_time, parse_time, parse_times, to_datetime
+)
+
+@pytest.fixture
+def open_meteo_data():
+    """Return a small Open-Meteo style response."""
+    return {
+        "latitude": 52.16,
+        "longitude": 4.49,
+        "utc_offset_seconds": 7200,
+        "current": {"time": "2025-08-12T14:15", "temperature_2m": 21.5, "weathercode": 1},
+        "hourly": {
+            "time": [f"2025-08-12T{hour:02d}:00" for hour in range(24)],
+            "temperature_2m": [float(hour) for hour in range(24)],
+            "weathercode": [hour % 4 for hour in range(24)],
+            "rain": [None] + [0.1] * 23
+        },
+        "daily": {
+            "time": ["2025-08-12", "2025-08-13", "2025-08-14"],
+            "temperature_2m_max": [22.0, 23.5, 24.0],
+            "temperature_2m_min": [16.0, 17.0, 18.0],
+            "weathercode": [1, 2, 3]
+        }
+    }
+
+def test_parse_time_round_trip():
+    """Test converting between time strings, epoch seconds and datetimes."""
+    timestamp = parse_time("2025-08-12T14:00")
+
+    assert format_time(timestamp) == "2025-08-12T14:00"
+    assert to_datetime(timestamp) == datetime(2025, 8, 12, 14)
+
+def test_parse_times_irregular():
+    """Test that unevenly spaced times are parsed one by one."""
+    values = ["2025-08-12T00:00", "2025-08-12T01:00", "2025-08-12T03:00", "2025-08-12T04:00"]
+
+    times = parse_times(values)
+
+    assert [format_time(timestamp) for timestamp in times] == values
+
+@pytest.mark.parametrize("timestamp, expected", [(-100, 0), (0, 0), (3599, 0), (3600, 1), (10799, 2), (99999, 3)])
+def test_find_index_irregular(timestamp, expected):
+    """Test the binary search lookup, clamped to the series."""
+    assert find_index([0, 3600, 7200 + 1800, 10800], timestamp) == expected
+
+@pytest.mark.parametrize("timestamp, expected", [(-100, 0), (5399, 1), (5400, 2), (99999, 3)])
+def test_find_index_regular(timestamp, expected):
+    """Test the direct offset lookup for evenly spaced series."""
+    assert find_index([0, 2700, 5400, 8100], timestamp) == expected
+
+def test_forecast_from_open_meteo(open_meteo_data):
+    """Test building the forecast model."""
+    forecast = Forecast.from_open_meteo(open_meteo_data)
+
+    assert forecast.current_hour_index() == 14
+    assert forecast.current.local_datetime == datetime(2025, 8, 12, 14, 15)
+    assert forecast.hourly.rain[0] == 0.0
+    assert forecast.hourly.weathercode[3] == 3
+    assert forecast.daily.index_at(parse_time("2025-08-13T18:00")) == 1
+    assert forecast.minutely_15 is None
+
+def test_window(open_meteo_data):
+    """Test slicing a window of the hourly series."""
+    forecast = Forecast.from_open_meteo(open_meteo_data)
+
+    window = forecast.hourly.window(forecast.current_hour_index(), 21)
+
+    assert len(window) == 10
+    assert window.to_dict()['time'][0] == "2025-08-12T14:00"
+    assert window.to_dict()['temperature_2m'] == [float(hour) for hour in range(14, 24)]
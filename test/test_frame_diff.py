@@ -0,0 +1,58 @@
+import numpy as np
+from datetime import datetime, timedelta
+
+from weather_frame.frame_diff import FrameDiff
+
+def make_frame(changed_pixels=0):
+    """Return a 480x800 palette frame with the first changed_pixels set to another colour."""
+    frame = np.ones((480, 800), dtype=np.uint8)
+    frame.reshape(-1)[:changed_pixels] = 0
+    return frame
+
+def test_first_frame_refreshes():
+    """Test that the first frame is always displayed."""
+    refresh, _ = FrameDiff().should_refresh(make_frame())
+
+    assert refresh is True
+
+def test_identical_frame_skipped():
+    """Test that an identical frame does not refresh the panel."""
+    frame_diff = FrameDiff()
+    now = datetime(2025, 8, 12, 14)
+    frame_diff.mark_refreshed(make_frame(), now)
+
+    refresh, reason = frame_diff.should_refresh(make_frame(), now + timedelta(hours=1))
+
+    assert refresh is False
+    assert reason == "frame unchanged"
+
+def test_change_below_threshold_skipped():
+    """Test that a small change stays below the threshold."""
+    frame_diff = FrameDiff(threshold=0.001)
+    now = datetime(2025, 8, 12, 14)
+    frame_diff.mark_refreshed(make_frame(), now)
+
+    refresh, _ = frame_diff.should_refresh(make_frame(100), now + timedelta(hours=1))
+
+    assert refresh is False
+    assert frame_diff.changed_fraction(make_frame(100)) == 100 / (480 * 800)
+
+def test_change_above_threshold_refreshes():
+    """Test that a larger change refreshes the panel."""
+    frame_diff = FrameDiff(threshold=0.001)
+    now = datetime(2025, 8, 12, 14)
+    frame_diff.mark_refreshed(make_frame(), now)
+
+    refresh, _ = frame_diff.should_refresh(make_frame(1000), now + timedelta(hours=1))
+
+    assert refresh is True
+
+def test_max_interval_forces_refresh():
+    """Test that an unchanged frame is refreshed after the maximum interval."""
+    frame_diff = FrameDiff(max_interval=timedelta(hours=6))
+    now = datetime(2025, 8, 12, 14)
+    frame_diff.mark_refreshed(make_frame(), now)
+
+    refresh, _ = frame_diff.should_refresh(make_frame(), now + timedelta(hours=6))
+
+    assert refresh is True
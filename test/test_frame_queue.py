@@ -0,0 +1,90 @@
+import numpy as np
+from datetime import datetime
+
+from weather_frame import display_service as display_module
+from weather_frame.display_service import DisplayService
+from weather_frame.forecast import parse_time
+from weather_frame.frame_queue import FrameQueue, hourly_weather_data
+from weather_frame.metrics import metrics
+
+def stage_counts():
+    """Return the number of timings of the render stages so far."""
+    return {
+        stage: metrics.histograms[stage].count if stage in metrics.histograms else 0
+        for stage in ("render_frame", "crop_resize", "quantize", "queue_frames")
+    }
+
+def test_hourly_weather_data(weather_data):
+    """Test that each coming hour gets its own current conditions, chart window and cards."""
+    # Call the method
+    hours = list(hourly_weather_data(weather_data, 12))
+
+    # Assertions
+    assert len(hours) == 12
+    timestamp, data = hours[10]
+    assert timestamp == parse_time("2025-08-13T01:00")
+    assert data['forecast'].current.temperature == 16.0 + 1 / 4
+    assert data['forecast'].current.weathercode == 61
+    assert data['view'].hourly.time[0] == timestamp
+    assert data['view'].formatted_date == "Woensdag 13 augustus"
+    assert data['view'].cards[0].temperature_max == 23.5
+
+def test_hourly_weather_data_stops_at_forecast_end(weather_data):
+    """Test that no hours are queued past the end of the hourly forecast."""
+    assert len(list(hourly_weather_data(weather_data, 100))) == 48 - 15
+
+def test_replace_and_pop(tmp_path):
+    """Test that frames round-trip through the queue and earlier hours are dropped."""
+    # Setup
+    queue = FrameQueue(tmp_path)
+    frames = [(parse_time(f"2025-08-12T{hour}:00"), np.full((4, 6), hour % 7, dtype=np.uint8)) for hour in (15, 16, 17)]
+    queue.replace("v1", 6, 4, 0.5, frames)
+
+    # Call the method
+    saturation, indices = queue.pop(datetime(2025, 8, 12, 16, 40))
+
+    # Assertions
+    assert saturation == 0.5
+    assert np.array_equal(indices, frames[1][1])
+    assert len(queue) == 2
+    assert sorted(path.name for path in tmp_path.glob("frame-*")) == [f"frame-{frames[1][0]}.bin", f"frame-{frames[2][0]}.bin"]
+    assert queue.data_version == "v1"
+    assert queue.pop(datetime(2025, 8, 12, 20)) is None
+    assert len(queue) == 0
+
+def test_replace_drops_previous_frames(tmp_path):
+    """Test that a new queue replaces the frames of the previous data version."""
+    # Setup
+    queue = FrameQueue(tmp_path)
+    queue.replace("v1", 2, 2, 0.0, [(parse_time("2025-08-12T15:00"), np.zeros((2, 2), dtype=np.uint8))])
+
+    # Call the method
+    queue.replace("v2", 2, 2, 0.0, [(parse_time("2025-08-12T16:00"), np.ones((2, 2), dtype=np.uint8))])
+
+    # Assertions
+    assert queue.data_version == "v2"
+    assert queue.pop(datetime(2025, 8, 12, 15)) is None
+    assert [path.name for path in tmp_path.glob("frame-*")] == [f"frame-{parse_time('2025-08-12T16:00')}.bin"]
+
+def test_display_service_queues_and_shows_frames(tmp_path, monkeypatch, weather_data):
+    """Test that the display service renders the coming hours once per data version and shows them offline."""
+    # Setup
+    monkeypatch.setattr(display_module, 'DEBUG_MODE', True)
+    service = DisplayService(frame_queue_hours=3, cache_dir=tmp_path)
+    counts_before = stage_counts()
+
+    # Call the method
+    queued = service.queue_frames(weather_data)
+    requeued = service.queue_frames(weather_data)
+    shown = service.show_queued_frame(datetime(2025, 8, 12, 16, 5))
+
+    # Assertions
+    assert (queued, requeued) == (3, 0)
+    # The batch is timed as a whole, apart from the refresh cycle stages
+    counts_after = stage_counts()
+    assert {stage: counts_after[stage] - counts_before[stage] for stage in counts_after} == {
+        'render_frame': 0, 'crop_resize': 0, 'quantize': 0, 'queue_frames': 1
+    }
+    assert shown is True
+    assert service.frame_diff.last_frame.shape == (480, 800)
+    assert service.show_queued_frame(datetime(2025, 8, 12, 22)) is False
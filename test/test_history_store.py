@@ -0,0 +1,128 @@
+import os
+import pytest
+import time
+from datetime import datetime, timedelta
+
+from weather_frame.forecast import Forecast, parse_time
+from weather_frame.history_store import FORECAST, HEADER_SIZE, RECORD_DTYPE, HistoryStore
+
+def make_forecast(start):
+    """Return a forecast with 72 hours from midnight of the day of start, fetched at start."""
+    midnight = start.replace(hour=0)
+    hours = [midnight + timedelta(hours=i) for i in range(72)]
+    return Forecast.from_open_meteo({
+        'latitude': 52.16,
+        'longitude': 4.49,
+        'current': {'time': start.strftime("%Y-%m-%dT%H:%M"), 'temperature_2m': 20.0 + start.hour / 10, 'weathercode': 1},
+        'hourly': {
+            'time': [hour.strftime("%Y-%m-%dT%H:%M") for hour in hours],
+            'temperature_2m': [15.0 + i / 10 for i in range(72)],
+            'weathercode': [1] * 72,
+            'rain': [0.5] * 72
+        },
+        'daily': {'time': [], 'temperature_2m_max': [], 'temperature_2m_min': [], 'weathercode': []}
+    })
+
+@pytest.fixture
+def store(tmp_path):
+    """Return a HistoryStore with a short retention in a temporary directory."""
+    return HistoryStore(tmp_path / 'history' / 'home.bin', retention=timedelta(days=2), horizon_hours=24)
+
+def test_append_and_query(store):
+    """Test that appended fetches are found by fetch time range."""
+    # Setup
+    start = datetime(2025, 8, 12, 14)
+    for hour in range(6):
+        store.append(make_forecast(start + timedelta(hours=hour)), start + timedelta(hours=hour))
+
+    # Call the method
+    records = store.query(start + timedelta(hours=2), start + timedelta(hours=4))
+    observations = store.observations()
+    forecasts = store.forecasts(start, start + timedelta(hours=1))
+
+    # Assertions
+    assert len(records) == 2 * 25
+    assert len(observations) == 6
+    assert observations['valid_time'][0] == parse_time("2025-08-12T14:00")
+    assert observations['temperature'][-1] == pytest.approx(21.9)
+    assert len(forecasts) == 24
+    assert (forecasts['kind'] == FORECAST).all()
+    assert forecasts['valid_time'][0] == parse_time("2025-08-12T14:00")
+
+def test_compaction(store):
+    """Test that records past the retention period are dropped."""
+    # Setup
+    start = datetime(2025, 8, 1)
+    for day in range(4):
+        store.append(make_forecast(start + timedelta(days=day)), start + timedelta(days=day))
+
+    # Call the method
+    store.compact(start + timedelta(days=3))
+
+    # Assertions
+    assert len(store.observations()) == 3
+    assert store.query()['fetched_at'][0] == datetime(2025, 8, 2).timestamp()
+
+@pytest.mark.skipif(not hasattr(time, 'tzset'), reason="needs time.tzset to change the time zone")
+def test_fetches_stay_ordered_when_clock_falls_back(store, monkeypatch):
+    """Test that fetches in the repeated hour at the end of daylight saving time are found in order."""
+    # Setup the Dutch time zone, where 02:00-03:00 on 26 October 2025 happens twice
+    monkeypatch.setenv('TZ', "Europe/Amsterdam")
+    time.tzset()
+    try:
+        summer = datetime(2025, 10, 26, 2, 50)
+        winter = datetime(2025, 10, 26, 2, 10, fold=1)
+        store.append(make_forecast(summer), summer)
+        store.append(make_forecast(winter), winter)
+
+        # Call the method
+        fetched_at = store.observations()['fetched_at']
+        later = store.observations(datetime(2025, 10, 26, 2, 5, fold=1))
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+    # Assertions
+    assert list(fetched_at) == sorted(fetched_at)
+    assert fetched_at[1] - fetched_at[0] == 20 * 60
+    assert len(later) == 1
+    assert later['valid_time'][0] == parse_time("2025-10-26T02:10")
+
+def test_partial_record_is_dropped(store):
+    """Test that a record cut short by a crash is ignored and overwritten by the next append."""
+    # Setup
+    start = datetime(2025, 8, 12, 14)
+    store.append(make_forecast(start), start)
+    with open(store.path, 'ab') as f:
+        f.write(b"\x01" * 10)
+
+    # Call the method
+    store.append(make_forecast(start + timedelta(hours=1)), start + timedelta(hours=1))
+
+    # Assertions
+    with open(store.path, 'rb') as f:
+        size = len(f.read())
+    assert (size - HEADER_SIZE) % RECORD_DTYPE.itemsize == 0
+    assert len(store.observations()) == 2
+
+@pytest.mark.parametrize("header", [b"WFHIST\x00\x00" + b"\x09" * 8 + b"\x00" * 56, b"WF"])
+def test_unreadable_history_is_moved_aside(store, header):
+    """Test that a history of another format or with a cut-off header is set aside and started over."""
+    # Setup
+    os.makedirs(os.path.dirname(store.path))
+    with open(store.path, 'wb') as f:
+        f.write(header)
+    start = datetime(2025, 8, 12, 14)
+
+    # Call the method, twice to check the new file stays readable
+    store.append(make_forecast(start), start)
+    store.append(make_forecast(start + timedelta(hours=1)), start + timedelta(hours=1))
+
+    # Assertions
+    assert len(store.observations()) == 2
+    with open(f"{store.path}.unreadable", 'rb') as f:
+        assert f.read() == header
+
+def test_missing_history(store):
+    """Test that a store without a file returns no records."""
+    assert len(store.query()) == 0
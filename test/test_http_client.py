@@ -0,0 +1,73 @@
+import pytest
+from unittest.mock import MagicMock
+
+from weather_frame.http_client import MAX_RETRY_AFTER, RETRIES, WeatherApiClient
+
+def make_response(status_code, data=None, headers=None):
+    """Return a mock requests response."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.json.return_value = data
+    return response
+
+@pytest.fixture
+def client():
+    """Return a client with a mock session."""
+    client = WeatherApiClient()
+    client.session = MagicMock()
+    return client
+
+def test_conditional_request(client):
+    """Test that a validator is sent back and a 304 reuses the previous body."""
+    # Setup
+    client.session.get.side_effect = [
+        make_response(200, {'hourly': [1, 2]}, {'ETag': '"abc"'}),
+        make_response(304),
+    ]
+
+    # Call the method
+    first = client.get_json("https://example.test/forecast", {'latitude': 52.16})
+    second = client.get_json("https://example.test/forecast", {'latitude': 52.16})
+
+    # Assertions
+    assert first == second == {'hourly': [1, 2]}
+    assert client.session.get.call_args_list[0].kwargs['headers'] == {}
+    assert client.session.get.call_args_list[1].kwargs['headers'] == {'If-None-Match': '"abc"'}
+
+def test_no_validators_no_conditional_request(client):
+    """Test that responses without validators are not kept."""
+    # Setup
+    client.session.get.return_value = make_response(200, {'hourly': []})
+
+    # Call the method
+    client.get_json("https://example.test/forecast")
+    client.get_json("https://example.test/forecast")
+
+    # Assertions
+    assert client.session.get.call_args.kwargs['headers'] == {}
+    assert client._responses == {}
+
+def test_session_retries_and_compression():
+    """Test that the session retries with backoff and asks for compressed responses."""
+    # Call the method
+    session = WeatherApiClient().session
+
+    # Assertions
+    retry = session.get_adapter("https://api.open-meteo.com").max_retries
+    assert retry.total == RETRIES
+    assert 503 in retry.status_forcelist
+    assert "gzip" in session.headers['Accept-Encoding']
+
+def test_retry_after_is_capped():
+    """Test that a long Retry-After does not hold the refresh worker for its whole duration."""
+    # Setup
+    retry = WeatherApiClient().session.get_adapter("https://api.open-meteo.com").max_retries
+
+    # Call the method
+    waits = [retry.get_retry_after(make_response(429, headers=headers)) for headers in ({'Retry-After': "3600"}, {'Retry-After': "2"}, {})]
+
+    # Assertions
+    assert waits == [MAX_RETRY_AFTER, 2, None]
+    # The cap carries over to the Retry of the next attempt
+    assert type(retry.increment("GET", "/", make_response(429))) is type(retry)
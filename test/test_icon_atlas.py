@@ -0,0 +1,82 @@
+import pytest
+
+from weather_frame import icon_atlas as icon_atlas_module
+from weather_frame.icon_atlas import IconAtlas
+from weather_frame.quantize import blend_palette
+
+@pytest.fixture
+def palette():
+    """Return the desaturated panel palette."""
+    return blend_palette(0.0)
+
+def test_get_quantized_icon(palette):
+    """Test that icons only use palette colours and a hard alpha edge."""
+    atlas = IconAtlas()
+
+    icon = atlas.get("rain.svg", 64, palette)
+
+    assert icon.size == (64, 64)
+    assert icon.mode == 'RGBA'
+    colors = {color[:3] for _, color in icon.getcolors(maxcolors=64 * 64) if color[3]}
+    assert colors <= set(palette)
+    assert {color[3] for _, color in icon.getcolors(maxcolors=64 * 64)} <= {0, 255}
+    # Rasterized once
+    assert atlas.get("rain.svg", 64, palette) is icon
+
+def test_unknown_icon_uses_default(palette):
+    """Test that unknown icons get the default icon."""
+    atlas = IconAtlas()
+
+    assert atlas.get("unknown.png", 32, palette) is atlas.get("default.svg", 32, palette)
+
+def test_atlas_persisted(tmp_path, palette):
+    """Test that a saved atlas is loaded by a new instance without rasterizing again."""
+    # Setup an atlas with a few tiles
+    atlas = IconAtlas(tmp_path)
+    icons = {size: atlas.get("snow.svg", size, palette) for size in (64, 132)}
+    atlas.save()
+
+    # Call the method on a fresh atlas
+    loaded = IconAtlas(tmp_path)
+    loaded._rasterize = None
+
+    # Assertions
+    for size, icon in icons.items():
+        assert loaded.get("snow.svg", size, palette).tobytes() == icon.tobytes()
+
+def test_changed_source_is_rasterized_again(tmp_path, palette):
+    """Test that editing an icon invalidates its cached tiles."""
+    # Setup a persisted atlas of a copied icon
+    icons_dir = tmp_path / 'icons'
+    icons_dir.mkdir()
+    (icons_dir / 'clear.svg').write_text('<svg xmlns="http://www.w3.org/2000/svg"/>')
+    atlas = IconAtlas(tmp_path, icons_dir=str(icons_dir))
+    etag = atlas.etag("clear.svg", 64, palette)
+    atlas.get("clear.svg", 64, palette)
+    atlas.save()
+
+    # Call the method after the icon changed
+    (icons_dir / 'clear.svg').write_text('<svg xmlns="http://www.w3.org/2000/svg"><circle r="1"/></svg>')
+    loaded = IconAtlas(tmp_path, icons_dir=str(icons_dir))
+
+    # Assertions
+    assert loaded.etag("clear.svg", 64, palette) != etag
+    assert loaded.get("clear.svg", 64, palette).size == (64, 64)
+
+def test_transient_tiles_are_not_persisted(tmp_path, palette, monkeypatch):
+    """Test that tiles got without persisting are kept in memory, bounded, and not saved."""
+    # Setup a small bound on the in-memory tiles
+    monkeypatch.setattr(icon_atlas_module, 'MAX_TRANSIENT_TILES', 2)
+    atlas = IconAtlas(tmp_path)
+
+    # Call the method
+    icon = atlas.get("snow.svg", 40, palette, persist=False)
+    again = atlas.get("snow.svg", 40, palette, persist=False)
+    for size in (41, 42):
+        atlas.get("snow.svg", size, palette, persist=False)
+    atlas.save()
+
+    # Assertions
+    assert again is icon
+    assert len(atlas._transient) == 2
+    assert not (tmp_path / 'icon_atlas.png').exists()
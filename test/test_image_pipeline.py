@@ -0,0 +1,66 @@
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from weather_frame.image_pipeline import fit_frame, load_frame
+
+@pytest.fixture
+def screenshot_png():
+    """Return an 800x480 RGBA screenshot, PNG encoded."""
+    buffer = BytesIO()
+    Image.new('RGBA', (800, 480), (10, 20, 30, 255)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def test_load_frame_sources(screenshot_png):
+    """Test loading frames from encoded bytes, arrays and images."""
+    # Call the method
+    from_bytes = load_frame(screenshot_png)
+    from_array = load_frame(np.zeros((480, 800, 3), dtype=np.uint8))
+
+    # Assertions
+    assert from_bytes.size == (800, 480)
+    assert from_array.mode == 'RGB'
+    assert load_frame(from_array) is from_array
+
+def test_fit_frame_exact_size_is_not_copied(screenshot_png):
+    """Test that a frame that already fits the panel is passed through."""
+    # Setup
+    image = load_frame(screenshot_png)
+
+    # Call the method
+    result = fit_frame(image, 800, 480)
+
+    # Assertions
+    assert result is image
+
+def test_fit_frame_crops_from_top_left():
+    """Test that a larger frame is cropped from the right and bottom."""
+    # Setup
+    image = Image.new('RGB', (1640, 1040), (255, 255, 255))
+    image.putpixel((0, 0), (255, 0, 0))
+
+    # Call the method
+    result = fit_frame(image, 800, 480)
+
+    # Assertions
+    assert result.size == (800, 480)
+    assert result.getpixel((0, 0)) == (255, 0, 0)
+
+def test_fit_frame_scales_up_and_centers():
+    """Test that a smaller frame is scaled up keeping its aspect ratio, centered on white."""
+    # Setup
+    image = Image.new('P', (400, 300), 0)
+    image.putpalette([0, 0, 0])
+
+    # Call the method
+    result = fit_frame(image, 800, 480)
+
+    # Assertions
+    assert result.size == (800, 480)
+    assert result.mode == 'RGB'
+    # Scaled by 1.6 to 640x480, with 80px of white on either side
+    assert result.getpixel((40, 240)) == (255, 255, 255)
+    assert result.getpixel((400, 240)) == (0, 0, 0)
+    assert result.getpixel((760, 240)) == (255, 255, 255)
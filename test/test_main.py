@@ -0,0 +1,98 @@
+import pytest
+
+from weather_frame import display_service as display_module
+from weather_frame.display_service import DisplayService
+from weather_frame.main import ICON_SCALE, MAX_RENDERED_FRAMES, create_app
+from weather_frame.weather_service import WeatherService
+
+@pytest.fixture
+def weather_service(weather_data):
+    """Return a WeatherService with a cached forecast and no network access."""
+    service = WeatherService(locations={'home': {'latitude': 52.16, 'longitude': 4.49, 'name': "Leiden"}})
+    service.cache = weather_data
+    return service
+
+@pytest.fixture
+def client(monkeypatch, tmp_path, weather_service):
+    """Return a test client of an app that does not start its scheduler or touch the panel."""
+    monkeypatch.setattr(display_module, 'DEBUG_MODE', True)
+    app = create_app(weather_service, DisplayService(weather_service, cache_dir=tmp_path), start=False)
+    return app.test_client()
+
+def test_dashboard_conditional_get(client):
+    """Test that the dashboard is served with an ETag and revalidated with 304."""
+    response = client.get("/")
+
+    assert response.status_code == 200
+    assert "Dinsdag 12 augustus" in response.get_data(as_text=True)
+    assert response.headers['ETag']
+    assert int(response.headers['Refresh']) >= 60
+
+    revalidated = client.get("/", headers={'If-None-Match': response.headers['ETag']})
+
+    assert revalidated.status_code == 304
+
+def test_unknown_location(client):
+    """Test that an unknown location is not found."""
+    assert client.get("/?location=attic").status_code == 404
+    assert client.get("/frame.png?location=attic").status_code == 404
+
+def test_frame_bin(client):
+    """Test serving a packed frame for a requested panel size."""
+    response = client.get("/frame.bin?width=600&height=448")
+
+    assert response.status_code == 200
+    assert len(response.data) == 600 * 448 // 2
+    assert response.headers['X-Frame-Width'] == "600"
+    assert client.get("/frame.bin?width=3&height=3").status_code == 400
+
+def test_frame_png_saturation_levels(client, tmp_path):
+    """Test that requested saturations share the frame of their nearest level, without persisting its icons."""
+    response = client.get("/frame.png?width=640&height=400&saturation=0.3")
+    nearby = client.get("/frame.png?width=640&height=400&saturation=0.2")
+
+    assert response.status_code == 200
+    assert response.mimetype == 'image/png'
+    assert nearby.headers['ETag'] == response.headers['ETag']
+    assert not (tmp_path / 'icon_atlas.png').exists()
+    assert client.get("/frame.png?saturation=1.5").status_code == 400
+
+def test_frame_cache_is_bounded(client):
+    """Test that only the most recently requested frames are kept."""
+    widths = range(100, 100 + 2 * (MAX_RENDERED_FRAMES + 2), 2)
+    for width in widths:
+        assert client.get(f"/frame.bin?width={width}&height=60").status_code == 200
+
+    rendered_frames = client.application.extensions['weather_frame']['rendered_frames']
+    assert len(rendered_frames) == MAX_RENDERED_FRAMES
+    assert [key[2] for key in rendered_frames] == list(widths)[-MAX_RENDERED_FRAMES:]
+
+def test_icon(client):
+    """Test serving a pre-rasterized icon."""
+    response = client.get("/icons/64/rain.svg")
+
+    assert response.status_code == 200
+    assert response.mimetype == 'image/png'
+    assert client.get("/icons/0/rain.svg").status_code == 400
+
+def test_icon_atlas_keeps_dashboard_sizes_only(client, tmp_path):
+    """Test that only the icon sizes of the dashboard are added to the persisted atlas."""
+    assert client.get("/icons/100/rain.svg").status_code == 200
+    assert not (tmp_path / 'icon_atlas.png').exists()
+
+    assert client.get(f"/icons/{64 * ICON_SCALE}/rain.svg").status_code == 200
+    assert (tmp_path / 'icon_atlas.png').exists()
+
+def test_chart_svg(client):
+    """Test that the hourly chart is served as SVG and embedded in the dashboard."""
+    response = client.get("/chart.svg")
+
+    assert response.status_code == 200
+    assert response.mimetype == 'image/svg+xml'
+    assert "<polyline" in response.get_data(as_text=True)
+    assert client.get("/chart.svg", headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+    page = client.get("/").get_data(as_text=True)
+
+    assert "<svg" in page
+    assert "cdn.jsdelivr.net" not in page
@@ -0,0 +1,69 @@
+import pytest
+import sys
+import types
+
+from weather_frame import metrics as metrics_module
+from weather_frame.metrics import Metrics, process_rss_bytes
+
+def test_timed_stage_histogram():
+    """Test that timed stages end up in the cumulative histogram."""
+    metrics = Metrics()
+
+    # Call the method, also for a stage that raises
+    metrics.observe("fetch_weather", 0.02)
+    with pytest.raises(ValueError):
+        with metrics.timed("fetch_weather"):
+            raise ValueError("API Error")
+
+    # Assertions
+    text = metrics.export()
+    assert '# TYPE weather_frame_stage_seconds histogram' in text
+    assert 'weather_frame_stage_seconds_bucket{stage="fetch_weather",le="0.01"} 1' in text
+    assert 'weather_frame_stage_seconds_bucket{stage="fetch_weather",le="0.025"} 2' in text
+    assert 'weather_frame_stage_seconds_count{stage="fetch_weather"} 2' in text
+
+def test_counters_and_gauges():
+    """Test exporting labelled counters and gauges, skipping gauges without a value."""
+    metrics = Metrics()
+    metrics.inc("refreshes_total", result="displayed")
+    metrics.inc("refreshes_total", result="displayed")
+    metrics.inc("refreshes_total", result="fetch_failed")
+    metrics.set_gauge("data_age_seconds", lambda: 12.5)
+    metrics.set_gauge("unknown", lambda: None)
+
+    text = metrics.export()
+
+    assert 'weather_frame_refreshes_total{result="displayed"} 2' in text
+    assert 'weather_frame_refreshes_total{result="fetch_failed"} 1' in text
+    assert text.count('# TYPE weather_frame_refreshes_total counter') == 1
+    assert 'weather_frame_data_age_seconds 12.5' in text
+    assert 'unknown' not in text
+
+def test_cycle_timings():
+    """Test collecting the stage timings of one refresh cycle."""
+    metrics = Metrics()
+
+    with metrics.cycle() as timings:
+        metrics.observe("render_frame", 0.1)
+        metrics.observe("render_frame", 0.2)
+    metrics.observe("inky_show", 1.0)
+
+    assert timings == {'render_frame': pytest.approx(0.3)}
+
+def test_process_rss_bytes():
+    """Test reading the memory use of the process."""
+    assert process_rss_bytes() > 0
+
+@pytest.mark.parametrize("platform, expected", [("linux", 2048 * 1024), ("darwin", 2048)])
+def test_process_rss_bytes_without_proc(monkeypatch, platform, expected):
+    """Test that the peak RSS fallback accounts for its unit per platform."""
+    # Setup a system without /proc
+    resource = pytest.importorskip("resource")
+    def no_proc(*args, **kwargs):
+        raise OSError("No /proc")
+    monkeypatch.setattr(metrics_module, 'open', no_proc, raising=False)
+    monkeypatch.setattr(sys, 'platform', platform)
+    monkeypatch.setattr(resource, 'getrusage', lambda who: types.SimpleNamespace(ru_maxrss=2048))
+
+    # Call the method
+    assert process_rss_bytes() == expected
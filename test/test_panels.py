@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from weather_frame import panels as panels_module
+from weather_frame.panels import MockPanel, Panel, PanelFanOut, parse_panels
+
+def test_parse_panels():
+    """Test parsing panel drivers, resolutions and rotations."""
+    # Call the method
+    panels = parse_panels("mock:640x400, mock:1600x1200@90, inky", inky=lambda: None)
+
+    # Assertions
+    assert [panel.driver.resolution for panel in panels] == [(640, 400), (1600, 1200)]
+    assert panels[1].rotation == 90
+    assert panels[1].render_size == (1200, 1600)
+
+@pytest.mark.parametrize("value", ["mock", "mock:800", "mock:800x480@45", "epaper:800x480"])
+def test_parse_panels_invalid(value):
+    """Test that malformed panel settings are rejected."""
+    with pytest.raises(ValueError):
+        parse_panels(value)
+
+def test_orient():
+    """Test that rotated panels get their frame turned to their resolution."""
+    # Setup
+    panel = Panel("mock", MockPanel((3, 2)), rotation=90)
+    indices = np.arange(6, dtype=np.uint8).reshape(3, 2)
+
+    # Call the method
+    result = panel.orient(indices)
+
+    # Assertions
+    assert result.shape == (2, 3)
+    assert result.flags['C_CONTIGUOUS']
+
+def test_fan_out_renders_each_size_once(monkeypatch, weather_data):
+    """Test that panels sharing a size share one render, cached by data version."""
+    # Setup
+    calls = []
+    render = panels_module.render_panel_frame
+    monkeypatch.setattr(panels_module, 'render_panel_frame', lambda *args: calls.append(args[1:3]) or render(*args))
+    panels = [Panel("a", MockPanel((400, 240))), Panel("b", MockPanel((400, 240))), Panel("c", MockPanel((240, 400)), rotation=90)]
+    fan_out = PanelFanOut(panels)
+
+    # Call the method
+    assert fan_out.update(weather_data) is True
+    assert fan_out.update(weather_data) is True
+
+    # Assertions
+    assert calls == [(400, 240)]
+    assert [panel.driver.show_count for panel in panels] == [1, 1, 1]
+    assert panels[2].driver.shown.size == (240, 400)
+
+def test_fan_out_process_pool(weather_data):
+    """Test rendering several sizes in worker processes."""
+    # Setup
+    panels = [Panel("small", MockPanel((320, 192))), Panel("large", MockPanel((400, 240)))]
+    fan_out = PanelFanOut(panels, max_workers=2)
+
+    # Call the method
+    try:
+        result = fan_out.update(weather_data)
+    finally:
+        fan_out.close()
+
+    # Assertions
+    assert result is True
+    assert [panel.driver.shown.size for panel in panels] == [(320, 192), (400, 240)]
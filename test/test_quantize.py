@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from weather_frame.quantize import (
+    DESATURATED_PALETTE, DITHER_MODES, PaletteQuantizer, blend_palette, pack_4bpp,
+    unpack_4bpp
+)
+
+def test_blend_palette():
+    """Test blending the saturated and desaturated palettes."""
+    assert blend_palette(0.0) == DESATURATED_PALETTE
+    assert blend_palette(1.0)[0] == (57, 48, 57)
+
+def test_quantize_palette_colours():
+    """Test that pure palette colours map to their own index."""
+    quantizer = PaletteQuantizer()
+    pixels = np.array([DESATURATED_PALETTE], dtype=np.uint8)
+
+    result = quantizer.quantize(pixels)
+
+    assert result.tolist() == [list(range(len(DESATURATED_PALETTE)))]
+
+def test_quantize_matches_nearest_colour():
+    """Test the lookup table against a brute force nearest colour search."""
+    quantizer = PaletteQuantizer(bits=6)
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, size=(32, 32, 3), dtype=np.uint8)
+
+    result = quantizer.quantize(pixels)
+
+    palette = np.array(DESATURATED_PALETTE, dtype=np.float64)
+    distances = np.sqrt(((pixels[:, :, None, :] - palette) ** 2).sum(axis=-1))
+    chosen = np.take_along_axis(distances, result[..., None].astype(np.intp), axis=-1)[..., 0]
+    # Within twice the distance from a pixel to the centre of its lookup table bin
+    assert np.all(chosen - distances.min(axis=-1) <= 2 * 1.5 * np.sqrt(3))
+
+@pytest.mark.parametrize("dither", DITHER_MODES)
+def test_quantize_image(dither):
+    """Test quantizing an RGBA image with every dither mode."""
+    image = Image.new('RGBA', (80, 48), (128, 200, 40, 255))
+
+    result = PaletteQuantizer(dither=dither).quantize(image)
+
+    assert result.shape == (48, 80)
+    assert result.dtype == np.uint8
+    assert result.max() < len(DESATURATED_PALETTE)
+
+def test_quantize_unknown_dither():
+    """Test that an unknown dither mode is rejected."""
+    with pytest.raises(ValueError):
+        PaletteQuantizer(dither="random")
+
+def test_to_image():
+    """Test wrapping palette indices in a palette image."""
+    quantizer = PaletteQuantizer()
+    indices = np.array([[0, 1], [4, 6]], dtype=np.uint8)
+
+    image = quantizer.to_image(indices)
+
+    assert image.mode == 'P'
+    assert image.convert('RGB').getpixel((0, 1)) == (255, 0, 0)
+
+def test_pack_4bpp():
+    """Test packing two pixels per byte."""
+    indices = np.array([[0, 1, 2, 3], [4, 5, 6, 1]], dtype=np.uint8)
+
+    assert pack_4bpp(indices) == bytes([0x01, 0x23, 0x45, 0x61])
+
+def test_unpack_4bpp():
+    """Test that unpacking restores packed indices."""
+    indices = np.array([[0, 1, 2], [6, 5, 4]], dtype=np.uint8)
+
+    assert np.array_equal(unpack_4bpp(pack_4bpp(indices), 3, 2), indices)
+
+@pytest.mark.parametrize("dither", DITHER_MODES)
+def test_quantize_rgba_ignores_alpha(dither):
+    """Test that RGBA pixels are quantized like the same pixels in RGB."""
+    rng = np.random.default_rng(1)
+    rgba = rng.integers(0, 256, size=(24, 40, 4), dtype=np.uint8)
+    quantizer = PaletteQuantizer(dither=dither)
+
+    result = quantizer.quantize(Image.fromarray(rgba, 'RGBA'))
+
+    assert np.array_equal(result, quantizer.quantize(Image.fromarray(np.ascontiguousarray(rgba[..., :3]), 'RGB')))
@@ -0,0 +1,138 @@
+import pytest
+import threading
+from unittest.mock import MagicMock
+
+from weather_frame.refresh_pipeline import RefreshPipeline
+from weather_frame.weather_service import WeatherService
+
+@pytest.fixture
+def services():
+    """Return mocked weather and display services."""
+    weather_service = MagicMock()
+    weather_service.update_weather_data.return_value = True
+    weather_service.get_cached_data.return_value = {'location': "Leiden"}
+    display_service = MagicMock()
+    display_service.location_id = None
+    display_service.update_display.return_value = True
+    display_service.show_queued_frame.return_value = False
+    return weather_service, display_service
+
+@pytest.fixture
+def pipeline(services):
+    """Return a started RefreshPipeline, stopped after the test."""
+    pipeline = RefreshPipeline(*services)
+    pipeline.start()
+    yield pipeline
+    pipeline.stop()
+
+def test_refresh_cycle(pipeline, services):
+    """Test that a trigger fetches and then updates the display."""
+    weather_service, display_service = services
+
+    # Call the method
+    assert pipeline.trigger() is True
+    assert pipeline.wait(5)
+
+    # Assertions
+    weather_service.update_weather_data.assert_called_once()
+    display_service.update_display.assert_called_once_with(False)
+    status = pipeline.status()
+    assert status['stage'] == "idle"
+    assert status['cycles'] == 1
+    assert status['last_result'] == "displayed"
+
+def test_concurrent_triggers_are_coalesced(pipeline, services):
+    """Test that triggers during a slow fetch do not cause extra API calls or display refreshes."""
+    weather_service, display_service = services
+
+    # Setup a fetch that blocks until released
+    fetch_started = threading.Event()
+    release_fetch = threading.Event()
+    def slow_update():
+        fetch_started.set()
+        release_fetch.wait(5)
+        return True
+    weather_service.update_weather_data.side_effect = slow_update
+
+    # Call the method from several threads while the first fetch is running
+    pipeline.trigger()
+    assert fetch_started.wait(5)
+    triggers = [threading.Thread(target=pipeline.trigger, kwargs={'force': True}) for _ in range(5)]
+    for trigger in triggers:
+        trigger.start()
+    for trigger in triggers:
+        trigger.join(5)
+    release_fetch.set()
+    assert pipeline.wait(5)
+
+    # Assertions
+    weather_service.update_weather_data.assert_called_once()
+    display_service.update_display.assert_called_once_with(True)
+    assert pipeline.status()['coalesced'] == 5
+
+def test_failed_fetch_skips_display(pipeline, services):
+    """Test that the display is not refreshed when fetching fails."""
+    weather_service, display_service = services
+    weather_service.update_weather_data.return_value = False
+
+    # Call the method
+    pipeline.trigger()
+    assert pipeline.wait(5)
+
+    # Assertions
+    display_service.update_display.assert_not_called()
+    assert pipeline.status()['last_result'] == "fetch_failed"
+
+def test_failed_fetch_shows_queued_frame(pipeline, services):
+    """Test that the frame rendered ahead for this hour is shown when fetching fails."""
+    weather_service, display_service = services
+    weather_service.update_weather_data.return_value = False
+    display_service.show_queued_frame.return_value = True
+
+    # Call the method
+    pipeline.trigger()
+    assert pipeline.wait(5)
+
+    # Assertions
+    display_service.show_queued_frame.assert_called_once_with(force=False)
+    display_service.update_display.assert_not_called()
+    assert pipeline.status()['last_result'] == "fetch_failed"
+
+def test_unchanged_forecast_skips_display(services, open_meteo_response):
+    """Test that fetching the same forecast again does not refresh the panel, even as the response metadata changes."""
+    # Setup a service whose fetches return the same forecast, generated at different times
+    _, display_service = services
+    weather_service = WeatherService(locations={'home': {'latitude': 52.16, 'longitude': 4.49, 'name': "Leiden"}})
+    weather_service.fetch_weather = MagicMock(side_effect=[
+        {**open_meteo_response, 'generationtime_ms': generationtime_ms} for generationtime_ms in (0.04, 0.09, 0.05)
+    ])
+    pipeline = RefreshPipeline(weather_service, display_service)
+    pipeline.start()
+
+    # Call the method, the last time forced
+    results = []
+    for force in (False, False, True):
+        pipeline.trigger(force=force)
+        assert pipeline.wait(5)
+        results.append(pipeline.status()['last_result'])
+    pipeline.stop()
+
+    # Assertions
+    assert results == ["displayed", "unchanged", "displayed"]
+    assert [call.args for call in display_service.update_display.call_args_list] == [(False,), (True,)]
+
+def test_quiet_hours_skip_display(services):
+    """Test that the panel is not refreshed during quiet hours."""
+    weather_service, display_service = services
+    pipeline = RefreshPipeline(weather_service, display_service, quiet_hours=(0, 24))
+    pipeline.start()
+
+    # Call the method
+    pipeline.trigger()
+    assert pipeline.wait(5)
+    pipeline.stop()
+
+    # Assertions
+    weather_service.update_weather_data.assert_called_once()
+    display_service.update_display.assert_not_called()
+    assert pipeline.status()['last_result'] == "quiet_hours"
@@ -0,0 +1,66 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from weather_frame.refresh_pipeline import in_quiet_hours
+from weather_frame.refresh_scheduler import RefreshScheduler, backoff_delay, parse_quiet_hours
+
+@pytest.fixture
+def refresh_scheduler():
+    """Return a RefreshScheduler around a mocked pipeline, not started."""
+    return RefreshScheduler(MagicMock(), minute=5)
+
+@pytest.fixture
+def started_scheduler(refresh_scheduler):
+    """Return a started RefreshScheduler, shut down after the test."""
+    refresh_scheduler.start()
+    yield refresh_scheduler
+    refresh_scheduler.shutdown()
+
+def test_parse_quiet_hours():
+    """Test parsing the quiet hours setting."""
+    assert parse_quiet_hours("23-7") == (23, 7)
+    assert parse_quiet_hours("") is None
+    with pytest.raises(ValueError):
+        parse_quiet_hours("late")
+    with pytest.raises(ValueError):
+        parse_quiet_hours("22-24")
+
+@pytest.mark.parametrize("hour, expected", [(22, False), (23, True), (3, True), (7, False), (12, False)])
+def test_in_quiet_hours_over_midnight(hour, expected):
+    """Test a quiet window that spans midnight."""
+    assert in_quiet_hours(datetime(2025, 8, 12, hour, 30), (23, 7)) is expected
+
+def test_backoff_delay():
+    """Test that the backoff doubles per failure, is jittered and capped."""
+    assert backoff_delay(1, rand=lambda: 1.0) == timedelta(minutes=1)
+    assert backoff_delay(3, rand=lambda: 1.0) == timedelta(minutes=4)
+    assert backoff_delay(3, rand=lambda: 0.0) == timedelta(minutes=2)
+    assert backoff_delay(20, rand=lambda: 1.0) == timedelta(minutes=30)
+    assert backoff_delay(1000, rand=lambda: 1.0) == timedelta(minutes=30)
+
+def test_retry_after_failure(started_scheduler):
+    """Test that a failed fetch schedules a retry which a success cancels."""
+    refresh_scheduler = started_scheduler
+
+    # Call the method for two failures
+    refresh_scheduler._cycle_finished("fetch_failed")
+    refresh_scheduler._cycle_finished("fetch_failed")
+
+    # Assertions
+    assert refresh_scheduler.failures == 2
+    retry = refresh_scheduler.scheduler.get_job("retry")
+    assert retry is not None
+    assert retry.next_run_time.replace(tzinfo=None) < datetime.now() + timedelta(minutes=2)
+    assert refresh_scheduler.next_refresh() == retry.next_run_time.replace(tzinfo=None)
+
+    # Call the method for a success
+    refresh_scheduler._cycle_finished("displayed")
+
+    assert refresh_scheduler.failures == 0
+    assert refresh_scheduler.scheduler.get_job("retry") is None
+
+def test_next_refresh_aligned_to_the_hour(refresh_scheduler):
+    """Test that fetches are scheduled a few minutes past the hour, not relative to start-up."""
+    assert refresh_scheduler.next_refresh(datetime(2025, 8, 12, 14, 2)) == datetime(2025, 8, 12, 14, 5)
+    assert refresh_scheduler.next_refresh(datetime(2025, 8, 12, 14, 40)) == datetime(2025, 8, 12, 15, 5)
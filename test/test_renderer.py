@@ -0,0 +1,48 @@
+import pytest
+
+from weather_frame.dashboard_view import dashboard_view
+from weather_frame.renderer import ORANGE, FrameRenderer, render_icon
+
+def test_render_default_size(weather_data):
+    """Test rendering a frame at the dashboard resolution."""
+    image = FrameRenderer().render(weather_data)
+
+    assert image.size == (800, 480)
+    assert image.mode == 'RGB'
+    # Something other than the white background was drawn
+    assert image.getbbox() is not None
+    assert len(image.getcolors(maxcolors=800 * 480)) > 2
+
+@pytest.mark.parametrize("size", [(640, 400), (1600, 1200)])
+def test_render_scaled_size(weather_data, size):
+    """Test rendering a frame at other panel resolutions."""
+    image = FrameRenderer(*size).render(weather_data)
+
+    assert image.size == size
+
+def test_render_short_hourly_series(weather_data):
+    """Test rendering when fewer hours than the chart window are available."""
+    # Setup the last four hours of the forecast, projected from the data itself
+    full_image = FrameRenderer().render(weather_data)
+    weather_data.pop('view')
+    weather_data['current_hour_index'] = 44
+
+    # Call the method
+    image = FrameRenderer().render(weather_data)
+
+    # Assertions
+    assert len(dashboard_view(weather_data).hourly.time) == 4
+    assert image.size == (800, 480)
+    chart_box = (248, 116, 772, 316)
+    chart_colors = {color for _, color in image.crop(chart_box).getcolors(maxcolors=524 * 200)}
+    assert ORANGE in chart_colors
+    assert image.crop(chart_box).tobytes() != full_image.crop(chart_box).tobytes()
+
+@pytest.mark.parametrize("icon_name", ["clear.svg", "rain.svg", "thunderstorm.svg", "default.png"])
+def test_render_icon(icon_name):
+    """Test drawing icons, including unknown ones."""
+    icon = render_icon(icon_name, 64)
+
+    assert icon.size == (64, 64)
+    assert icon.mode == 'RGBA'
+    assert icon.getbbox() is not None
@@ -1,4 +1,5 @@
 import pytest
+import threading
 from datetime import datetime
 from unittest.mock import MagicMock, patch
 
@@ -9,6 +10,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'weather-frame'))
 
 from weather_frame.weather_service import WeatherService
 from weather_frame.config.api_config import API_URL, PARAMS
+from weather_frame.http_client import CONNECT_TIMEOUT, READ_TIMEOUT
 
 @pytest.fixture
 def weather_service():
@@ -54,11 +56,13 @@ def sample_weather_data():
         }
     }
 
-@patch('weather_service.requests.get')
+@patch('requests.Session.get')
 def test_fetch_weather(mock_get, weather_service, sample_weather_data):
     """Test fetching weather data from API."""
     # Setup mock response
     mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.headers = {}
     mock_response.json.return_value = sample_weather_data
     mock_response.raise_for_status.return_value = None
     mock_get.return_value = mock_response
@@ -68,9 +72,9 @@ def test_fetch_weather(mock_get, weather_service, sample_weather_data):
     
     # Assertions
     assert result == sample_weather_data
-    mock_get.assert_called_once_with(API_URL, params=PARAMS)
+    mock_get.assert_called_once_with(API_URL, params=PARAMS, headers={}, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
 
-@patch('weather_service.Nominatim')
+@patch('geopy.geocoders.Nominatim')
 def test_get_location_city(mock_nominatim, weather_service):
     """Test getting location when city is available."""
     # Setup mock response
@@ -88,7 +92,7 @@ def test_get_location_city(mock_nominatim, weather_service):
     mock_nominatim.assert_called_once_with(user_agent="weather-frame", timeout=10)
     mock_geolocator.reverse.assert_called_once_with("52.16, 4.49", language='nl')
 
-@patch('weather_service.Nominatim')
+@patch('geopy.geocoders.Nominatim')
 def test_get_location_town(mock_nominatim, weather_service):
     """Test getting location when town is available but not city."""
     # Setup mock response
@@ -104,7 +108,7 @@ def test_get_location_town(mock_nominatim, weather_service):
     # Assertions
     assert result == 'Oegstgeest'
 
-@patch('weather_service.Nominatim')
+@patch('geopy.geocoders.Nominatim')
 def test_get_location_exception(mock_nominatim, weather_service):
     """Test getting location when an exception occurs."""
     # Setup mock to raise exception
@@ -127,24 +131,49 @@ def test_process_weather_data(weather_service, sample_weather_data):
     result = weather_service.process_weather_data(sample_weather_data)
     
     # Assertions
-    assert 'current' in result
-    assert 'hourly' in result
-    assert 'daily' in result
+    assert 'forecast' in result
     assert 'location' in result
     assert 'last_updated' in result
     
-    # Check time object creation
-    assert result['current']['time_obj'] == datetime.fromisoformat("2025-08-12T14:00")
+    # Check the forecast model
+    forecast = result['forecast']
+    assert forecast.current.local_datetime == datetime.fromisoformat("2025-08-12T14:00")
+    assert len(forecast.hourly) == 16
+    assert forecast.hourly.temperature[14] == 21.5
     
     # Check current hour index is set correctly (14:00 is index 14)
     assert result['current_hour_index'] == 14
     
-    # Check daily time objects
-    assert len(result['daily']['time_objects']) == 7
-    assert result['daily']['time_objects'][0] == datetime.fromisoformat("2025-08-12")
+    # Check daily dates
+    assert len(forecast.daily) == 7
+    assert forecast.daily.dates()[0] == datetime.fromisoformat("2025-08-12")
 
-@patch('weather_service.WeatherService.fetch_weather')
-@patch('weather_service.WeatherService.process_weather_data')
+    # Labels are formatted without the process locale
+    assert result['view'].formatted_date == "Dinsdag 12 augustus"
+    assert [card.name for card in result['view'].cards][:3] == ["DI", "WO", "DO"]
+    assert result['version'] == weather_service.process_weather_data(sample_weather_data)['version']
+
+    # The response itself is left unmodified
+    assert 'time_obj' not in sample_weather_data['current']
+    assert 'time_objects' not in sample_weather_data['daily']
+
+def test_version_ignores_response_metadata(weather_service, sample_weather_data):
+    """Test that responses differing only in generation time get the same data version."""
+    # Setup two responses for the same forecast
+    weather_service.get_location = MagicMock(return_value="Leiden")
+    first = {**sample_weather_data, 'generationtime_ms': 0.0419}
+    second = {**sample_weather_data, 'generationtime_ms': 0.0871}
+    changed = {**second, 'current': {**sample_weather_data['current'], 'temperature_2m': 22.0}}
+
+    # Call the method
+    versions = [weather_service.process_weather_data(data)['version'] for data in (first, second, changed)]
+
+    # Assertions
+    assert versions[0] == versions[1]
+    assert versions[2] != versions[0]
+
+@patch('weather_frame.weather_service.WeatherService.fetch_weather')
+@patch('weather_frame.weather_service.WeatherService.process_weather_data')
 def test_update_weather_data_success(mock_process, mock_fetch, weather_service, sample_weather_data):
     """Test updating weather data cache - successful case."""
     # Setup mocks
@@ -158,10 +187,10 @@ def test_update_weather_data_success(mock_process, mock_fetch, weather_service,
     # Assertions
     assert result is True
     mock_fetch.assert_called_once()
-    mock_process.assert_called_once_with(sample_weather_data)
+    mock_process.assert_called_once_with(sample_weather_data, location_id='home')
     assert weather_service.cache == processed_data
 
-@patch('weather_service.WeatherService.fetch_weather')
+@patch('weather_frame.weather_service.WeatherService.fetch_weather')
 def test_update_weather_data_failure(mock_fetch, weather_service):
     """Test updating weather data cache - failure case."""
     # Setup mock to raise exception
@@ -186,4 +215,157 @@ def test_get_cached_data(weather_service):
     
     # Assertions
     assert result == test_data
-    assert result is weather_service.cache  # Reference check
\ No newline at end of file
+    assert result is weather_service.cache  # Reference check
+
+@patch('weather_frame.weather_service.WeatherService.fetch_weather')
+def test_load_cached_forecast(mock_fetch, tmp_path, sample_weather_data):
+    """Test that a saved forecast is loaded by a new service without a network call."""
+    # Setup a service that fetched and persisted a forecast
+    mock_fetch.return_value = sample_weather_data
+    cache_path = tmp_path / 'forecast.json.gz'
+    first_service = WeatherService(cache_path=cache_path)
+    first_service.get_location = MagicMock(return_value="Leiden")
+    assert first_service.update_weather_data() is True
+
+    # Call the method on a fresh service, as after a restart
+    restarted_service = WeatherService(cache_path=cache_path)
+    restarted_service.get_location = MagicMock()
+    result = restarted_service.load_cached_forecast()
+
+    # Assertions
+    assert result is True
+    assert cache_path.exists()
+    restarted_service.get_location.assert_not_called()
+    cached = restarted_service.get_cached_data()
+    assert cached['location'] == "Leiden"
+    assert cached['current_hour_index'] == 14
+    assert cached['last_updated'] == first_service.get_cached_data()['last_updated']
+    assert restarted_service.is_stale() is False
+
+def test_load_cached_forecast_missing(tmp_path, weather_service):
+    """Test loading when no forecast has been saved yet."""
+    service = WeatherService(cache_path=tmp_path / 'forecast.json.gz')
+
+    assert service.load_cached_forecast() is False
+    assert weather_service.load_cached_forecast() is False
+    assert service.is_stale() is True
+
+@patch('geopy.geocoders.Nominatim')
+def test_get_location_cached(mock_nominatim, tmp_path):
+    """Test that a location is looked up once and then served from the persistent cache."""
+    # Setup mock response
+    mock_geolocator = MagicMock()
+    mock_location = MagicMock()
+    mock_location.raw = {'address': {'city': 'Leiden'}}
+    mock_geolocator.reverse.return_value = mock_location
+    mock_nominatim.return_value = mock_geolocator
+    cache_path = tmp_path / 'geocode.json'
+
+    # Call the method twice, and once more on a new service sharing the cache file
+    first = WeatherService(geocode_cache_path=cache_path).get_location(52.161, 4.492)
+    second = WeatherService(geocode_cache_path=cache_path).get_location(52.158, 4.488)
+
+    # Assertions
+    assert first == second == 'Leiden'
+    mock_geolocator.reverse.assert_called_once()
+
+@patch('geopy.geocoders.Nominatim')
+def test_get_location_failure_cached(mock_nominatim, weather_service):
+    """Test that a failed lookup is cached instead of retried on every update."""
+    # Setup mock to raise exception
+    mock_geolocator = MagicMock()
+    mock_geolocator.reverse.side_effect = Exception("API Error")
+    mock_nominatim.return_value = mock_geolocator
+
+    # Call the method twice
+    weather_service.get_location(52.16, 4.49)
+    result = weather_service.get_location(52.16, 4.49)
+
+    # Assertions
+    assert result == 'Leiden'
+    mock_geolocator.reverse.assert_called_once()
+
+def test_resolve_location_does_not_block(weather_service):
+    """Test that an uncached location is looked up in the background."""
+    # Setup a slow geocoder
+    lookup_started = threading.Event()
+    release_lookup = threading.Event()
+    def slow_get_location(lat, long):
+        lookup_started.set()
+        release_lookup.wait(5)
+        return "Oegstgeest"
+    weather_service.get_location = slow_get_location
+    weather_service.cache = {'location': "Leiden"}
+
+    # Call the method while the lookup is still running
+    result = weather_service.resolve_location(52.18, 4.46)
+    assert lookup_started.wait(5)
+    release_lookup.set()
+    weather_service._lookup_threads['home'].join(5)
+
+    # Assertions
+    assert result == "Leiden"
+    assert weather_service.cache['location'] == "Oegstgeest"
+
+@patch('weather_frame.weather_service.WeatherService.fetch_weather')
+def test_update_weather_data_multiple_locations(mock_fetch, tmp_path, sample_weather_data):
+    """Test that all locations are fetched with one request and cached separately."""
+    # Setup a second location and a response per location
+    locations = {
+        'home': {'latitude': 52.16, 'longitude': 4.49, 'name': "Leiden"},
+        'office': {'latitude': 52.37, 'longitude': 4.89, 'name': "Amsterdam"}
+    }
+    office_data = {**sample_weather_data, 'latitude': 52.37, 'longitude': 4.89}
+    mock_fetch.return_value = [sample_weather_data, office_data]
+    service = WeatherService(cache_path=tmp_path / 'forecast.json.gz', locations=locations)
+
+    # Call the method
+    result = service.update_weather_data()
+
+    # Assertions
+    assert result is True
+    mock_fetch.assert_called_once()
+    params = mock_fetch.call_args.kwargs['params']
+    assert params['latitude'] == "52.16,52.37"
+    assert params['longitude'] == "4.49,4.89"
+    assert service.get_cached_data()['location'] == "Leiden"
+    assert service.get_cached_data('office')['location'] == "Amsterdam"
+    assert service.is_stale('office') is False
+    assert service.get_cached_data('unknown') == {}
+    assert (tmp_path / 'forecast.json.gz').exists()
+    assert (tmp_path / 'office-forecast.json.gz').exists()
+
+@patch('weather_frame.weather_service.WeatherService.fetch_weather')
+def test_update_weather_data_locations_in_one_grid_cell(mock_fetch, sample_weather_data):
+    """Test that locations snapped to the same grid cell keep their own names."""
+    # Setup two locations the API answers with the same coordinates
+    locations = {
+        'home': {'latitude': 52.161, 'longitude': 4.491, 'name': "Home"},
+        'office': {'latitude': 52.159, 'longitude': 4.489, 'name': "Office"}
+    }
+    mock_fetch.return_value = [sample_weather_data, dict(sample_weather_data)]
+    service = WeatherService(locations=locations)
+
+    # Call the method
+    assert service.update_weather_data() is True
+
+    # Assertions
+    assert service.get_cached_data('home')['location'] == "Home"
+    assert service.get_cached_data('office')['location'] == "Office"
+
+@patch('weather_frame.weather_service.WeatherService.fetch_weather')
+def test_update_weather_data_appends_history(mock_fetch, tmp_path, sample_weather_data):
+    """Test that every fetched forecast is kept in the location's history."""
+    # Setup
+    mock_fetch.return_value = sample_weather_data
+    service = WeatherService(history_dir=tmp_path / 'history')
+    service.get_location = MagicMock(return_value="Leiden")
+
+    # Call the method
+    assert service.update_weather_data() is True
+    assert service.update_weather_data() is True
+
+    # Assertions
+    history = service.history_stores['home']
+    assert len(history.observations()) == 2
+    assert len(history.forecasts()) == 2 * 2  # The sample has two hours from the current one on